@@ -0,0 +1,229 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+import gestionproductos
+import catalogo
+
+try:
+    import resource
+except ImportError:  # Windows no tiene el módulo resource
+    resource = None
+
+BACKENDS = ("json", "sqlite", "mysql")
+
+# Memoria residente máxima del proceso en KB (ru_maxrss viene en bytes en macOS)
+def rss_pico_kb():
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico // 1024 if sys.platform == "darwin" else pico
+
+def _percentil(ordenadas, p):
+    return ordenadas[max(0, math.ceil(p * len(ordenadas)) - 1)]
+
+# Resumen de una operación repetida: rendimiento y latencias p50/p99
+def resumir(latencias):
+    if not latencias:
+        return {"n": 0}
+    total = sum(latencias)
+    ordenadas = sorted(latencias)
+    return {
+        "n": len(latencias),
+        "total_s": total,
+        "ops_s": len(latencias) / total if total else None,
+        "p50_ms": _percentil(ordenadas, 0.50) * 1000,
+        "p99_ms": _percentil(ordenadas, 0.99) * 1000
+    }
+
+# Resumen de una operación que procesa `filas` de una sola vez
+def resumir_total(segundos, filas):
+    return {"n": filas, "total_s": segundos, "ops_s": filas / segundos if segundos else None}
+
+def medir(funcion, argumentos):
+    latencias = []
+    for argumento in argumentos:
+        inicio = time.perf_counter()
+        funcion(argumento)
+        latencias.append(time.perf_counter() - inicio)
+    return resumir(latencias)
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+# Nombres de `cantidad` productos del catálogo elegidos al azar, sin tener el
+# catálogo entero en memoria (afectaría la medición de RSS)
+def _muestra_de_nombres(tamano, cantidad, semilla):
+    indices = set(random.Random(semilla + 1).sample(range(tamano), min(cantidad, tamano)))
+    return [r["nombre"] for i, r in enumerate(catalogo.generar_registros(tamano, semilla)) if i in indices]
+
+def _productos_nuevos(cantidad):
+    return [gestionproductos.ProductoHardware(f"producto nuevo {i}", 10.0, 5, "1") for i in range(cantidad)]
+
+def _caso_json(args, archivo_catalogo, trabajo, nombres, nuevos, nulo):
+    operaciones = {}
+    inventario = gestionproductos.Inventario(os.path.join(trabajo, "importado.json"), journal=True, fsync=args.fsync)
+    _, segundos = cronometrar(lambda: (
+        inventario.agregar_productos(gestionproductos.iterar_productos_archivo(archivo_catalogo)), inventario.cerrar()))
+    operaciones["importar"] = resumir_total(segundos, args.tamano)
+    del inventario
+
+    # Modo journal: cada alta, cambio o baja agrega una línea en lugar de
+    # reescribir el catálogo completo
+    copia = os.path.join(trabajo, "productos.json")
+    shutil.copyfile(archivo_catalogo, copia)
+    inventario, segundos = cronometrar(lambda: gestionproductos.Inventario(
+        copia, journal=True, fsync=args.fsync, max_registros_journal=2 ** 62, max_bytes_journal=2 ** 62))
+    operaciones["cargar"] = resumir_total(segundos, args.tamano)
+    operaciones.update(_operaciones_comunes(inventario, nombres, nuevos, nulo))
+    _, segundos = cronometrar(inventario.guardar_productos)
+    operaciones["guardar"] = resumir_total(segundos, len(inventario))
+    inventario.cerrar()
+    return operaciones
+
+def _caso_sql(args, archivo_catalogo, trabajo, nombres, nuevos, nulo):
+    if args.caso == "sqlite":
+        import gestionproductossqlite
+        abrir = lambda: gestionproductossqlite.Inventario(os.path.join(trabajo, "productos.db"))
+    else:
+        import gestionproductossql
+        abrir = lambda: gestionproductossql.Inventario(
+            args.mysql_host, args.mysql_user, args.mysql_password, args.mysql_database, args.mysql_port)
+    operaciones = {}
+    inventario = abrir()
+    if args.caso == "mysql":
+        with inventario._cursor() as cursor:
+            cursor.execute("TRUNCATE TABLE productos")
+    _, segundos = cronometrar(lambda: inventario.importar_json(archivo_catalogo))
+    operaciones["importar"] = resumir_total(segundos, args.tamano)
+    inventario.cerrar()
+
+    # Abrir una base no lee las filas: se mide como una sola operación
+    inventario, segundos = cronometrar(abrir)
+    operaciones["abrir"] = resumir_total(segundos, 1)
+    operaciones.update(_operaciones_comunes(inventario, nombres, nuevos, nulo))
+    inventario.cerrar()
+    return operaciones
+
+def _operaciones_comunes(inventario, nombres, nuevos, nulo):
+    operaciones = {
+        "buscar": medir(inventario.obtener_producto, nombres),
+        "agregar": medir(inventario.agregar_producto, nuevos),
+        "actualizar": medir(lambda nombre: inventario.actualizar_producto(nombre, nuevo_precio=1.5), nombres),
+        "eliminar": medir(inventario.eliminar_producto, nombres)
+    }
+    _, segundos = cronometrar(lambda: inventario.listar_productos(salida=nulo))
+    operaciones["listar"] = resumir_total(segundos, sum(1 for _ in inventario.iterar_productos()))
+    return operaciones
+
+# Corre un backend con un tamaño de catálogo; se ejecuta en un proceso aparte
+# para que el pico de RSS sea solo el de ese caso
+def ejecutar_caso(args):
+    archivo_catalogo = os.path.join(args.datos, f"catalogo_{args.tamano}.json")
+    trabajo = tempfile.mkdtemp(dir=args.datos)
+    nombres = _muestra_de_nombres(args.tamano, args.operaciones, args.semilla)
+    nuevos = _productos_nuevos(args.operaciones)
+    try:
+        # Los métodos del inventario informan cada operación por pantalla
+        with open(os.devnull, 'w') as nulo, redirect_stdout(nulo):
+            if args.caso == "json":
+                operaciones = _caso_json(args, archivo_catalogo, trabajo, nombres, nuevos, nulo)
+            else:
+                operaciones = _caso_sql(args, archivo_catalogo, trabajo, nombres, nuevos, nulo)
+    finally:
+        shutil.rmtree(trabajo, ignore_errors=True)
+    resultado = {"backend": args.caso, "tamano": args.tamano, "rss_pico_kb": rss_pico_kb(), "operaciones": operaciones}
+    with open(args.salida_caso, 'w') as f:
+        json.dump(resultado, f)
+
+def _commit_actual():
+    try:
+        proceso = subprocess.run(["git", "rev-parse", "HEAD"], cwd=RAIZ, capture_output=True, text=True)
+    except OSError:
+        return None
+    return proceso.stdout.strip() or None
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Mide las operaciones de los backends de Inventario.")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1000, 100000], help="filas de cada catálogo")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=["json", "sqlite"])
+    parser.add_argument("--operaciones", type=int, default=1000, help="repeticiones de buscar/agregar/actualizar/eliminar")
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--fsync", action="store_true", help="fsync en cada escritura del backend JSON")
+    parser.add_argument("--salida", help="archivo del informe JSON (por defecto, la salida estándar)")
+    parser.add_argument("--mysql-host", default="localhost")
+    parser.add_argument("--mysql-user", default="root")
+    parser.add_argument("--mysql-password", default="password")
+    parser.add_argument("--mysql-database", default="gestiondeproductos_bench", help="se vacía la tabla productos")
+    parser.add_argument("--mysql-port", type=int, default=3306)
+    # Uso interno: ejecución de un caso en el proceso hijo
+    parser.add_argument("--caso", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--datos", help=argparse.SUPPRESS)
+    parser.add_argument("--salida-caso", help=argparse.SUPPRESS)
+    args = parser.parse_args(argumentos)
+
+    if args.caso:
+        args.tamano = args.tamanos[0]
+        ejecutar_caso(args)
+        return
+
+    datos = tempfile.mkdtemp(prefix="benchmarks_")
+    resultados = []
+    try:
+        for tamano in args.tamanos:
+            print(f"Generando catálogo de {tamano} productos...", file=sys.stderr)
+            catalogo.escribir_catalogo(os.path.join(datos, f"catalogo_{tamano}.json"), tamano, args.semilla)
+            for backend in args.backends:
+                print(f"Midiendo {backend} con {tamano} productos...", file=sys.stderr)
+                salida_caso = os.path.join(datos, "caso.json")
+                comando = [
+                    sys.executable, os.path.abspath(__file__), "--caso", backend, "--tamanos", str(tamano),
+                    "--datos", datos, "--salida-caso", salida_caso, "--operaciones", str(args.operaciones),
+                    "--semilla", str(args.semilla), "--mysql-host", args.mysql_host, "--mysql-user", args.mysql_user,
+                    "--mysql-password", args.mysql_password, "--mysql-database", args.mysql_database,
+                    "--mysql-port", str(args.mysql_port)
+                ]
+                if args.fsync:
+                    comando.append("--fsync")
+                if subprocess.run(comando).returncode != 0:
+                    print(f"Error al medir {backend} con {tamano} productos.", file=sys.stderr)
+                    continue
+                with open(salida_caso) as f:
+                    resultados.append(json.load(f))
+    finally:
+        shutil.rmtree(datos, ignore_errors=True)
+
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_actual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "semilla": args.semilla,
+        "operaciones": args.operaciones,
+        "fsync": args.fsync,
+        "resultados": resultados
+    }
+    texto = json.dumps(informe, indent=4)
+    if args.salida:
+        with open(args.salida, 'w') as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+# Por ejemplo: python benchmarks/benchmark.py --tamanos 1000 100000 1000000 --salida base.json
+if __name__ == "__main__":
+    main()
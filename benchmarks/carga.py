@@ -0,0 +1,175 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from urllib.parse import quote
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+import catalogo
+from benchmark import resumir
+
+# Cliente HTTP/1.1 mínimo con keep-alive: una conexión, un pedido por vez
+class Conexion:
+    def __init__(self, host, puerto):
+        self.host = host
+        self.puerto = puerto
+        self.reader = self.writer = None
+
+    async def abrir(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.puerto)
+
+    async def pedir(self, metodo, ruta, cuerpo=None):
+        datos = json.dumps(cuerpo).encode() if cuerpo is not None else b""
+        self.writer.write(f"{metodo} {ruta} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(datos)}\r\n\r\n".encode() + datos)
+        await self.writer.drain()
+        cabecera = await self.reader.readuntil(b"\r\n\r\n")
+        lineas = cabecera.decode("latin-1").split("\r\n")
+        estado = int(lineas[0].split(" ")[1])
+        largo = 0
+        cerrar = False
+        for linea in lineas[1:]:
+            nombre, _, valor = linea.partition(":")
+            nombre = nombre.strip().lower()
+            if nombre == "content-length":
+                largo = int(valor)
+            elif nombre == "connection":
+                cerrar = valor.strip().lower() == "close"
+        await self.reader.readexactly(largo)
+        if cerrar:
+            self.cerrar()
+            await self.abrir()
+        return estado
+
+    def cerrar(self):
+        if self.writer is not None:
+            self.writer.close()
+
+# Cada conexión repite pedidos durante `duracion` segundos: lecturas por
+# nombre, listados cortos y, con probabilidad `escrituras`, ajustes de stock
+async def _cliente(args, nombres, fin, latencias, errores, azar):
+    conexion = Conexion(args.host, args.puerto)
+    await conexion.abrir()
+    try:
+        while time.perf_counter() < fin:
+            nombre = quote(azar.choice(nombres), safe="")
+            sorteo = azar.random()
+            inicio = time.perf_counter()
+            if sorteo < args.escrituras:
+                estado = await conexion.pedir("POST", f"/productos/{nombre}/stock", {"delta": 1})
+            elif sorteo < args.escrituras + args.listados:
+                estado = await conexion.pedir("GET", "/productos?limite=10")
+            else:
+                estado = await conexion.pedir("GET", f"/productos/{nombre}")
+            latencias.append(time.perf_counter() - inicio)
+            if estado >= 400:
+                errores[estado] = errores.get(estado, 0) + 1
+    finally:
+        conexion.cerrar()
+
+async def medir(args, nombres):
+    latencias = []
+    errores = {}
+    inicio = time.perf_counter()
+    fin = inicio + args.duracion
+    await asyncio.gather(*(_cliente(args, nombres, fin, latencias, errores, random.Random(args.semilla + i))
+                           for i in range(args.conexiones)))
+    segundos = time.perf_counter() - inicio
+    resultado = resumir(latencias)
+    resultado.pop("total_s", None)
+    resultado["ops_s"] = len(latencias) / segundos
+    resultado["errores"] = errores
+    return resultado
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def _esperar_servidor(host, puerto, espera=30.0):
+    limite = time.monotonic() + espera
+    while True:
+        try:
+            conexion = Conexion(host, puerto)
+            await conexion.abrir()
+            await conexion.pedir("GET", "/salud")
+            conexion.cerrar()
+            return
+        except OSError:
+            if time.monotonic() > limite:
+                raise
+            await asyncio.sleep(0.1)
+
+# Por ejemplo, contra un servidor propio con un catálogo de 10000 productos:
+#   python benchmarks/carga.py --catalogo 10000 --conexiones 64 --duracion 10
+# o contra uno ya levantado con el mismo catálogo:
+#   python benchmarks/carga.py --puerto 8000 --catalogo 10000 --sin-servidor
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del servidor HTTP del inventario.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, help="por defecto, un puerto libre")
+    parser.add_argument("--catalogo", type=int, default=10000, help="productos del catálogo sintético")
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json", help="backend del servidor propio")
+    parser.add_argument("--sin-servidor", action="store_true", help="usa un servidor ya levantado con el mismo catálogo")
+    parser.add_argument("--conexiones", type=int, default=32, help="clientes keep-alive simultáneos")
+    parser.add_argument("--duracion", type=float, default=10.0, help="segundos de medición")
+    parser.add_argument("--escrituras", type=float, default=0.1, help="fracción de pedidos que ajustan stock")
+    parser.add_argument("--listados", type=float, default=0.1, help="fracción de pedidos que listan 10 productos")
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--salida", help="archivo del informe JSON (por defecto, la salida estándar)")
+    args = parser.parse_args(argumentos)
+    args.puerto = args.puerto or _puerto_libre()
+
+    nombres = [r["nombre"] for r in catalogo.generar_registros(args.catalogo, args.semilla)]
+    proceso = None
+    trabajo = tempfile.mkdtemp(prefix="carga_")
+    try:
+        if not args.sin_servidor:
+            archivo = os.path.join(trabajo, "productos.json")
+            catalogo.escribir_catalogo(archivo, args.catalogo, args.semilla)
+            if args.backend == "sqlite":
+                import gestionproductossqlite
+                with open(os.devnull, 'w') as nulo, redirect_stdout(nulo):
+                    base = gestionproductossqlite.Inventario(os.path.join(trabajo, "productos.db"))
+                    base.importar_json(archivo)
+                    base.cerrar()
+                archivo = os.path.join(trabajo, "productos.db")
+            proceso = subprocess.Popen([
+                sys.executable, os.path.join(RAIZ, "gestionproductosservidor.py"), "--backend", args.backend,
+                "--archivo", archivo, "--escuchar", args.host, "--puerto", str(args.puerto), "--silencioso"
+            ], stderr=subprocess.DEVNULL)
+        asyncio.run(_esperar_servidor(args.host, args.puerto))
+        print(f"Midiendo {args.conexiones} conexiones durante {args.duracion} s...", file=sys.stderr)
+        resultado = asyncio.run(medir(args, nombres))
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait()
+        shutil.rmtree(trabajo, ignore_errors=True)
+
+    informe = {
+        "backend": None if args.sin_servidor else args.backend,
+        "catalogo": args.catalogo,
+        "conexiones": args.conexiones,
+        "duracion_s": args.duracion,
+        "escrituras": args.escrituras,
+        "listados": args.listados,
+        "resultado": resultado
+    }
+    texto = json.dumps(informe, indent=4)
+    if args.salida:
+        with open(args.salida, 'w') as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+if __name__ == "__main__":
+    main()
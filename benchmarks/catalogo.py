@@ -0,0 +1,53 @@
+import argparse
+import os
+import random
+import sys
+import uuid
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import gestionproductos
+
+_HARDWARE = ("mouse", "teclado", "monitor", "auriculares", "impresora", "disco ssd", "memoria ram", "router", "webcam", "parlante")
+_SOFTWARE = ("microsoft office 365", "microsoft windows", "antivirus", "editor de video", "suite contable", "gestor de bases de datos", "ide", "vpn")
+_MARCAS = ("acme", "globex", "initech", "umbrella", "hooli", "stark", "wayne", "tyrell")
+
+# Las fechas de expiración se cuentan desde una fecha fija y no desde hoy, así
+# el catálogo de una semilla no cambia de un día a otro
+FECHA_REFERENCIA = date(2026, 1, 1)
+
+# Registros con el formato de productos.json: 60% hardware y 40% software, con
+# nombres únicos y una parte de las licencias ya vencidas. Con la misma semilla
+# se obtiene siempre el mismo catálogo
+def generar_registros(cantidad, semilla=1234, referencia=FECHA_REFERENCIA):
+    azar = random.Random(semilla)
+    base = referencia.toordinal()
+    for i in range(cantidad):
+        registro = {"id": str(uuid.UUID(int=azar.getrandbits(128), version=4))}
+        if azar.random() < 0.6:
+            registro["nombre"] = f"{azar.choice(_HARDWARE)} {azar.choice(_MARCAS)} {i}"
+            registro["precio"] = round(azar.uniform(5, 2000), 2)
+            registro["cantidad_en_stock"] = azar.randint(0, 1000)
+            registro["garantia"] = str(azar.randint(0, 5))
+            registro["tipo"] = "hardware"
+        else:
+            registro["nombre"] = f"{azar.choice(_SOFTWARE)} {azar.choice(_MARCAS)} {i}"
+            registro["precio"] = round(azar.uniform(1, 500), 2)
+            registro["cantidad_en_stock"] = azar.randint(0, 5000)
+            registro["fecha_expiracion"] = gestionproductos.ordinal_a_fecha(base + azar.randint(-365, 3 * 365))
+            registro["tipo"] = "software"
+        yield registro
+
+# Escribe el catálogo sin armarlo completo en memoria
+def escribir_catalogo(archivo, cantidad, semilla=1234, referencia=FECHA_REFERENCIA):
+    with open(archivo, 'w') as f:
+        gestionproductos.escribir_registros(f, generar_registros(cantidad, semilla, referencia))
+
+# Por ejemplo: python benchmarks/catalogo.py catalogo.json 100000
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera un catálogo sintético de productos.")
+    parser.add_argument("archivo")
+    parser.add_argument("cantidad", type=int)
+    parser.add_argument("--semilla", type=int, default=1234)
+    args = parser.parse_args()
+    escribir_catalogo(args.archivo, args.cantidad, args.semilla)
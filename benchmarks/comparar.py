@@ -0,0 +1,47 @@
+import argparse
+import json
+import sys
+
+# Compara dos informes de benchmark.py y marca como regresión toda operación
+# cuyo rendimiento bajó, o cuya latencia p99 subió, más que `umbral` (0.10 = 10%)
+def comparar(anterior, actual, umbral=0.10):
+    previos = {(r["backend"], r["tamano"]): r for r in anterior["resultados"]}
+    filas = []
+    for resultado in actual["resultados"]:
+        previo = previos.get((resultado["backend"], resultado["tamano"]))
+        if previo is None:
+            continue
+        for operacion, medida in resultado["operaciones"].items():
+            medida_previa = previo["operaciones"].get(operacion)
+            if not medida_previa or not medida.get("ops_s") or not medida_previa.get("ops_s"):
+                continue
+            cambio_ops = medida["ops_s"] / medida_previa["ops_s"] - 1
+            cambio_p99 = None
+            if medida.get("p99_ms") and medida_previa.get("p99_ms"):
+                cambio_p99 = medida["p99_ms"] / medida_previa["p99_ms"] - 1
+            regresion = cambio_ops < -umbral or (cambio_p99 is not None and cambio_p99 > umbral)
+            filas.append((resultado["backend"], resultado["tamano"], operacion, cambio_ops, cambio_p99, regresion))
+    return filas
+
+def _porcentaje(cambio):
+    return "" if cambio is None else f"{cambio * 100:+.1f}%"
+
+# Por ejemplo: python benchmarks/comparar.py base.json nuevo.json --umbral 0.05
+# Termina con código 1 si hubo regresiones
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara dos informes de benchmark.py.")
+    parser.add_argument("anterior")
+    parser.add_argument("actual")
+    parser.add_argument("--umbral", type=float, default=0.10)
+    args = parser.parse_args()
+    with open(args.anterior) as f:
+        anterior = json.load(f)
+    with open(args.actual) as f:
+        actual = json.load(f)
+
+    filas = comparar(anterior, actual, args.umbral)
+    print(f"{'backend':<8} {'filas':>9} {'operación':<11} {'ops/s':>9} {'p99':>9}")
+    for backend, tamano, operacion, cambio_ops, cambio_p99, regresion in filas:
+        marca = "  <- regresión" if regresion else ""
+        print(f"{backend:<8} {tamano:>9} {operacion:<11} {_porcentaje(cambio_ops):>9} {_porcentaje(cambio_p99):>9}{marca}")
+    sys.exit(1 if any(fila[-1] for fila in filas) else 0)
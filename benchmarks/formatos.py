@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+import gestionproductos
+import gestionproductosbinario
+from benchmark import _commit_actual, cronometrar, rss_pico_kb
+
+# Formas de cargar el catálogo: el arreglo completo con json.load, Inventario
+# sobre el JSON (perezoso) y el binario con mmap, solo o dentro de Inventario
+CASOS = ("json.load", "inventario_json", "binario", "inventario_binario")
+
+def _cargar(caso, archivo_json, archivo_binario):
+    if caso == "json.load":
+        with open(archivo_json) as f:
+            return json.load(f)
+    if caso == "inventario_json":
+        return gestionproductos.Inventario(archivo_json, carga_perezosa=True, respaldos=0)
+    if caso == "binario":
+        return gestionproductosbinario.abrir(archivo_binario)
+    return gestionproductos.Inventario(archivo_binario, formato="binario", respaldos=0)
+
+def _leer_todo(productos):
+    for producto in productos:
+        producto.to_dict()
+
+# Carga con un caso y lee unos productos; se ejecuta en un proceso aparte para
+# que el pico de RSS sea solo el de esa carga
+def ejecutar_caso(args):
+    rss_base = rss_pico_kb()
+    with open(os.devnull, 'w') as nulo, redirect_stdout(nulo):
+        cargado, segundos = cronometrar(lambda: _cargar(args.caso, args.json, args.binario))
+        # Recorre todos los productos, que en los casos perezosos se decodifican
+        # recién ahora; json.load ya los decodificó al cargar
+        if args.caso.startswith("inventario"):
+            _, lectura = cronometrar(lambda: _leer_todo(cargado.iterar_productos()))
+        elif args.caso == "binario":
+            _, lectura = cronometrar(lambda: _leer_todo(cargado))
+        else:
+            lectura = 0.0
+    resultado = {"caso": args.caso, "tamano": args.tamano, "carga_s": segundos, "lectura_total_s": lectura,
+                 "rss_base_kb": rss_base, "rss_pico_kb": rss_pico_kb()}
+    with open(args.salida_caso, 'w') as f:
+        json.dump(resultado, f)
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Compara el formato JSON y el binario: tamaño, carga y memoria.")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[100000, 1000000], help="filas de cada catálogo")
+    parser.add_argument("--casos", nargs="+", choices=CASOS, default=list(CASOS))
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--salida", help="archivo del informe JSON (por defecto, la salida estándar)")
+    # Uso interno: ejecución de un caso en el proceso hijo
+    parser.add_argument("--caso", choices=CASOS, help=argparse.SUPPRESS)
+    parser.add_argument("--json", help=argparse.SUPPRESS)
+    parser.add_argument("--binario", help=argparse.SUPPRESS)
+    parser.add_argument("--salida-caso", help=argparse.SUPPRESS)
+    args = parser.parse_args(argumentos)
+
+    if args.caso:
+        args.tamano = args.tamanos[0]
+        ejecutar_caso(args)
+        return
+
+    datos = tempfile.mkdtemp(prefix="benchmarks_")
+    resultados = []
+    try:
+        for tamano in args.tamanos:
+            print(f"Generando catálogo de {tamano} productos...", file=sys.stderr)
+            archivo_json = os.path.join(datos, f"catalogo_{tamano}.json")
+            archivo_binario = os.path.join(datos, f"catalogo_{tamano}.bin")
+            # Se generan en procesos aparte: el pico de RSS de este proceso lo
+            # heredarían los casos medidos
+            subprocess.run([sys.executable, os.path.join(RAIZ, "benchmarks", "catalogo.py"), archivo_json, str(tamano),
+                            "--semilla", str(args.semilla)], check=True)
+            subprocess.run([sys.executable, os.path.join(RAIZ, "gestionproductosbinario.py"), "a-binario",
+                            archivo_json, archivo_binario], check=True, stdout=subprocess.DEVNULL)
+            tamanos_archivo = {"json_bytes": os.path.getsize(archivo_json), "binario_bytes": os.path.getsize(archivo_binario)}
+            for caso in args.casos:
+                print(f"Midiendo {caso} con {tamano} productos...", file=sys.stderr)
+                salida_caso = os.path.join(datos, "caso.json")
+                comando = [
+                    sys.executable, os.path.abspath(__file__), "--caso", caso, "--tamanos", str(tamano),
+                    "--json", archivo_json, "--binario", archivo_binario, "--salida-caso", salida_caso
+                ]
+                if subprocess.run(comando).returncode != 0:
+                    print(f"Error al medir {caso} con {tamano} productos.", file=sys.stderr)
+                    continue
+                with open(salida_caso) as f:
+                    resultados.append({**json.load(f), **tamanos_archivo})
+    finally:
+        shutil.rmtree(datos, ignore_errors=True)
+
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_actual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "semilla": args.semilla,
+        "resultados": resultados
+    }
+    texto = json.dumps(informe, indent=4)
+    if args.salida:
+        with open(args.salida, 'w') as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+# Por ejemplo: python benchmarks/formatos.py --tamanos 100000 1000000 --salida formatos.json
+if __name__ == "__main__":
+    main()
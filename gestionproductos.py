@@ -1,17 +1,44 @@
 import json
+import math
 import os
 import platform
 import re
-from datetime import datetime
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, datetime
+from heapq import nlargest, nsmallest
+from itertools import compress, islice, repeat
+from operator import contains
 import uuid
+import gestionproductosbinario
+import gestionproductosmetricas
+import gestionproductosreportes
+from gestionproductosbackend import InventarioBackend
 
-# Función para limpiar la pantalla
+try:
+    import fcntl
+except ImportError:  # Windows no tiene fcntl: no hay bloqueo entre procesos
+    fcntl = None
+
+# Función para limpiar la pantalla. Sin terminal (salida redirigida o entrada
+# por tubería) no hace nada; en el resto usa códigos ANSI en lugar de lanzar
+# un proceso `clear` en cada vuelta del menú
 def limpiar_pantalla():
-    sistema = platform.system()
-    if sistema == "Windows":
-        os.system("cls")
+    if not sys.stdout.isatty():
+        return
+    if platform.system() == "Windows":
+        os.system("cls")  # La consola clásica de Windows no interpreta ANSI
     else:
-        os.system("clear")
+        sys.stdout.write("\033[H\033[2J")
+        sys.stdout.flush()
 
 # Función para validar el tipo de producto
 def validar_tipo_producto(tipo):
@@ -20,18 +47,46 @@ def validar_tipo_producto(tipo):
     tipo_normalizado = tipo.strip().lower()
     return tipo_normalizado in tipos_validos
 
+_FECHA = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+
 # Función para validar la fecha en formato dd/mm/aaaa
 def validar_fecha(fecha):
+    # Camino rápido para el formato habitual; strptime queda para el resto
+    coincidencia = _FECHA.fullmatch(fecha)
     try:
-        datetime.strptime(fecha, "%d/%m/%Y")
+        if coincidencia:
+            dia, mes, anio = coincidencia.groups()
+            date(int(anio), int(mes), int(dia))
+        else:
+            datetime.strptime(fecha, "%d/%m/%Y")
         return True
     except ValueError:
         return False
 
+# Convierte una fecha dd/mm/aaaa (o un date) en su número ordinal, comparable y ordenable
+def fecha_a_ordinal(fecha):
+    if isinstance(fecha, int):
+        return fecha
+    if isinstance(fecha, date):
+        return fecha.toordinal()
+    coincidencia = _FECHA.fullmatch(fecha)
+    if coincidencia:
+        dia, mes, anio = coincidencia.groups()
+        return date(int(anio), int(mes), int(dia)).toordinal()
+    return datetime.strptime(fecha, "%d/%m/%Y").toordinal()
+
+# Formato de presentación dd/mm/aaaa de un ordinal de fecha
+def ordinal_a_fecha(ordinal):
+    fecha = date.fromordinal(ordinal)
+    return f"{fecha.day:02d}/{fecha.month:02d}/{fecha.year:04d}"
+
 # Clase base Producto
 class Producto:
-    def __init__(self, nombre, precio, cantidad_en_stock):
-        self.id = str(uuid.uuid4())  # Generar un ID único
+    # __slots__ evita el __dict__ por instancia, que pesa en inventarios grandes
+    __slots__ = ("id", "nombre", "precio", "cantidad_en_stock")
+
+    def __init__(self, nombre, precio, cantidad_en_stock, id=None):
+        self.id = id if id is not None else str(uuid.uuid4())  # Generar un ID único
         if not isinstance(nombre, str) or not nombre.strip():
             raise ValueError("El producto debe contener un nombre. Por favor ingresalo!!")
         if not isinstance(precio, (int, float)) or precio <= 0:
@@ -50,20 +105,33 @@ class Producto:
             "cantidad_en_stock": self.cantidad_en_stock
         }
 
+    # Con validar=False se confía en que el registro ya fue validado al
+    # guardarse y se arma el objeto directamente, sin pasar por __init__
     @staticmethod
-    def from_dict(data):
-        producto = Producto(
+    def from_dict(data, validar=True):
+        if not validar:
+            producto = Producto.__new__(Producto)
+            producto._cargar(data)
+            return producto
+        return Producto(
             data["nombre"],
             data["precio"],
-            data["cantidad_en_stock"]
+            data["cantidad_en_stock"],
+            id=data.get("id")
         )
-        producto.id = data.get("id", str(uuid.uuid4()))
-        return producto
+
+    def _cargar(self, data):
+        self.id = data["id"] if "id" in data else str(uuid.uuid4())
+        self.nombre = data["nombre"]
+        self.precio = data["precio"]
+        self.cantidad_en_stock = data["cantidad_en_stock"]
 
 # Clase derivada ProductoHardware
 class ProductoHardware(Producto):
-    def __init__(self, nombre, precio, cantidad_en_stock, garantia):
-        super().__init__(nombre, precio, cantidad_en_stock)
+    __slots__ = ("garantia",)
+
+    def __init__(self, nombre, precio, cantidad_en_stock, garantia, id=None):
+        super().__init__(nombre, precio, cantidad_en_stock, id)
         if not isinstance(garantia, str) or not garantia.strip():
             raise ValueError("Si el producto no tiene garantía, escriba '0'.")
         self.garantia = garantia
@@ -75,18 +143,27 @@ class ProductoHardware(Producto):
         return data
 
     @staticmethod
-    def from_dict(data):
+    def from_dict(data, validar=True):
+        if not validar:
+            producto = ProductoHardware.__new__(ProductoHardware)
+            producto._cargar(data)
+            producto.garantia = data["garantia"]
+            return producto
         return ProductoHardware(
             data["nombre"],
             data["precio"],
             data["cantidad_en_stock"],
-            data["garantia"]
+            data["garantia"],
+            id=data.get("id")
         )
 
 # Clase derivada ProductoSoftware
 class ProductoSoftware(Producto):
-    def __init__(self, nombre, precio, cantidad_en_stock, fecha_expiracion):
-        super().__init__(nombre, precio, cantidad_en_stock)
+    # La fecha se guarda como ordinal; el texto dd/mm/aaaa es solo de entrada y salida
+    __slots__ = ("fecha_ordinal",)
+
+    def __init__(self, nombre, precio, cantidad_en_stock, fecha_expiracion, id=None):
+        super().__init__(nombre, precio, cantidad_en_stock, id)
         if not isinstance(fecha_expiracion, str) or not fecha_expiracion.strip():
             raise ValueError("La fecha de expiración no debe quedar en blanco. Si no tiene fecha de expiracion use: '31/12/2999'")
         if not validar_fecha(fecha_expiracion):
@@ -99,115 +176,1345 @@ class ProductoSoftware(Producto):
         data["tipo"] = "software"
         return data
 
+    @property
+    def fecha_expiracion(self):
+        return ordinal_a_fecha(self.fecha_ordinal)
+
+    @fecha_expiracion.setter
+    def fecha_expiracion(self, valor):
+        self.fecha_ordinal = fecha_a_ordinal(valor)
+
+    def expirado(self, hoy=None):
+        return self.fecha_ordinal < fecha_a_ordinal(hoy or date.today())
+
     @staticmethod
-    def from_dict(data):
+    def from_dict(data, validar=True):
+        if not validar:
+            producto = ProductoSoftware.__new__(ProductoSoftware)
+            producto._cargar(data)
+            producto.fecha_expiracion = data["fecha_expiracion"]
+            return producto
         return ProductoSoftware(
             data["nombre"],
             data["precio"],
             data["cantidad_en_stock"],
-            data["fecha_expiracion"]
+            data["fecha_expiracion"],
+            id=data.get("id")
         )
 
+# Función para reconstruir un producto a partir de su diccionario según su tipo
+def producto_desde_dict(data, validar=True):
+    if data["tipo"] == "hardware":
+        return ProductoHardware.from_dict(data, validar)
+    elif data["tipo"] == "software":
+        return ProductoSoftware.from_dict(data, validar)
+    return None
+
+_ESPACIOS = re.compile(r'[ \t\n\r]*')
+_decodificador = json.JSONDecoder()
+
+# Generador que recorre el arreglo JSON de un archivo elemento por elemento,
+# sin leer el archivo completo en memoria
+def iterar_registros(archivo, tamano_bloque=64 * 1024):
+    with open(archivo, 'r') as f:
+        buffer = ""
+        pos = 0
+        fin_archivo = False
+
+        def leer_mas():
+            nonlocal buffer, pos, fin_archivo
+            bloque = f.read(tamano_bloque)
+            if not bloque:
+                fin_archivo = True
+                return False
+            buffer = buffer[pos:] + bloque
+            pos = 0
+            return True
+
+        def siguiente_caracter():
+            nonlocal pos
+            while True:
+                pos = _ESPACIOS.match(buffer, pos).end()
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not leer_mas():
+                    raise json.JSONDecodeError("Fin de archivo inesperado", buffer, pos)
+
+        if siguiente_caracter() != "[":
+            raise json.JSONDecodeError("Se esperaba un arreglo JSON", buffer, pos)
+        pos += 1
+        if siguiente_caracter() == "]":
+            return
+        while True:
+            siguiente_caracter()
+            while True:
+                try:
+                    elemento, fin = _decodificador.raw_decode(buffer, pos)
+                    # Un valor que termina justo en el borde del bloque podría estar cortado
+                    if fin < len(buffer) or fin_archivo:
+                        break
+                except json.JSONDecodeError:
+                    if fin_archivo:
+                        raise
+                if not leer_mas():
+                    elemento, fin = _decodificador.raw_decode(buffer, pos)
+                    break
+            pos = fin
+            yield elemento
+            separador = siguiente_caracter()
+            pos += 1
+            if separador == "]":
+                return
+            if separador != ",":
+                raise json.JSONDecodeError("Se esperaba ',' o ']'", buffer, pos - 1)
+
+# Generador de solo lectura para reportes: construye un producto por vez
+# directamente desde el archivo, sin armar la lista completa
+def iterar_productos_archivo(archivo, validar=True):
+    for data in iterar_registros(archivo):
+        producto = producto_desde_dict(data, validar)
+        if producto:
+            yield producto
+
+# Escribe los registros como un arreglo JSON con el mismo formato que
+# json.dump(..., indent=4), pero sin armar la lista completa en memoria
+def escribir_registros(f, registros):
+    primero = True
+    for data in registros:
+        f.write("[\n    " if primero else ",\n    ")
+        f.write(json.dumps(data, indent=4).replace("\n", "\n    "))
+        primero = False
+    f.write("[]" if primero else "\n]")
+
+# Texto de un producto en el listado, armado en un solo string
+def formatear_producto(producto, hoy=None):
+    lineas = [
+        "\n" + "-" * 40,
+        f"ID: {producto.id}",
+        f"Nombre del producto: {producto.nombre}",
+        f"Precio: ${producto.precio:.2f}",
+        f"Cantidad en stock: {producto.cantidad_en_stock}"
+    ]
+    if isinstance(producto, ProductoHardware):
+        lineas.append(f"Garantía: {producto.garantia} años")
+    elif isinstance(producto, ProductoSoftware):
+        aviso = " (expirada)" if producto.expirado(hoy) else ""
+        lineas.append(f"Fecha de expiración: {producto.fecha_expiracion}{aviso}")
+    lineas.append("-" * 40)
+    return "\n".join(lineas) + "\n"
+
+# Escribe los bloques de texto del listado con una escritura por página de
+# `tamano_pagina` bloques; con paginar=True pregunta antes de cada página
+# siguiente. Devuelve la cantidad de bloques escritos
+def escribir_listado(bloques, salida=None, tamano_pagina=1000, paginar=False):
+    salida = salida or sys.stdout
+    iterador = iter(bloques)
+    total = 0
+    pagina = list(islice(iterador, tamano_pagina))
+    while pagina:
+        salida.write("".join(pagina))
+        salida.flush()
+        total += len(pagina)
+        pagina = list(islice(iterador, tamano_pagina))
+        if pagina and paginar and input("\nEnter para ver más, 'q' para terminar: ").strip().lower() == "q":
+            break
+    return total
+
+_HARDWARE = 0
+_SOFTWARE = 1
+
+# Los 16 bytes de un id en la forma canónica de UUID (minúsculas con guiones),
+# o None si no la tiene. Evita armar un uuid.UUID por fila
+def _bytes_uuid(texto):
+    if (isinstance(texto, str) and len(texto) == 36 and texto[8] == texto[13] == texto[18] == texto[23] == "-"
+            and texto == texto.lower()):
+        try:
+            crudo = bytes.fromhex(texto.replace("-", ""))
+        except ValueError:
+            return None
+        return crudo if len(crudo) == 16 else None
+    return None
+
+# Vista liviana sobre una fila de ColumnasProductos; expone los mismos
+# atributos que ProductoHardware/ProductoSoftware sin copiar los datos
+class VistaProducto:
+    __slots__ = ("_columnas", "_fila")
+
+    def __init__(self, columnas, fila):
+        self._columnas = columnas
+        self._fila = fila
+
+    @property
+    def id(self):
+        return self._columnas.id_de(self._fila)
+
+    @property
+    def nombre(self):
+        return self._columnas.nombres[self._fila]
+
+    @property
+    def precio(self):
+        return self._columnas.precios[self._fila]
+
+    @precio.setter
+    def precio(self, valor):
+        self._columnas.precios[self._fila] = valor
+
+    @property
+    def cantidad_en_stock(self):
+        return self._columnas.stock[self._fila]
+
+    @cantidad_en_stock.setter
+    def cantidad_en_stock(self, valor):
+        self._columnas.stock[self._fila] = valor
+
+    @property
+    def tipo(self):
+        return "hardware" if self._columnas.tipos[self._fila] == _HARDWARE else "software"
+
+    @property
+    def garantia(self):
+        if self._columnas.tipos[self._fila] != _HARDWARE:
+            raise AttributeError("garantia")
+        return self._columnas.extras[self._fila]
+
+    @property
+    def fecha_ordinal(self):
+        if self._columnas.tipos[self._fila] != _SOFTWARE:
+            raise AttributeError("fecha_ordinal")
+        return self._columnas.fechas[self._fila]
+
+    @property
+    def fecha_expiracion(self):
+        return ordinal_a_fecha(self.fecha_ordinal)
+
+    def to_dict(self):
+        data = {
+            "id": self.id,
+            "nombre": self.nombre,
+            "precio": self.precio,
+            "cantidad_en_stock": self.cantidad_en_stock
+        }
+        if self._columnas.tipos[self._fila] == _HARDWARE:
+            data["garantia"] = self.garantia
+        else:
+            data["fecha_expiracion"] = self.fecha_expiracion
+        data["tipo"] = self.tipo
+        return data
+
+# Almacenamiento por columnas: ids de 16 bytes, precios y stock en arreglos
+# numéricos y el tipo como un byte por fila
+class ColumnasProductos:
+    # Tipo de cada valor de la columna `tipos`
+    TIPOS = ("hardware", "software")
+
+    def __init__(self):
+        self.ids = bytearray()
+        self.nombres = []
+        self.precios = array('d')
+        self.stock = array('q')
+        self.tipos = bytearray()
+        self.extras = []  # garantía de los productos de hardware
+        self.fechas = array('l')  # ordinal de la fecha de expiración, 0 en hardware
+        self._ids_texto = {}  # ids que no son UUID, por fila
+
+    @classmethod
+    def desde_registros(cls, registros):
+        columnas = cls()
+        for data in registros:
+            columnas.agregar(data)
+        return columnas
+
+    @classmethod
+    def desde_archivo(cls, archivo):
+        return cls.desde_registros(iterar_registros(archivo))
+
+    def agregar(self, producto):
+        data = producto if isinstance(producto, dict) else producto.to_dict()
+        fila = len(self.nombres)
+        crudo = _bytes_uuid(data.get("id"))
+        if crudo is not None:
+            self.ids += crudo
+        else:
+            self.ids += bytes(16)
+            self._ids_texto[fila] = data["id"] if "id" in data else str(uuid.uuid4())
+        self.nombres.append(data["nombre"])
+        self.precios.append(data["precio"])
+        self.stock.append(data["cantidad_en_stock"])
+        if data["tipo"] == "hardware":
+            self.tipos.append(_HARDWARE)
+            self.extras.append(data["garantia"])
+            self.fechas.append(0)
+        else:
+            self.tipos.append(_SOFTWARE)
+            self.extras.append(None)
+            self.fechas.append(fecha_a_ordinal(data["fecha_expiracion"]))
+        return fila
+
+    def id_de(self, fila):
+        if fila in self._ids_texto:
+            return self._ids_texto[fila]
+        return str(uuid.UUID(bytes=bytes(self.ids[fila * 16:fila * 16 + 16])))
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def __getitem__(self, fila):
+        if not -len(self) <= fila < len(self):
+            raise IndexError(fila)
+        return VistaProducto(self, fila % len(self))
+
+    def __iter__(self):
+        for fila in range(len(self)):
+            yield VistaProducto(self, fila)
+
+# Forma de comparar nombres en las búsquedas: minúsculas, sin tildes y con
+# los espacios colapsados ("  Mouse  Óptico" -> "mouse optico")
+def normalizar_nombre(nombre):
+    if nombre.isascii():
+        return " ".join(nombre.lower().split())
+    texto = unicodedata.normalize("NFKD", nombre.casefold())
+    return " ".join("".join(c for c in texto if not unicodedata.combining(c)).split())
+
+# Trigramas de un nombre normalizado; los espacios de los extremos marcan el
+# comienzo y el final de la palabra
+def trigramas(normalizado):
+    relleno = f" {normalizado} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+# Índice de nombres para buscar_productos: una lista ordenada de nombres
+# normalizados para los prefijos (un trie aplanado: los nombres con un mismo
+# prefijo quedan contiguos) y un índice invertido trigrama -> posiciones para
+# las subcadenas y los nombres parecidos. Al armarlo, las posiciones siguen el
+# orden (largo, nombre), así las listas de posiciones ya están en el orden de
+# los resultados; las altas posteriores van al final. Las bajas solo marcan la
+# posición; el índice se rearma cuando la mitad quedó sin uso
+class IndiceNombres:
+    # Proporción mínima de trigramas de la búsqueda que debe tener un nombre parecido
+    SIMILITUD_MINIMA = 0.5
+    # Posiciones que se cuentan como máximo para elegir los nombres parecidos
+    PRESUPUESTO = 100000
+    # Nombres parecidos que se comparan trigrama por trigrama
+    CANDIDATOS = 500
+
+    def __init__(self, pares=()):
+        self._armar((id_producto, normalizar_nombre(nombre)) for id_producto, nombre in pares)
+
+    def _armar(self, normalizados):
+        self._ids = []  # posición -> id (None si se quitó)
+        self._normalizados = []  # posición -> nombre normalizado
+        self._posiciones = {}  # id -> posición
+        self._trigramas = {}  # trigrama -> array de posiciones
+        self._quitados = 0
+        for id_producto, normalizado in sorted(normalizados, key=lambda par: (len(par[1]), par[1])):
+            self._registrar(id_producto, normalizado)
+        self._armados = len(self._ids)  # posiciones en orden (largo, nombre)
+        self._ordenados = sorted(zip(self._normalizados, self._ids))  # (nombre normalizado, id)
+
+    def __len__(self):
+        return len(self._posiciones)
+
+    def _registrar(self, id_producto, normalizado):
+        posicion = len(self._ids)
+        self._ids.append(id_producto)
+        self._normalizados.append(normalizado)
+        self._posiciones[id_producto] = posicion
+        for trigrama in trigramas(normalizado):
+            lista = self._trigramas.get(trigrama)
+            if lista is None:
+                lista = self._trigramas[trigrama] = array('i')
+            lista.append(posicion)
+
+    def agregar(self, id_producto, nombre):
+        self.quitar(id_producto)
+        normalizado = normalizar_nombre(nombre)
+        self._registrar(id_producto, normalizado)
+        insort(self._ordenados, (normalizado, id_producto))
+
+    def quitar(self, id_producto):
+        posicion = self._posiciones.pop(id_producto, None)
+        if posicion is None:
+            return
+        clave = (self._normalizados[posicion], id_producto)
+        i = bisect_left(self._ordenados, clave)
+        if i < len(self._ordenados) and self._ordenados[i] == clave:
+            del self._ordenados[i]
+        self._ids[posicion] = None
+        self._normalizados[posicion] = ""
+        self._quitados += 1
+        if self._quitados > 1000 and self._quitados * 2 > len(self._ids):
+            self._rearmar()
+
+    def _rearmar(self):
+        self._armar([(id_producto, normalizado) for id_producto, normalizado in zip(self._ids, self._normalizados)
+                     if id_producto is not None])
+
+    # Posiciones cuyo nombre contiene `consulta`; el filtro corre en C
+    def _contienen(self, consulta, posiciones):
+        return compress(posiciones, map(contains, map(self._normalizados.__getitem__, posiciones), repeat(consulta)))
+
+    # Ids de hasta `limite` productos: primero el nombre exacto y los que empiezan
+    # con el texto (en orden alfabético), después los que lo contienen (los más
+    # cortos primero) y por último los parecidos, de más a menos trigramas en común
+    def buscar(self, texto, limite=10):
+        consulta = normalizar_nombre(texto)
+        if not consulta or limite <= 0:
+            return []
+        resultado = []
+        i = bisect_left(self._ordenados, (consulta,))
+        while i < len(self._ordenados) and len(resultado) < limite:
+            normalizado, id_producto = self._ordenados[i]
+            if not normalizado.startswith(consulta):
+                break
+            resultado.append(id_producto)
+            i += 1
+        if len(resultado) >= limite or len(consulta) < 3:
+            return resultado
+        vistos = set(resultado)
+
+        # Subcadenas: todo nombre que contiene la consulta tiene sus trigramas
+        # internos; basta revisar la lista de posiciones más corta. En la parte
+        # armada alcanza con las primeras coincidencias; las altas posteriores
+        # se revisan todas
+        normalizados = self._normalizados
+        internos = [self._trigramas.get(consulta[i:i + 3]) for i in range(len(consulta) - 2)]
+        if all(internos):
+            candidatos = min(internos, key=len)
+            cuantos = limite + len(resultado)
+            armados = bisect_left(candidatos, self._armados)
+            contienen = list(islice(self._contienen(consulta, candidatos[:armados]), cuantos))
+            contienen.extend(self._contienen(consulta, candidatos[armados:]))
+            for _, _, p in nsmallest(cuantos, ((len(normalizados[p]), normalizados[p], p) for p in contienen)):
+                id_producto = self._ids[p]
+                if id_producto not in vistos and len(resultado) < limite:
+                    resultado.append(id_producto)
+                    vistos.add(id_producto)
+            if len(resultado) >= limite:
+                return resultado
+
+        # Parecidos: se cuentan las apariciones de cada nombre en las listas de
+        # trigramas más cortas (las que más distinguen) hasta el presupuesto, y
+        # los que más aparecen se comparan con todos los trigramas de la consulta
+        buscados = trigramas(consulta)
+        listas = sorted((self._trigramas[t] for t in buscados if t in self._trigramas), key=len)
+        minimo = max(1, math.ceil(self.SIMILITUD_MINIMA * len(buscados)))
+        if len(listas) < minimo:
+            return resultado
+        apariciones = Counter(listas[0])
+        contadas = len(listas[0])
+        for lista in listas[1:]:
+            contadas += len(lista)
+            if contadas > self.PRESUPUESTO:
+                break
+            apariciones.update(lista)
+        piso = 0
+        elegidos = 0
+        for veces, cantidad in sorted(Counter(apariciones.values()).items(), reverse=True):
+            if elegidos >= self.CANDIDATOS:
+                break
+            piso = veces
+            elegidos += cantidad
+        candidatos = islice(compress(apariciones, map(piso.__le__, apariciones.values())), 2 * self.CANDIDATOS)
+        parecidos = []
+        for p in candidatos:
+            id_producto = self._ids[p]
+            if id_producto is None or id_producto in vistos:
+                continue
+            comunes = len(buscados & trigramas(normalizados[p]))
+            if comunes >= minimo:
+                parecidos.append((comunes, -len(normalizados[p]), id_producto))
+        resultado.extend(id_producto for _, _, id_producto in nlargest(limite - len(resultado), parecidos))
+        return resultado
+
+# Campos con índice ordenado para consultas por rango
+CAMPOS_CONSULTABLES = ("precio", "cantidad_en_stock", "fecha_expiracion")
+
+# Centinela mayor que cualquier id, para cotas superiores inclusivas en bisect
+class _Mayor:
+    def __lt__(self, otro):
+        return False
+
+    def __gt__(self, otro):
+        return True
+
+_MAYOR = _Mayor()
+
+def _clave_indice(entrada, campo):
+    if not isinstance(entrada, dict):
+        if campo == "fecha_expiracion":
+            return getattr(entrada, "fecha_ordinal", None)
+        return getattr(entrada, campo, None)
+    valor = entrada.get(campo)
+    if valor is not None and campo == "fecha_expiracion":
+        return fecha_a_ordinal(valor)
+    return valor
+
+# Tipo, precio y stock de un producto o de un registro perezoso, para los agregados
+def _valores_agregados(entrada):
+    if isinstance(entrada, dict):
+        return entrada["tipo"], entrada["precio"], entrada["cantidad_en_stock"]
+    if isinstance(entrada, VistaProducto):
+        tipo = entrada.tipo
+    else:
+        tipo = "hardware" if isinstance(entrada, ProductoHardware) else "software"
+    return tipo, entrada.precio, entrada.cantidad_en_stock
+
+# Identifica una versión del archivo sin leerlo. El guardado reemplaza el
+# archivo por uno nuevo, así que el inodo cambia aunque la fecha y el tamaño
+# coincidan
+def _firma(ruta):
+    try:
+        estado = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return estado.st_ino, estado.st_mtime_ns, estado.st_size
+
+def _tamano(ruta):
+    try:
+        return os.stat(ruta).st_size
+    except FileNotFoundError:
+        return 0
+
+# Formatos del archivo de Inventario: el JSON de siempre o el binario de
+# gestionproductosbinario, que se carga con mmap
+FORMATOS = ("json", "binario")
+
 # Clase Inventario
-class Inventario:
-    def __init__(self, archivo):
+class Inventario(InventarioBackend):
+    def __init__(self, archivo, journal=False, max_registros_journal=10000, max_bytes_journal=16 * 1024 * 1024, respaldos=1, fsync=True, guardar_cada=1, guardar_cada_segundos=None, carga_perezosa=False, validar_al_cargar=True, compartido=False, formato="json"):
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato desconocido: '{formato}'. Use uno de: {', '.join(FORMATOS)}.")
+        # Un archivo binario abierto como JSON se tomaría por dañado y se apartaría
+        if formato == "json" and gestionproductosbinario.es_binario(archivo):
+            raise ValueError(f"El archivo {archivo} está en formato binario; use formato='binario'.")
         self.archivo = archivo
-        self.productos = self.cargar_productos()
+        # Con formato="binario" el archivo usa el formato de gestionproductosbinario:
+        # se abre con mmap y cada producto queda como una VistaProducto sobre el
+        # archivo mapeado hasta que se modifica, sin importar carga_perezosa. El
+        # guardado reemplaza el archivo por uno nuevo, así que las vistas siguen
+        # leyendo el anterior, que el sistema conserva mientras esté mapeado
+        self.formato = formato
+        # Con compartido=True varios procesos pueden usar el mismo archivo: cada
+        # escritura toma un bloqueo exclusivo (fcntl) sobre archivo + ".lock",
+        # incorpora antes los cambios ajenos y guarda al terminar, sin esperar a
+        # guardar_cada. Las lecturas comparan la firma del archivo y el tamaño del
+        # journal y solo releen si otro proceso escribió. Con journal=True se
+        # leen únicamente las líneas nuevas del journal
+        self.compartido = compartido
+        self._fd_bloqueo = None
+        # Con validar_al_cargar=False los registros del archivo y del journal se
+        # consideran ya validados y se cargan sin pasar por los constructores
+        self.validar_al_cargar = validar_al_cargar
+        # Con carga_perezosa=True los registros quedan como diccionarios hasta
+        # que se accede al producto
+        self.carga_perezosa = carga_perezosa
+        # Política de guardado: se persiste cada `guardar_cada` operaciones o
+        # cuando pasaron `guardar_cada_segundos` desde el último guardado
+        self.guardar_cada = guardar_cada
+        self.guardar_cada_segundos = guardar_cada_segundos
+        self._pendientes = []
+        self._ultimo_guardado = time.monotonic()
+        self._transaccion = None
+        # Protege los ajustes de stock y las transacciones entre hilos
+        self._lock = threading.RLock()
+        # Cantidad de generaciones anteriores que se conservan como .bak
+        self.respaldos = respaldos
+        self.fsync = fsync
+        # Con journal=True cada cambio se agrega como una línea JSON al journal
+        # y el archivo principal solo se reescribe al compactar
+        self.journal = journal
+        self.archivo_journal = archivo + ".journal"
+        self.max_registros_journal = max_registros_journal
+        self.max_bytes_journal = max_bytes_journal
+        self._registros_journal = 0
+        self._bytes_journal = 0
+        # Bytes del journal ya incorporados al estado en memoria y firma del
+        # archivo principal leído o escrito por última vez
+        self._posicion_journal = 0
+        self._firma_archivo = None
+        # Índices en memoria: id -> producto (conserva el orden) y nombre -> id
+        self._por_id = {}
+        self._por_nombre = {}
+        # Índices ordenados (clave, id) por campo; se arman en la primera consulta
+        self._indices = None
+        # Índice de nombres de buscar_productos; se arma en la primera búsqueda
+        self._indice_nombres = None
+        # Totales de resumen() y copia por columnas de reporte(); los totales se
+        # arman en el primer resumen y se actualizan con cada cambio, la copia
+        # se descarta con cada cambio y se rearma en el reporte siguiente
+        self._agregados = None
+        self._columnas_reporte = None
+        with self._bloqueo_archivo():
+            productos = self.cargar_productos()
+            if productos and isinstance(productos[0], VistaProducto):
+                self._indexar_vistas(productos)
+            else:
+                for producto in productos:
+                    self._indexar(producto)
+            # El journal se reproduce siempre, por si quedó de una ejecución en modo journal
+            self._reproducir_journal()
+            if not self.journal and self._registros_journal:
+                self.compactar()
+            self._firma_archivo = _firma(self.archivo)
+            # Si el archivo binario cargado es exactamente el inventario, reporte()
+            # usa sus columnas mapeadas en lugar de armar una copia
+            if (productos and isinstance(productos[0], VistaProducto) and len(productos) == len(self._por_id)
+                    and not self._registros_journal):
+                self._columnas_reporte = productos[0]._columnas
+
+    @property
+    def productos(self):
+        if self.compartido:
+            self.sincronizar()
+        return [self._materializar(id_producto) for id_producto in self._por_id]
+
+    # Recorre el inventario sin materializar los registros perezosos; los
+    # productos devueltos para esos registros son copias de solo lectura
+    def iterar_productos(self):
+        if self.compartido:
+            self.sincronizar()
+        for entrada in self._por_id.values():
+            if isinstance(entrada, dict):
+                yield producto_desde_dict(entrada, self.validar_al_cargar)
+            elif isinstance(entrada, VistaProducto):
+                yield producto_desde_dict(entrada.to_dict(), self.validar_al_cargar)
+            else:
+                yield entrada
+
+    def __len__(self):
+        if self.compartido:
+            self.sincronizar()
+        return len(self._por_id)
+
+    # Copia compacta por columnas del inventario, pensada para reportes
+    def columnas(self):
+        if self.compartido:
+            self.sincronizar()
+        return ColumnasProductos.desde_registros(
+            p if isinstance(p, dict) else p.to_dict() for p in self._por_id.values())
+
+    def _materializar(self, id_producto):
+        entrada = self._por_id.get(id_producto)
+        if isinstance(entrada, VistaProducto):
+            entrada = entrada.to_dict()
+        if isinstance(entrada, dict):
+            entrada = producto_desde_dict(entrada, self.validar_al_cargar)
+            self._por_id[id_producto] = entrada
+        return entrada
+
+    def _indexar(self, producto):
+        if isinstance(producto, dict):
+            id_producto, nombre = producto["id"], producto["nombre"]
+        else:
+            id_producto, nombre = producto.id, producto.nombre
+        self._por_id[id_producto] = producto
+        self._por_nombre.setdefault(nombre, id_producto)
+        if self._indices is not None:
+            self._agregar_a_indices(producto, id_producto)
+        if self._indice_nombres is not None:
+            self._indice_nombres.agregar(id_producto, nombre)
+        if self._agregados is not None:
+            self._agregados.sumar(*_valores_agregados(producto))
+        self._columnas_reporte = None
+
+    # Carga inicial de un archivo binario: ids y nombres se decodifican de una
+    # vez por columna en lugar de producto por producto
+    def _indexar_vistas(self, vistas):
+        columnas = vistas[0]._columnas
+        ids = columnas.ids.todos()
+        self._por_id.update(zip(ids, vistas))
+        for nombre, id_producto in zip(columnas.nombres.todos(), ids):
+            self._por_nombre.setdefault(nombre, id_producto)
+
+    def _desindexar(self, producto):
+        self._por_id.pop(producto.id, None)
+        if self._por_nombre.get(producto.nombre) == producto.id:
+            del self._por_nombre[producto.nombre]
+        if self._indices is not None:
+            self._quitar_de_indices(producto, producto.id)
+        if self._indice_nombres is not None:
+            self._indice_nombres.quitar(producto.id)
+        if self._agregados is not None:
+            self._agregados.restar(*_valores_agregados(producto))
+        self._columnas_reporte = None
+
+    def _construir_indices(self):
+        indices = {campo: [] for campo in CAMPOS_CONSULTABLES}
+        for id_producto, entrada in self._por_id.items():
+            for campo, indice in indices.items():
+                clave = _clave_indice(entrada, campo)
+                if clave is not None:
+                    indice.append((clave, id_producto))
+        for indice in indices.values():
+            indice.sort()
+        self._indices = indices
+
+    def _agregar_a_indices(self, entrada, id_producto):
+        for campo, indice in self._indices.items():
+            clave = _clave_indice(entrada, campo)
+            if clave is not None:
+                insort(indice, (clave, id_producto))
+
+    def _quitar_de_indices(self, entrada, id_producto):
+        for campo, indice in self._indices.items():
+            clave = _clave_indice(entrada, campo)
+            if clave is None:
+                continue
+            posicion = bisect_left(indice, (clave, id_producto))
+            if posicion < len(indice) and indice[posicion] == (clave, id_producto):
+                del indice[posicion]
+
+    # Aplica los cambios de atributos (salvo el nombre) manteniendo los índices
+    def _modificar(self, producto, cambios):
+        indexados = self._indices is not None and any(campo in self._indices for campo in cambios)
+        agregados = self._agregados is not None and ("precio" in cambios or "cantidad_en_stock" in cambios)
+        if indexados:
+            self._quitar_de_indices(producto, producto.id)
+        if agregados:
+            self._agregados.restar(*_valores_agregados(producto))
+        for campo, valor in cambios.items():
+            if campo != "nombre":
+                setattr(producto, campo, valor)
+        if indexados:
+            self._agregar_a_indices(producto, producto.id)
+        if agregados:
+            self._agregados.sumar(*_valores_agregados(producto))
+        self._columnas_reporte = None
+
+    def _renombrar(self, producto, nuevo_nombre):
+        if nuevo_nombre == producto.nombre:
+            return
+        if nuevo_nombre in self._por_nombre:
+            raise ValueError("Producto con el mismo nombre ya existe.")
+        if self._por_nombre.get(producto.nombre) == producto.id:
+            del self._por_nombre[producto.nombre]
+        producto.nombre = nuevo_nombre
+        self._por_nombre[nuevo_nombre] = producto.id
+        if self._indice_nombres is not None:
+            self._indice_nombres.agregar(producto.id, nuevo_nombre)
+
+    def _ruta_respaldo(self, generacion):
+        if generacion == 0:
+            return self.archivo + ".bak"
+        return f"{self.archivo}.bak.{generacion}"
 
     def cargar_productos(self):
-        try:
-            with open(self.archivo, 'r') as f:
-                data = json.load(f)
+        # Se intenta el archivo principal y luego cada respaldo, del más nuevo al más viejo
+        rutas = [self.archivo] + [self._ruta_respaldo(i) for i in range(self.respaldos)]
+        encontrado = False
+        for ruta in rutas:
+            if self.formato == "binario":
+                try:
+                    columnas = gestionproductosbinario.abrir(ruta, verificar=self.validar_al_cargar)
+                except FileNotFoundError:
+                    continue
+                except (OSError, ValueError) as e:
+                    encontrado = True
+                    print(f"Error al leer el archivo binario {ruta}: {e}")
+                    continue
+                if ruta != self.archivo:
+                    print(f"Se recuperaron los productos desde el respaldo {ruta}.")
+                return list(map(VistaProducto, repeat(columnas), range(len(columnas))))
+            try:
                 productos = []
-                for item in data:
-                    if item["tipo"] == "hardware":
-                        productos.append(ProductoHardware.from_dict(item))
+                for item in iterar_registros(ruta):
+                    if self.carga_perezosa:
+                        if item["tipo"] in ("hardware", "software"):
+                            if "id" not in item:
+                                item["id"] = str(uuid.uuid4())
+                            productos.append(item)
+                    elif item["tipo"] == "hardware":
+                        productos.append(ProductoHardware.from_dict(item, self.validar_al_cargar))
                     elif item["tipo"] == "software":
-                        productos.append(ProductoSoftware.from_dict(item))
-                return productos
-        except FileNotFoundError:
+                        productos.append(ProductoSoftware.from_dict(item, self.validar_al_cargar))
+            except FileNotFoundError:
+                continue
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                encontrado = True
+                print(f"Error al decodificar el archivo JSON {ruta}.")
+                continue
+            if ruta != self.archivo:
+                print(f"Se recuperaron los productos desde el respaldo {ruta}.")
+            return productos
+        if not encontrado:
             print("Archivo no encontrado. Se creará uno nuevo al guardar.")
             return []
-        except json.JSONDecodeError:
-            print("Error al decodificar el archivo JSON.")
-            return []
+        # Se aparta el archivo dañado para que el próximo guardado no lo pise
+        if os.path.exists(self.archivo):
+            try:
+                os.replace(self.archivo, self.archivo + ".corrupto")
+                print(f"El archivo dañado se movió a {self.archivo}.corrupto.")
+            except OSError:
+                pass
+        return []
+
+    def _rotar_respaldos(self):
+        if self.respaldos <= 0 or not os.path.exists(self.archivo):
+            return
+        for generacion in range(self.respaldos - 1, 0, -1):
+            anterior = self._ruta_respaldo(generacion - 1)
+            if os.path.exists(anterior):
+                os.replace(anterior, self._ruta_respaldo(generacion))
+        respaldo = self._ruta_respaldo(0)
+        if os.path.exists(respaldo):
+            os.remove(respaldo)
+        try:
+            os.link(self.archivo, respaldo)
+        except OSError:
+            shutil.copy2(self.archivo, respaldo)
+
+    def _sincronizar_directorio(self, directorio):
+        if not self.fsync or not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(directorio, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
 
     def guardar_productos(self):
+        # Se escribe en un temporal del mismo directorio y se renombra encima del
+        # archivo, de modo que un corte a mitad de escritura nunca lo deja truncado
+        directorio = os.path.dirname(os.path.abspath(self.archivo))
+        temporal = None
         try:
-            with open(self.archivo, 'w') as f:
-                json.dump([p.to_dict() for p in self.productos], f, indent=4)
-        except IOError:
+            fd, temporal = tempfile.mkstemp(prefix=os.path.basename(self.archivo) + ".", suffix=".tmp", dir=directorio)
+            registros = (p if isinstance(p, dict) else p.to_dict() for p in self._por_id.values())
+            with os.fdopen(fd, 'wb' if self.formato == "binario" else 'w') as f:
+                if self.formato == "binario":
+                    gestionproductosbinario.escribir(f, registros)
+                else:
+                    escribir_registros(f, registros)
+                f.flush()
+                if gestionproductosmetricas.activas:
+                    gestionproductosmetricas.contar("gestionproductos_bytes_escritos_total", f.tell(), backend="json", destino="archivo")
+                inicio_fsync = time.perf_counter()
+                if self.fsync:
+                    os.fsync(f.fileno())
+                if gestionproductosmetricas.activas and self.fsync:
+                    gestionproductosmetricas.observar("gestionproductos_fsync_segundos", time.perf_counter() - inicio_fsync, backend="json")
+            if os.path.exists(self.archivo):
+                shutil.copymode(self.archivo, temporal)
+            self._rotar_respaldos()
+            os.replace(temporal, self.archivo)
+            temporal = None
+            self._firma_archivo = _firma(self.archivo)
+            self._sincronizar_directorio(directorio)
+            return True
+        except (IOError, OSError):
             print("Error al guardar el archivo.")
+            return False
+        finally:
+            if temporal is not None and os.path.exists(temporal):
+                os.remove(temporal)
 
-    def agregar_producto(self, producto):
-        if self.obtener_producto(producto.nombre):
-            print("Producto con el mismo nombre ya existe.")
+    # Aplica las líneas del journal a partir del byte `desde`
+    def _reproducir_journal(self, desde=0):
+        try:
+            with open(self.archivo_journal, 'rb') as f:
+                f.seek(desde)
+                for linea in f:
+                    # Una línea sin salto final quedó cortada por una escritura
+                    # interrumpida, aunque lo escrito alcance a decodificarse
+                    if not linea.endswith(b"\n"):
+                        break
+                    try:
+                        registro = json.loads(linea)
+                    except json.JSONDecodeError:
+                        # Línea incompleta por una escritura interrumpida
+                        break
+                    try:
+                        self._aplicar_registro(registro)
+                    except ValueError as e:
+                        print(f"No se pudo aplicar un registro del journal: {e}")
+                    self._registros_journal += 1
+                    self._bytes_journal += len(linea)
+                    desde += len(linea)
+        except FileNotFoundError:
+            desde = 0
+        self._posicion_journal = desde
+
+    # Bloqueo entre procesos sobre un archivo aparte: el archivo de datos se
+    # reemplaza en cada guardado y un bloqueo sobre él no lo cubriría. Es
+    # reentrante dentro del proceso; se usa siempre bajo self._lock
+    @contextmanager
+    def _bloqueo_archivo(self, exclusivo=True):
+        if not self.compartido or fcntl is None or self._fd_bloqueo is not None:
+            yield
+            return
+        fd = os.open(self.archivo + ".lock", os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusivo else fcntl.LOCK_SH)
+            self._fd_bloqueo = fd
+            try:
+                yield
+            finally:
+                self._fd_bloqueo = None
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    # Operación de escritura: en modo compartido se hace con el bloqueo
+    # exclusivo, sobre el estado ya sincronizado, y se guarda antes de soltarlo
+    @contextmanager
+    def _escritura(self):
+        with self._lock:
+            if not self.compartido or self._transaccion is not None or self._fd_bloqueo is not None:
+                yield
+                return
+            with self._bloqueo_archivo():
+                self.sincronizar()
+                yield
+                self.guardar_pendientes()
+
+    # Incorpora lo que otros procesos escribieron desde la última lectura. Si el
+    # archivo principal no cambió solo se aplican las líneas nuevas del journal;
+    # si cambió se relee y se fusiona. Devuelve True si hubo cambios
+    def sincronizar(self):
+        with self._lock:
+            if (_firma(self.archivo) == self._firma_archivo
+                    and _tamano(self.archivo_journal) == self._posicion_journal):
+                return False
+            with self._bloqueo_archivo(exclusivo=False):
+                if (_firma(self.archivo) != self._firma_archivo
+                        or _tamano(self.archivo_journal) < self._posicion_journal):
+                    self._recargar()
+                else:
+                    self._reproducir_journal(self._posicion_journal)
+            return True
+
+    def _recargar(self):
+        self._firma_archivo = _firma(self.archivo)
+        try:
+            if self.formato == "binario":
+                registros = list(gestionproductosbinario.abrir(self.archivo, verificar=self.validar_al_cargar).registros())
+            else:
+                registros = [item for item in iterar_registros(self.archivo)
+                             if "id" in item and item.get("tipo") in ("hardware", "software")]
+        except FileNotFoundError:
+            registros = []
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            print(f"Error al decodificar el archivo {'binario' if self.formato == 'binario' else 'JSON'} {self.archivo}.")
+            return
+        try:
+            self._fusionar(registros)
+        except ValueError:
+            # Un nombre que sigue en uso no debería darse con un archivo válido;
+            # antes que quedar a medias se arma todo desde el archivo
+            self._reconstruir(registros)
+        self._registros_journal = 0
+        self._bytes_journal = 0
+        self._reproducir_journal()
+
+    # Deja el inventario igual a `registros` tocando solo los productos que
+    # difieren; los demás conservan su objeto y sus entradas en los índices.
+    # Lanza ValueError si un nombre del archivo sigue ocupado por otro producto
+    def _fusionar(self, registros):
+        nuevos = {data["id"]: data for data in registros}
+        for id_producto in [i for i in self._por_id if i not in nuevos]:
+            self._desindexar(self._materializar(id_producto))
+        # Los nombres que cambian se liberan antes de aplicar los cambios, así
+        # un intercambio de nombres entre dos productos no choca consigo mismo
+        for id_producto, data in nuevos.items():
+            entrada = self._por_id.get(id_producto)
+            if entrada is None:
+                continue
+            nombre = entrada["nombre"] if isinstance(entrada, dict) else entrada.nombre
+            if nombre != data["nombre"] and self._por_nombre.get(nombre) == id_producto:
+                del self._por_nombre[nombre]
+        for id_producto, data in nuevos.items():
+            entrada = self._por_id.get(id_producto)
+            if entrada is not None:
+                actual = entrada if isinstance(entrada, dict) else entrada.to_dict()
+                if actual == data:
+                    continue
+                if actual["tipo"] == data["tipo"]:
+                    cambios = {campo: valor for campo, valor in data.items()
+                               if campo not in ("id", "tipo") and actual.get(campo) != valor}
+                    self._aplicar_registro({"op": "actualizar", "id": id_producto, "cambios": cambios})
+                    continue
+                self._desindexar(self._materializar(id_producto))
+            if data["nombre"] in self._por_nombre:
+                raise ValueError("Producto con el mismo nombre ya existe.")
+            producto = data if self.carga_perezosa else producto_desde_dict(data, self.validar_al_cargar)
+            if producto:
+                self._indexar(producto)
+
+    # Rearma el inventario completo desde `registros`, sin conservar objetos
+    def _reconstruir(self, registros):
+        self._por_id = {}
+        self._por_nombre = {}
+        self._indices = None
+        self._indice_nombres = None
+        self._agregados = None
+        self._columnas_reporte = None
+        for data in registros:
+            producto = data if self.carga_perezosa else producto_desde_dict(data, self.validar_al_cargar)
+            if producto:
+                self._indexar(producto)
+
+    def _aplicar_registro(self, registro):
+        op = registro["op"]
+        if op == "agregar":
+            data = registro["producto"]
+            if data["id"] in self._por_id or data["nombre"] in self._por_nombre:
+                return
+            producto = producto_desde_dict(data, self.validar_al_cargar)
+            if producto:
+                self._indexar(producto)
+        elif op == "actualizar":
+            producto = self._materializar(registro["id"])
+            if producto is None:
+                return
+            cambios = dict(registro["cambios"])
+            if "nombre" in cambios:
+                self._renombrar(producto, cambios.pop("nombre"))
+            self._modificar(producto, cambios)
+        elif op == "eliminar":
+            producto = self._materializar(registro["id"])
+            if producto is not None:
+                self._desindexar(producto)
+
+    def _persistir(self, registro):
+        self._pendientes.append(registro)
+        if self._transaccion is not None:
             return
-        self.productos.append(producto)
-        self.guardar_productos()
+        if len(self._pendientes) >= self.guardar_cada:
+            self.guardar_pendientes()
+        elif (self.guardar_cada_segundos is not None
+                and time.monotonic() - self._ultimo_guardado >= self.guardar_cada_segundos):
+            self.guardar_pendientes()
+
+    # Persiste de una sola vez todas las operaciones que quedaron pendientes
+    def guardar_pendientes(self):
+        if not self._pendientes:
+            return True
+        if not self.journal:
+            if not self.guardar_productos():
+                return False
+        else:
+            lineas = "".join(json.dumps(r, separators=(',', ':')) + "\n" for r in self._pendientes)
+            try:
+                with open(self.archivo_journal, 'a') as f:
+                    # Una línea cortada por una escritura interrumpida detiene la
+                    # reproducción; se descarta para que lo que sigue sea legible
+                    if os.fstat(f.fileno()).st_size > self._posicion_journal:
+                        f.truncate(self._posicion_journal)
+                    f.write(lineas)
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+                    self._posicion_journal = os.fstat(f.fileno()).st_size
+            except IOError:
+                print("Error al escribir el journal.")
+                return False
+            self._registros_journal += len(self._pendientes)
+            self._bytes_journal += len(lineas)
+            if gestionproductosmetricas.activas:
+                gestionproductosmetricas.contar("gestionproductos_bytes_escritos_total", len(lineas), backend="json", destino="journal")
+        self._pendientes = []
+        self._ultimo_guardado = time.monotonic()
+        if self.journal and (self._registros_journal >= self.max_registros_journal
+                             or self._bytes_journal >= self.max_bytes_journal):
+            self.compactar()
+        return True
+
+    # Agrupa varias operaciones en un único guardado; si el bloque termina con
+    # una excepción se restaura el estado en memoria previo
+    @contextmanager
+    def transaccion(self):
+        with self._escritura():
+            if self._transaccion is not None:
+                yield self
+                return
+            self._transaccion = {
+                "por_id": self._por_id.copy(),
+                "por_nombre": self._por_nombre.copy(),
+                "pendientes": len(self._pendientes),
+                "estados": {},
+            }
+            try:
+                yield self
+            except BaseException:
+                self._deshacer_transaccion()
+                raise
+            else:
+                self._transaccion = None
+                self.guardar_pendientes()
+
+    def _antes_de_modificar(self, producto):
+        if self._transaccion is not None and producto.id not in self._transaccion["estados"]:
+            self._transaccion["estados"][producto.id] = (producto, producto.to_dict())
+
+    def _deshacer_transaccion(self):
+        respaldo = self._transaccion
+        self._transaccion = None
+        for producto, data in respaldo["estados"].values():
+            for campo, valor in data.items():
+                if campo not in ("id", "tipo"):
+                    setattr(producto, campo, valor)
+        self._por_id = respaldo["por_id"]
+        self._por_nombre = respaldo["por_nombre"]
+        self._indices = None
+        self._indice_nombres = None
+        self._agregados = None
+        self._columnas_reporte = None
+        del self._pendientes[respaldo["pendientes"]:]
+
+    # Guarda lo pendiente; debe llamarse antes de terminar el programa
+    def cerrar(self):
+        self.guardar_pendientes()
+
+    # Vuelca el estado actual en el archivo principal y vacía el journal
+    def compactar(self):
+        with self._escritura():
+            if not self.guardar_productos():
+                return
+            self._pendientes = []
+            try:
+                open(self.archivo_journal, 'w').close()
+            except IOError:
+                print("Error al vaciar el journal.")
+                return
+            self._registros_journal = 0
+            self._bytes_journal = 0
+            self._posicion_journal = 0
+
+    def agregar_producto(self, producto):
+        with self._escritura():
+            if producto.nombre in self._por_nombre:
+                print("Producto con el mismo nombre ya existe.")
+                return
+            if producto.id in self._por_id:
+                print("Producto con el mismo ID ya existe.")
+                return
+            self._indexar(producto)
+            self._persistir({"op": "agregar", "producto": producto.to_dict()})
         print(f"Producto {producto.nombre} agregado exitosamente.")
 
     def obtener_producto(self, nombre):
-        for producto in self.productos:
-            if producto.nombre == nombre:
-                return producto
-        return None
+        if self.compartido:
+            self.sincronizar()
+        id_producto = self._por_nombre.get(nombre)
+        if id_producto is None:
+            return None
+        return self._materializar(id_producto)
+
+    def obtener_producto_por_id(self, id_producto):
+        if self.compartido:
+            self.sincronizar()
+        return self._materializar(id_producto)
+
+    def buscar_productos(self, texto, limite=10):
+        if self.compartido:
+            self.sincronizar()
+        if self._indice_nombres is None:
+            self._indice_nombres = IndiceNombres(
+                (id_producto, entrada["nombre"] if isinstance(entrada, dict) else entrada.nombre)
+                for id_producto, entrada in self._por_id.items())
+        return [self._materializar(id_producto) for id_producto in self._indice_nombres.buscar(texto, limite)]
 
     def actualizar_producto(self, nombre, nuevo_nombre=None, nuevo_precio=None, nueva_cantidad=None, nueva_garantia=None, nueva_fecha=None):
-        producto = self.obtener_producto(nombre)
+        with self._escritura():
+            self._actualizar(self.obtener_producto(nombre), nombre, nuevo_nombre, nuevo_precio, nueva_cantidad, nueva_garantia, nueva_fecha)
+
+    def actualizar_producto_por_id(self, id_producto, nuevo_nombre=None, nuevo_precio=None, nueva_cantidad=None, nueva_garantia=None, nueva_fecha=None):
+        with self._escritura():
+            self._actualizar(self.obtener_producto_por_id(id_producto), id_producto, nuevo_nombre, nuevo_precio, nueva_cantidad, nueva_garantia, nueva_fecha)
+
+    def _actualizar(self, producto, clave, nuevo_nombre, nuevo_precio, nueva_cantidad, nueva_garantia, nueva_fecha):
         if producto:
             try:
+                self._antes_de_modificar(producto)
+                cambios = {}
+                if isinstance(producto, ProductoSoftware) and nueva_fecha is not None and nueva_fecha.strip() != '':
+                    if not validar_fecha(nueva_fecha):
+                        raise ValueError("La nueva fecha debe estar en el formato dd/mm/aaaa.")
+                    cambios["fecha_expiracion"] = nueva_fecha
                 if nuevo_nombre is not None:
-                    producto.nombre = nuevo_nombre
+                    self._renombrar(producto, nuevo_nombre)
+                    cambios["nombre"] = nuevo_nombre
                 if nuevo_precio is not None:
-                    producto.precio = nuevo_precio
+                    cambios["precio"] = nuevo_precio
                 if nueva_cantidad is not None:
-                    producto.cantidad_en_stock = nueva_cantidad
+                    cambios["cantidad_en_stock"] = nueva_cantidad
                 if isinstance(producto, ProductoHardware) and nueva_garantia is not None:
                     if not nueva_garantia.strip():
                         nueva_garantia = '0'
-                    producto.garantia = nueva_garantia
-                if isinstance(producto, ProductoSoftware) and nueva_fecha is not None:
-                    if nueva_fecha.strip() == '':
-                        nueva_fecha = producto.fecha_expiracion
-                    elif validar_fecha(nueva_fecha):
-                        producto.fecha_expiracion = nueva_fecha
-                    else:
-                        raise ValueError("La nueva fecha debe estar en el formato dd/mm/aaaa.")
-                self.guardar_productos()
-                print(f"Producto {nombre} actualizado exitosamente.")
+                    cambios["garantia"] = nueva_garantia
+                self._modificar(producto, cambios)
+                self._persistir({"op": "actualizar", "id": producto.id, "cambios": cambios})
+                print(f"Producto {clave} actualizado exitosamente.")
             except ValueError as e:
                 print(f"Error al actualizar el producto: {e}")
         else:
             print("Producto no encontrado.")
 
     def eliminar_producto(self, nombre):
-        producto = self.obtener_producto(nombre)
+        with self._escritura():
+            self._eliminar(self.obtener_producto(nombre), nombre)
+
+    def eliminar_producto_por_id(self, id_producto):
+        with self._escritura():
+            self._eliminar(self.obtener_producto_por_id(id_producto), id_producto)
+
+    def _eliminar(self, producto, clave):
         if producto:
-            self.productos.remove(producto)
-            self.guardar_productos()
-            print(f"Producto {nombre} eliminado exitosamente.")
+            self._desindexar(producto)
+            self._persistir({"op": "eliminar", "id": producto.id})
+            print(f"Producto {clave} eliminado exitosamente.")
         else:
             print("Producto no encontrado.")
 
-    def listar_productos(self):
-        if not self.productos:
+    # Busca por id y, si no hay coincidencia, por nombre
+    def _buscar(self, clave):
+        id_producto = clave if clave in self._por_id else self._por_nombre.get(clave)
+        if id_producto is None:
+            return None
+        return self._materializar(id_producto)
+
+    # Suma `delta` (negativo para descontar) al stock del producto con ese id o
+    # nombre. La lectura y la escritura ocurren bajo el lock, así los ajustes
+    # concurrentes no se pisan y el stock nunca queda negativo
+    def ajustar_stock(self, clave, delta):
+        if not isinstance(delta, int):
+            print("El ajuste de stock debe ser un entero.")
+            return False
+        with self._escritura():
+            producto = self._buscar(clave)
+            if producto is None:
+                print("Producto no encontrado.")
+                return False
+            nueva_cantidad = producto.cantidad_en_stock + delta
+            if nueva_cantidad < 0:
+                print(f"Stock insuficiente para {clave}.")
+                return False
+            self._antes_de_modificar(producto)
+            cambios = {"cantidad_en_stock": nueva_cantidad}
+            self._modificar(producto, cambios)
+            self._persistir({"op": "actualizar", "id": producto.id, "cambios": cambios})
+        return True
+
+    # Aplica una lista de (id o nombre, delta) con un único guardado; los ajustes
+    # que dejarían el stock negativo se rechazan sin afectar a los demás
+    def ajustar_stock_lote(self, ajustes):
+        aplicados = rechazados = 0
+        with self.transaccion():
+            for clave, delta in ajustes:
+                if self.ajustar_stock(clave, delta):
+                    aplicados += 1
+                else:
+                    rechazados += 1
+        print(f"{aplicados} ajustes de stock aplicados, {rechazados} rechazados.")
+        return aplicados
+
+    # Alta masiva: agrega productos (objetos o diccionarios) con un único guardado;
+    # los nombres o ids ya existentes se omiten
+    def agregar_productos(self, productos):
+        agregados = omitidos = 0
+        with self.transaccion():
+            for producto in productos:
+                if isinstance(producto, dict):
+                    producto = producto_desde_dict(producto)
+                if producto is None or producto.nombre in self._por_nombre or producto.id in self._por_id:
+                    omitidos += 1
+                    continue
+                self._indexar(producto)
+                self._persistir({"op": "agregar", "producto": producto.to_dict()})
+                agregados += 1
+        print(f"{agregados} productos agregados, {omitidos} omitidos.")
+        return agregados
+
+    # Actualización masiva por nombre con un único guardado: los productos que no
+    # existen se agregan y los existentes toman precio, stock y garantía/fecha
+    def actualizar_productos(self, productos):
+        agregados = actualizados = 0
+        with self.transaccion():
+            for producto in productos:
+                data = producto if isinstance(producto, dict) else producto.to_dict()
+                existente = self.obtener_producto(data["nombre"])
+                if existente is None:
+                    nuevo = producto_desde_dict(data)
+                    if nuevo is None or nuevo.id in self._por_id:
+                        continue
+                    self._indexar(nuevo)
+                    self._persistir({"op": "agregar", "producto": nuevo.to_dict()})
+                    agregados += 1
+                    continue
+                cambios = {"precio": data["precio"], "cantidad_en_stock": data["cantidad_en_stock"]}
+                if isinstance(existente, ProductoHardware) and "garantia" in data:
+                    cambios["garantia"] = data["garantia"]
+                if isinstance(existente, ProductoSoftware) and "fecha_expiracion" in data:
+                    cambios["fecha_expiracion"] = data["fecha_expiracion"]
+                self._antes_de_modificar(existente)
+                self._modificar(existente, cambios)
+                self._persistir({"op": "actualizar", "id": existente.id, "cambios": cambios})
+                actualizados += 1
+        print(f"{actualizados} productos actualizados, {agregados} agregados.")
+        return agregados + actualizados
+
+    # Productos con `campo` entre minimo y maximo (ambos inclusive), ordenados por
+    # ese campo. Usa el índice ordenado: O(log n + k)
+    def consultar_rango(self, campo, minimo=None, maximo=None, limite=None, descendente=False):
+        if campo not in CAMPOS_CONSULTABLES:
+            raise ValueError(f"No se puede consultar por el campo '{campo}'.")
+        if self.compartido:
+            self.sincronizar()
+        if campo == "fecha_expiracion":
+            minimo = fecha_a_ordinal(minimo) if minimo is not None else None
+            maximo = fecha_a_ordinal(maximo) if maximo is not None else None
+        if self._indices is None:
+            self._construir_indices()
+        indice = self._indices[campo]
+        inicio = 0 if minimo is None else bisect_left(indice, (minimo,))
+        fin = len(indice) if maximo is None else bisect_right(indice, (maximo, _MAYOR))
+        posiciones = range(fin - 1, inicio - 1, -1) if descendente else range(inicio, fin)
+        if limite is not None:
+            posiciones = posiciones[:limite]
+        return [self._materializar(indice[i][1]) for i in posiciones]
+
+    # Productos de software cuya fecha de expiración es anterior a `antes_de` (hoy por defecto)
+    def productos_expirados(self, antes_de=None, limite=None):
+        antes_de = fecha_a_ordinal(antes_de or date.today())
+        return self.consultar_rango("fecha_expiracion", maximo=antes_de - 1, limite=limite)
+
+    # Los totales, incluido el stock bajo con el umbral por defecto, se
+    # mantienen con cada cambio; con otro umbral el stock bajo se cuenta con el
+    # índice ordenado de stock
+    def resumen(self, umbral_stock=5):
+        if self.compartido:
+            self.sincronizar()
+        if self._agregados is None:
+            self._agregados = gestionproductosreportes.Agregados(map(_valores_agregados, self._por_id.values()))
+        if umbral_stock == self._agregados.umbral_stock:
+            return self._agregados.resumen()
+        if self._indices is None:
+            self._construir_indices()
+        stock_bajo = bisect_left(self._indices["cantidad_en_stock"], (umbral_stock,))
+        return self._agregados.resumen(stock_bajo, umbral_stock)
+
+    # Se calcula sobre una copia por columnas que se conserva hasta el próximo cambio
+    def reporte(self, por, limites=None):
+        limites = gestionproductosreportes.validar_agrupacion(por, limites)
+        if self.compartido:
+            self.sincronizar()
+        if self._columnas_reporte is None:
+            self._columnas_reporte = self.columnas()
+        return gestionproductosreportes.agrupar_columnas(self._columnas_reporte, por, limites)
+
+    # Con paginar=True muestra `tamano_pagina` productos por vez
+    def listar_productos(self, paginar=False, tamano_pagina=1000, salida=None):
+        if self.compartido:
+            self.sincronizar()
+        if not self._por_id:
             print("No hay productos en el inventario.")
             return
 
-        for producto in self.productos:
-            print("\n" + "-" * 40)
-            print(f"ID: {producto.id}")
-            print(f"Nombre del producto: {producto.nombre}")
-            print(f"Precio: ${producto.precio:.2f}")
-            print(f"Cantidad en stock: {producto.cantidad_en_stock}")
-
-            if isinstance(producto, ProductoHardware):
-                print(f"Garantía: {producto.garantia} años")
-            elif isinstance(producto, ProductoSoftware):
-                print(f"Fecha de expiración: {producto.fecha_expiracion}")
+        hoy = date.today().toordinal()
+        bloques = (formatear_producto(producto, hoy) for producto in self.iterar_productos())
+        escribir_listado(bloques, salida, tamano_pagina, paginar)
 
-            print("-" * 40)
+gestionproductosmetricas.registrar_clase(Inventario, "json")
 
 # Función para mostrar el menú
 def mostrar_menu():
@@ -253,67 +1560,96 @@ def validar_cantidad(valor):
         print(f"Error: {e}")
         return None
 
-# Función principal
-def main():
-    inventario = Inventario('productos.json')  # Nombre del archivo
+# Ante un nombre inexistente sugiere los más parecidos
+def producto_no_encontrado(inventario, nombre):
+    print("Producto no encontrado.")
+    sugerencias = inventario.buscar_productos(nombre, 5)
+    if sugerencias:
+        print("¿Quiso decir? " + ", ".join(producto.nombre for producto in sugerencias))
 
+# Menú interactivo; funciona con cualquier InventarioBackend
+def ejecutar_menu(inventario):
     while True:
         limpiar_pantalla()
         mostrar_menu()
         opcion = obtener_opcion()
 
         if opcion == 1:
-            tipo = ""
+            tipo = input("Ingrese el tipo de producto ('hardware' o 'software'): ").lower().strip()
             while not validar_tipo_producto(tipo):
-                tipo = input("Tipo de producto (hardware/software): ").strip().lower()
-                if not validar_tipo_producto(tipo):
-                    print("Tipo de producto no válido. Por favor, ingrese 'hardware' o 'software'.")
+                print("Tipo de producto inválido. Por favor, ingrese 'hardware' o 'software'.")
+                tipo = input("Ingrese el tipo de producto ('hardware' o 'software'): ").lower().strip()
+
+            nombre = input("Ingrese el nombre del producto: ").strip()
+            while not nombre:
+                print("El nombre del producto no debe estar vacío.")
+                nombre = input("Ingrese el nombre del producto: ").strip()
 
-            nombre = input("Nombre del producto: ").strip()
             precio = None
             while precio is None:
-                precio = validar_precio(input("Precio: "))
+                precio = validar_precio(input("Ingrese el precio del producto: "))
 
             cantidad = None
             while cantidad is None:
-                cantidad = validar_cantidad(input("Cantidad en stock: "))
+                cantidad = validar_cantidad(input("Ingrese la cantidad en stock: "))
 
             if tipo == "hardware":
-                garantia = input("Garantía (en años, ingrese 0 si no tiene): ").strip()
+                garantia = input("Ingrese la garantía del producto (en años, 0 si no tiene): ").strip()
+                while not garantia:
+                    print("La garantía no debe estar vacía.")
+                    garantia = input("Ingrese la garantía del producto (en años, 0 si no tiene): ").strip()
                 producto = ProductoHardware(nombre, precio, cantidad, garantia)
             elif tipo == "software":
-                fecha_expiracion = ""
+                fecha_expiracion = input("Ingrese la fecha de expiración del producto (dd/mm/aaaa): ").strip()
                 while not validar_fecha(fecha_expiracion):
-                    fecha_expiracion = input("Fecha de expiración (dd/mm/aaaa): ").strip()
-                    if not validar_fecha(fecha_expiracion):
-                        print("Fecha de expiración no válida. Por favor, ingrese una fecha en formato dd/mm/aaaa.")
+                    print("Fecha inválida. Debe estar en formato dd/mm/aaaa.")
+                    fecha_expiracion = input("Ingrese la fecha de expiración del producto (dd/mm/aaaa): ").strip()
                 producto = ProductoSoftware(nombre, precio, cantidad, fecha_expiracion)
 
             inventario.agregar_producto(producto)
 
         elif opcion == 2:
-            inventario.listar_productos()
-            input("\nPresione Enter para continuar...")
+            inventario.listar_productos(paginar=True, tamano_pagina=20)
 
         elif opcion == 3:
-            nombre = input("Ingrese el nombre del producto a actualizar: ").strip()
-            nuevo_nombre = input("Nuevo nombre (o deje en blanco para no cambiar): ").strip() or None
-            nuevo_precio = validar_precio(input("Nuevo precio (o deje en blanco para no cambiar): ").strip() or None)
-            nueva_cantidad = validar_cantidad(input("Nueva cantidad en stock (o deje en blanco para no cambiar): ").strip() or None)
-            nueva_garantia = input("Nueva garantía (o deje en blanco para no cambiar): ").strip() or None
-            nueva_fecha = input("Nueva fecha de expiración (dd/mm/aaaa, o deje en blanco para no cambiar): ").strip() or None
+            nombre = input("Ingrese el nombre del producto que desea actualizar: ").strip()
+            producto = inventario.obtener_producto(nombre)
+            if producto:
+                nuevo_nombre = input(f"Nuevo nombre (presione enter para mantener '{producto.nombre}'): ").strip() or None
+                nuevo_precio_str = input(f"Nuevo precio (presione enter para mantener '{producto.precio}'): ").strip()
+                nuevo_precio = validar_precio(nuevo_precio_str) if nuevo_precio_str else None
+                nueva_cantidad_str = input(f"Nueva cantidad (presione enter para mantener '{producto.cantidad_en_stock}'): ").strip()
+                nueva_cantidad = validar_cantidad(nueva_cantidad_str) if nueva_cantidad_str else None
 
-            inventario.actualizar_producto(nombre, nuevo_nombre, nuevo_precio, nueva_cantidad, nueva_garantia, nueva_fecha)
+                if isinstance(producto, ProductoHardware):
+                    nueva_garantia = input(f"Nueva garantía (presione enter para mantener '{producto.garantia}'): ").strip() or None
+                    inventario.actualizar_producto(nombre, nuevo_nombre, nuevo_precio, nueva_cantidad, nueva_garantia)
+                elif isinstance(producto, ProductoSoftware):
+                    nueva_fecha = input(f"Nueva fecha de expiración (presione enter para mantener '{producto.fecha_expiracion}'): ").strip() or None
+                    while nueva_fecha and not validar_fecha(nueva_fecha):
+                        print("Fecha inválida. Debe estar en formato dd/mm/aaaa.")
+                        nueva_fecha = input(f"Nueva fecha de expiración (presione enter para mantener '{producto.fecha_expiracion}'): ").strip() or None
+                    inventario.actualizar_producto(nombre, nuevo_nombre, nuevo_precio, nueva_cantidad, nueva_fecha=nueva_fecha)
+            else:
+                producto_no_encontrado(inventario, nombre)
 
         elif opcion == 4:
-            nombre = input("Ingrese el nombre del producto a eliminar: ").strip()
-            inventario.eliminar_producto(nombre)
+            nombre = input("Ingrese el nombre del producto que desea eliminar: ").strip()
+            if inventario.obtener_producto(nombre):
+                inventario.eliminar_producto(nombre)
+            else:
+                producto_no_encontrado(inventario, nombre)
 
         elif opcion == 5:
+            inventario.cerrar()
             print("Saliendo del sistema...")
             break
 
         input("\nPresione Enter para continuar...")
 
+# Función principal
+def main():
+    ejecutar_menu(Inventario('productos.json', compartido=True))  # Nombre del archivo
+
 if __name__ == "__main__":
     main()
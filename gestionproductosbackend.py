@@ -0,0 +1,190 @@
+import argparse
+import os
+import sys
+from abc import ABC, abstractmethod
+from datetime import date, timedelta
+import gestionproductosmetricas
+
+# Backends disponibles; el de por defecto se toma de GESTIONPRODUCTOS_BACKEND
+BACKENDS = ("json", "sqlite", "mysql")
+
+# Operaciones que comparten el inventario JSON (gestionproductos), el de MySQL
+# (gestionproductossql) y el de SQLite (gestionproductossqlite). Todos trabajan
+# con las clases de producto de gestionproductos
+class InventarioBackend(ABC):
+    @abstractmethod
+    def agregar_producto(self, producto):
+        pass
+
+    # Alta masiva de productos u objetos dict; devuelve cuántos se agregaron
+    @abstractmethod
+    def agregar_productos(self, productos):
+        pass
+
+    # Alta o actualización masiva por nombre
+    @abstractmethod
+    def actualizar_productos(self, productos):
+        pass
+
+    @abstractmethod
+    def obtener_producto(self, nombre):
+        pass
+
+    @abstractmethod
+    def obtener_producto_por_id(self, id_producto):
+        pass
+
+    # Hasta `limite` productos cuyo nombre coincide con `texto` sin distinguir
+    # mayúsculas: primero el exacto y los que empiezan con el texto, después los
+    # que lo contienen y por último los de nombre parecido
+    @abstractmethod
+    def buscar_productos(self, texto, limite=10):
+        pass
+
+    @abstractmethod
+    def actualizar_producto(self, nombre, nuevo_nombre=None, nuevo_precio=None, nueva_cantidad=None, nueva_garantia=None, nueva_fecha=None):
+        pass
+
+    @abstractmethod
+    def actualizar_producto_por_id(self, id_producto, nuevo_nombre=None, nuevo_precio=None, nueva_cantidad=None, nueva_garantia=None, nueva_fecha=None):
+        pass
+
+    @abstractmethod
+    def eliminar_producto(self, nombre):
+        pass
+
+    @abstractmethod
+    def eliminar_producto_por_id(self, id_producto):
+        pass
+
+    # Suma `delta` al stock sin dejarlo negativo; devuelve si se aplicó
+    @abstractmethod
+    def ajustar_stock(self, clave, delta):
+        pass
+
+    @abstractmethod
+    def ajustar_stock_lote(self, ajustes):
+        pass
+
+    @abstractmethod
+    def iterar_productos(self):
+        pass
+
+    # Productos con `campo` entre minimo y maximo (ambos inclusive), ordenados por ese campo
+    @abstractmethod
+    def consultar_rango(self, campo, minimo=None, maximo=None, limite=None, descendente=False):
+        pass
+
+    @abstractmethod
+    def productos_expirados(self, antes_de=None, limite=None):
+        pass
+
+    # Productos, unidades y valor (precio × stock), en total y por tipo, y
+    # cuántos productos tienen stock menor que `umbral_stock`
+    @abstractmethod
+    def resumen(self, umbral_stock=5):
+        pass
+
+    # Productos, unidades y valor por grupo: "tipo", "precio" (intervalos con
+    # cortes en `limites`) o "mes_expiracion"
+    @abstractmethod
+    def reporte(self, por, limites=None):
+        pass
+
+    @abstractmethod
+    def listar_productos(self, paginar=False, tamano_pagina=1000, salida=None):
+        pass
+
+    # Context manager que agrupa operaciones en un único guardado o commit
+    @abstractmethod
+    def transaccion(self):
+        pass
+
+    # Persiste lo pendiente y libera los recursos del backend
+    @abstractmethod
+    def cerrar(self):
+        pass
+
+    def stock_bajo(self, umbral=5, limite=None):
+        return self.consultar_rango("cantidad_en_stock", maximo=umbral - 1, limite=limite)
+
+    def rango_precio(self, minimo=None, maximo=None, limite=None):
+        return self.consultar_rango("precio", minimo, maximo, limite)
+
+    def por_vencer(self, dias=30, desde=None):
+        desde = desde or date.today()
+        return self.consultar_rango("fecha_expiracion", desde, desde + timedelta(days=dias))
+
+gestionproductosmetricas.registrar_clase(InventarioBackend)
+
+# Crea el inventario del backend indicado, o del de GESTIONPRODUCTOS_BACKEND
+# (json si no está definido). Las opciones que no se pasan se leen de
+# GESTIONPRODUCTOS_ARCHIVO, GESTIONPRODUCTOS_JOURNAL, GESTIONPRODUCTOS_HOST,
+# GESTIONPRODUCTOS_USER, GESTIONPRODUCTOS_PASSWORD, GESTIONPRODUCTOS_DATABASE y
+# GESTIONPRODUCTOS_PORT
+def crear_inventario(backend=None, **opciones):
+    backend = (backend or os.environ.get("GESTIONPRODUCTOS_BACKEND") or "json").strip().lower()
+
+    def opcion(nombre, por_defecto):
+        valor = opciones.get(nombre)
+        if valor is None:
+            valor = os.environ.get("GESTIONPRODUCTOS_" + nombre.upper(), por_defecto)
+        return valor
+
+    if backend == "json":
+        import gestionproductos
+        journal = opcion("journal", "0")
+        if isinstance(journal, str):
+            journal = journal.strip().lower() not in ("", "0", "false", "no")
+        formato = opcion("formato", "json").strip().lower()
+        archivo = opcion("archivo", "productos.bin" if formato == "binario" else "productos.json")
+        return gestionproductos.Inventario(archivo, journal=journal, compartido=True, formato=formato)
+    if backend == "sqlite":
+        import gestionproductossqlite
+        return gestionproductossqlite.Inventario(opcion("archivo", "productos.db"))
+    if backend == "mysql":
+        import gestionproductossql
+        return gestionproductossql.Inventario(
+            host=opcion("host", "localhost"),
+            user=opcion("user", "root"),
+            password=opcion("password", "password"),
+            database=opcion("database", "gestiondeproductos"),
+            port=int(opcion("port", 3306)),
+            tamano_cache=256
+        )
+    raise ValueError(f"Backend desconocido: '{backend}'. Use uno de: {', '.join(BACKENDS)}.")
+
+# Opciones de línea de comandos que eligen el backend y sus datos de conexión
+def agregar_opciones_backend(parser):
+    parser.add_argument("--backend", choices=BACKENDS, help="por defecto GESTIONPRODUCTOS_BACKEND o json")
+    parser.add_argument("--archivo", help="archivo de datos de los backends json y sqlite")
+    parser.add_argument("--journal", action="store_true", default=None,
+                        help="backend json: agrega cada cambio a un journal en lugar de reescribir el archivo")
+    parser.add_argument("--formato", choices=("json", "binario"),
+                        help="backend json: formato del archivo, por defecto GESTIONPRODUCTOS_FORMATO o json")
+    parser.add_argument("--host")
+    parser.add_argument("--user")
+    parser.add_argument("--password")
+    parser.add_argument("--database")
+    parser.add_argument("--port", type=int)
+
+def inventario_desde_argumentos(args):
+    try:
+        return crear_inventario(args.backend, archivo=args.archivo, journal=args.journal, formato=args.formato, host=args.host, user=args.user,
+                                password=args.password, database=args.database, port=args.port)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+# Menú interactivo sobre el backend elegido, por ejemplo:
+#   python gestionproductosbackend.py --backend sqlite --archivo inventario.db
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Sistema de gestión de productos.")
+    agregar_opciones_backend(parser)
+    args = parser.parse_args(argumentos)
+
+    import gestionproductos
+    gestionproductos.ejecutar_menu(inventario_desde_argumentos(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from itertools import accumulate
+import gestionproductos
+
+# Formato binario de productos: una cabecera, columnas de ancho fijo y los
+# textos en montículos de bytes UTF-8 con un arreglo de posiciones de fin.
+# Todo en little-endian y con cada sección alineada a 8 bytes, así las
+# columnas se leen sin copiar desde un mmap del archivo
+MAGIA = b"GPBIN\r\n\x1a"
+VERSION = 1
+
+# Secciones en el orden del archivo y código de array de sus elementos;
+# "x_fin" es la posición de fin de cada texto de la sección "x"
+_SECCIONES = (
+    ("precios", "d"),
+    ("stock", "q"),
+    ("tipos", "B"),
+    ("fechas", "i"),  # ordinal de la fecha de expiración, 0 en hardware
+    ("ids_fin", "Q"),
+    ("ids", "B"),
+    ("nombres_fin", "Q"),
+    ("nombres", "B"),
+    ("garantias_fin", "Q"),  # texto vacío en software
+    ("garantias", "B"),
+)
+
+# Magia, versión, CRC32 de todo lo que sigue a la cabecera, cantidad de
+# productos y (posición, largo) de cada sección
+_CABECERA = struct.Struct("<8sIIQ" + "QQ" * len(_SECCIONES))
+
+# Código de cada tipo en la columna `tipos`, el mismo que usa ColumnasProductos
+TIPOS = ("hardware", "software")
+_HARDWARE = TIPOS.index("hardware")
+_SOFTWARE = TIPOS.index("software")
+
+def es_binario(archivo):
+    try:
+        with open(archivo, 'rb') as f:
+            return f.read(len(MAGIA)) == MAGIA
+    except OSError:
+        return False
+
+def _bytes_little_endian(columna):
+    if sys.byteorder != "little":
+        columna = array(columna.typecode, columna)
+        columna.byteswap()
+    return columna.tobytes()
+
+def _textos(textos):
+    codificados = [texto.encode("utf-8") for texto in textos]
+    return array('Q', accumulate(map(len, codificados), initial=0)), b"".join(codificados)
+
+# Escribe los registros (diccionarios con el formato de productos.json) en el
+# archivo binario abierto `f`; devuelve la cantidad escrita
+def escribir(f, registros):
+    precios = array('d')
+    stock = array('q')
+    tipos = bytearray()
+    fechas = array('i')
+    ids = []
+    nombres = []
+    garantias = []
+    for data in registros:
+        precios.append(data["precio"])
+        stock.append(data["cantidad_en_stock"])
+        if data["tipo"] == "hardware":
+            tipos.append(_HARDWARE)
+            fechas.append(0)
+            garantias.append(data["garantia"])
+        else:
+            tipos.append(_SOFTWARE)
+            fechas.append(gestionproductos.fecha_a_ordinal(data["fecha_expiracion"]))
+            garantias.append("")
+        ids.append(data["id"])
+        nombres.append(data["nombre"])
+    ids_fin, ids = _textos(ids)
+    nombres_fin, nombres = _textos(nombres)
+    garantias_fin, garantias = _textos(garantias)
+    contenido = {
+        "precios": _bytes_little_endian(precios),
+        "stock": _bytes_little_endian(stock),
+        "tipos": bytes(tipos),
+        "fechas": _bytes_little_endian(fechas),
+        "ids_fin": _bytes_little_endian(ids_fin),
+        "ids": ids,
+        "nombres_fin": _bytes_little_endian(nombres_fin),
+        "nombres": nombres,
+        "garantias_fin": _bytes_little_endian(garantias_fin),
+        "garantias": garantias,
+    }
+    ubicaciones = []
+    partes = []
+    posicion = _CABECERA.size
+    crc = 0
+    for nombre, _ in _SECCIONES:
+        datos = contenido[nombre]
+        relleno = b"\0" * (-posicion % 8)
+        posicion += len(relleno)
+        ubicaciones += [posicion, len(datos)]
+        partes += [relleno, datos]
+        crc = zlib.crc32(datos, zlib.crc32(relleno, crc))
+        posicion += len(datos)
+    f.write(_CABECERA.pack(MAGIA, VERSION, crc, len(precios), *ubicaciones))
+    for parte in partes:
+        f.write(parte)
+    return len(precios)
+
+# Textos de una sección, decodificados recién al pedirlos
+class _Textos:
+    __slots__ = ("_fin", "_datos")
+
+    def __init__(self, fin, datos):
+        self._fin = fin
+        self._datos = datos
+
+    def __len__(self):
+        return len(self._fin) - 1
+
+    def __getitem__(self, fila):
+        return str(self._datos[self._fin[fila]:self._fin[fila + 1]], "utf-8")
+
+    # Todos los textos de una vez: si la sección es ASCII se decodifica entera
+    # y se corta por posición, sin un decode por fila
+    def todos(self):
+        texto = str(self._datos, "utf-8")
+        if len(texto) != len(self._datos):
+            return [self[fila] for fila in range(len(self))]
+        fin = self._fin
+        return [texto[inicio:final] for inicio, final in zip(fin, fin[1:])]
+
+# Columnas de un archivo binario, de solo lectura. Ofrece los mismos atributos
+# que ColumnasProductos, así VistaProducto y los reportes trabajan sobre el
+# archivo mapeado sin copiarlo
+class ColumnasBinarias:
+    TIPOS = TIPOS
+
+    def __init__(self, datos, verificar=True):
+        if len(datos) < _CABECERA.size:
+            raise ValueError("El archivo binario está truncado.")
+        magia, version, crc, cantidad, *ubicaciones = _CABECERA.unpack_from(datos)
+        if magia != MAGIA:
+            raise ValueError("El archivo no tiene el formato binario de productos.")
+        if version != VERSION:
+            raise ValueError(f"Versión del formato binario no soportada: {version}.")
+        if ubicaciones[-2] + ubicaciones[-1] > len(datos):
+            raise ValueError("El archivo binario está truncado.")
+        vista = memoryview(datos)
+        if verificar and zlib.crc32(vista[_CABECERA.size:]) != crc:
+            raise ValueError("La suma de verificación del archivo binario no coincide.")
+        self._datos = datos
+        secciones = {}
+        for i, (nombre, codigo) in enumerate(_SECCIONES):
+            posicion, largo = ubicaciones[2 * i:2 * i + 2]
+            seccion = vista[posicion:posicion + largo]
+            if codigo == "B":
+                secciones[nombre] = seccion
+            elif sys.byteorder == "little":
+                secciones[nombre] = seccion.cast(codigo)
+            else:
+                secciones[nombre] = array(codigo, seccion)
+                secciones[nombre].byteswap()
+        for nombre in ("precios", "stock", "tipos", "fechas"):
+            if len(secciones[nombre]) != cantidad:
+                raise ValueError("El archivo binario tiene columnas de largo distinto.")
+        self.precios = secciones["precios"]
+        self.stock = secciones["stock"]
+        self.tipos = secciones["tipos"]
+        self.fechas = secciones["fechas"]
+        self.ids = _Textos(secciones["ids_fin"], secciones["ids"])
+        self.nombres = _Textos(secciones["nombres_fin"], secciones["nombres"])
+        self.extras = _Textos(secciones["garantias_fin"], secciones["garantias"])
+
+    def id_de(self, fila):
+        return self.ids[fila]
+
+    def __len__(self):
+        return len(self.precios)
+
+    def __getitem__(self, fila):
+        if not -len(self) <= fila < len(self):
+            raise IndexError(fila)
+        return gestionproductos.VistaProducto(self, fila % len(self))
+
+    def __iter__(self):
+        for fila in range(len(self)):
+            yield gestionproductos.VistaProducto(self, fila)
+
+    def registros(self):
+        for vista in self:
+            yield vista.to_dict()
+
+# Abre un archivo binario con mmap: solo se leen la cabecera y, con
+# verificar=True, los bytes para la suma de verificación; los productos se
+# decodifican al accederlos. En Windows un archivo mapeado no se puede
+# reemplazar al guardar, así que allí se lee a memoria
+def abrir(archivo, verificar=True):
+    with open(archivo, 'rb') as f:
+        if os.name == "nt" or os.fstat(f.fileno()).st_size == 0:
+            return ColumnasBinarias(f.read(), verificar)
+        return ColumnasBinarias(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), verificar)
+
+# Escribe en un temporal del mismo directorio y lo renombra encima del destino
+def _escribir_archivo(archivo, escritura, modo):
+    directorio = os.path.dirname(os.path.abspath(archivo))
+    fd, temporal = tempfile.mkstemp(prefix=os.path.basename(archivo) + ".", suffix=".tmp", dir=directorio)
+    try:
+        with os.fdopen(fd, modo) as f:
+            cantidad = escritura(f)
+        os.replace(temporal, archivo)
+    except BaseException:
+        os.remove(temporal)
+        raise
+    return cantidad
+
+def json_a_binario(origen, destino):
+    productos = gestionproductos.iterar_productos_archivo(origen)
+    return _escribir_archivo(destino, lambda f: escribir(f, (p.to_dict() for p in productos)), 'wb')
+
+def binario_a_json(origen, destino):
+    columnas = abrir(origen)
+
+    def escritura(f):
+        gestionproductos.escribir_registros(f, columnas.registros())
+        return len(columnas)
+    return _escribir_archivo(destino, escritura, 'w')
+
+# Por ejemplo:
+#   python gestionproductosbinario.py a-binario productos.json productos.bin
+#   python gestionproductosbinario.py a-json productos.bin productos.json
+#   python gestionproductosbinario.py verificar productos.bin
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Conversión entre productos.json y el formato binario.")
+    subparsers = parser.add_subparsers(dest="accion", required=True)
+    for accion, ayuda in (("a-binario", "convierte un archivo JSON al formato binario"),
+                          ("a-json", "convierte un archivo binario a JSON")):
+        subparser = subparsers.add_parser(accion, help=ayuda)
+        subparser.add_argument("origen")
+        subparser.add_argument("destino")
+    verificar = subparsers.add_parser("verificar", help="comprueba la suma de verificación de un archivo binario")
+    verificar.add_argument("origen")
+    args = parser.parse_args(argumentos)
+
+    try:
+        if args.accion == "a-binario":
+            print(f"{json_a_binario(args.origen, args.destino)} productos escritos en {args.destino}.")
+        elif args.accion == "a-json":
+            print(f"{binario_a_json(args.origen, args.destino)} productos escritos en {args.destino}.")
+        else:
+            print(f"{args.origen}: {len(abrir(args.origen))} productos, suma de verificación correcta.")
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
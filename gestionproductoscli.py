@@ -0,0 +1,324 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from itertools import islice
+from gestionproductos import (
+    ProductoHardware, ProductoSoftware, escribir_registros, iterar_productos_archivo, validar_fecha,
+    validar_tipo_producto
+)
+from gestionproductosbackend import agregar_opciones_backend, inventario_desde_argumentos
+from gestionproductosreportes import AGRUPACIONES
+
+# Busca el producto del comando por "id", por "nombre" o por "clave" (id o nombre)
+def _buscar(inventario, comando):
+    if comando.get("id"):
+        return inventario.obtener_producto_por_id(comando["id"])
+    if comando.get("nombre"):
+        return inventario.obtener_producto(comando["nombre"])
+    clave = comando.get("clave")
+    if not clave:
+        raise ValueError("Falta el id o el nombre del producto.")
+    return inventario.obtener_producto_por_id(clave) or inventario.obtener_producto(clave)
+
+def _buscar_existente(inventario, comando):
+    producto = _buscar(inventario, comando)
+    if producto is None:
+        raise LookupError("Producto no encontrado.")
+    return producto
+
+# Cada operación recibe el inventario y los campos del comando y produce los
+# resultados; los errores se informan con ValueError, o LookupError si el
+# producto no existe
+
+def _agregar(inventario, comando):
+    tipo = str(comando.get("tipo") or "").strip().lower()
+    if not validar_tipo_producto(tipo):
+        raise ValueError("El tipo de producto debe ser 'hardware' o 'software'.")
+    if tipo == "hardware":
+        producto = ProductoHardware(comando.get("nombre"), comando.get("precio"), comando.get("cantidad_en_stock"),
+                                    comando.get("garantia") or "0", id=comando.get("id"))
+    else:
+        producto = ProductoSoftware(comando.get("nombre"), comando.get("precio"), comando.get("cantidad_en_stock"),
+                                    comando.get("fecha_expiracion"), id=comando.get("id"))
+    if inventario.obtener_producto(producto.nombre) is not None:
+        raise ValueError("Producto con el mismo nombre ya existe.")
+    if comando.get("id") is not None and inventario.obtener_producto_por_id(producto.id) is not None:
+        raise ValueError("Producto con el mismo ID ya existe.")
+    inventario.agregar_producto(producto)
+    yield {"producto": producto.to_dict()}
+
+def _obtener(inventario, comando):
+    yield {"producto": _buscar_existente(inventario, comando).to_dict()}
+
+def _actualizar(inventario, comando):
+    producto = _buscar_existente(inventario, comando)
+    id_producto = producto.id
+    nuevo_nombre = comando.get("nuevo_nombre")
+    precio = comando.get("precio")
+    cantidad = comando.get("cantidad_en_stock")
+    fecha = comando.get("fecha_expiracion")
+    garantia = comando.get("garantia")
+    # Los backends informan estos errores solo por pantalla; se validan antes
+    if nuevo_nombre is not None and nuevo_nombre != producto.nombre:
+        if not str(nuevo_nombre).strip():
+            raise ValueError("El producto debe contener un nombre.")
+        if inventario.obtener_producto(nuevo_nombre) is not None:
+            raise ValueError("Producto con el mismo nombre ya existe.")
+    if precio is not None and (isinstance(precio, bool) or not isinstance(precio, (int, float)) or precio <= 0):
+        raise ValueError("El precio debe ser un número positivo.")
+    if cantidad is not None and (isinstance(cantidad, bool) or not isinstance(cantidad, int) or cantidad < 0):
+        raise ValueError("La cantidad en stock debe ser un entero no negativo.")
+    if fecha is not None and not validar_fecha(fecha):
+        raise ValueError("La nueva fecha debe estar en el formato dd/mm/aaaa.")
+    # En blanco los backends la guardan como '0'
+    if garantia is not None and not isinstance(garantia, str):
+        raise ValueError("La garantía debe ser un texto; si el producto no tiene garantía, escriba '0'.")
+    inventario.actualizar_producto_por_id(id_producto, nuevo_nombre, precio, cantidad, garantia, fecha)
+    actualizado = inventario.obtener_producto_por_id(id_producto)
+    if actualizado is None:
+        raise LookupError("Producto no encontrado.")
+    yield {"producto": actualizado.to_dict()}
+
+def _eliminar(inventario, comando):
+    producto = _buscar_existente(inventario, comando)
+    data = producto.to_dict()
+    inventario.eliminar_producto_por_id(producto.id)
+    yield {"producto": data}
+
+def _ajustar(inventario, comando):
+    producto = _buscar_existente(inventario, comando)
+    delta = comando.get("delta")
+    if isinstance(delta, bool) or not isinstance(delta, int):
+        raise ValueError("El ajuste de stock debe ser un entero.")
+    if not inventario.ajustar_stock(producto.id, delta):
+        raise ValueError(f"Stock insuficiente para {producto.nombre}.")
+    yield {"producto": inventario.obtener_producto_por_id(producto.id).to_dict()}
+
+# Productos de nombre parecido a "texto", del más al menos cercano
+def _buscar_texto(inventario, comando):
+    texto = comando.get("texto")
+    if not texto:
+        raise ValueError("Falta el texto a buscar.")
+    limite = comando.get("limite")
+    for producto in inventario.buscar_productos(texto, 10 if limite is None else limite):
+        yield {"producto": producto.to_dict()}
+
+# Totales del inventario; "umbral" es el stock debajo del cual un producto
+# cuenta como stock bajo
+def _resumen(inventario, comando):
+    umbral = comando.get("umbral", 5)
+    if isinstance(umbral, bool) or not isinstance(umbral, int):
+        raise ValueError("El umbral de stock debe ser un entero.")
+    yield inventario.resumen(umbral)
+
+# Un resultado por grupo; "por" es tipo, precio o mes_expiracion y "limites"
+# los cortes de los intervalos de precio
+def _reporte(inventario, comando):
+    yield from inventario.reporte(comando.get("por"), comando.get("limites"))
+
+# Un resultado por producto, a medida que se recorren
+def _listar(inventario, comando):
+    productos = inventario.iterar_productos()
+    if comando.get("limite") is not None:
+        productos = islice(productos, comando["limite"])
+    for producto in productos:
+        yield {"producto": producto.to_dict()}
+
+def _importar(inventario, comando):
+    if not comando.get("archivo"):
+        raise ValueError("Falta el archivo a importar.")
+    productos = iterar_productos_archivo(comando["archivo"])
+    if comando.get("actualizar"):
+        cantidad = inventario.actualizar_productos(productos)
+    else:
+        cantidad = inventario.agregar_productos(productos)
+    yield {"cantidad": cantidad}
+
+# Escribe en un temporal y lo renombra, como el guardado del inventario JSON
+def _exportar(inventario, comando):
+    archivo = comando.get("archivo")
+    if not archivo:
+        raise ValueError("Falta el archivo de destino.")
+    cantidad = 0
+
+    def registros():
+        nonlocal cantidad
+        for producto in inventario.iterar_productos():
+            cantidad += 1
+            yield producto.to_dict()
+
+    fd, temporal = tempfile.mkstemp(prefix=os.path.basename(archivo) + ".", suffix=".tmp",
+                                    dir=os.path.dirname(os.path.abspath(archivo)))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            escribir_registros(f, registros())
+        os.replace(temporal, archivo)
+    except BaseException:
+        os.remove(temporal)
+        raise
+    yield {"cantidad": cantidad}
+
+OPERACIONES = {
+    "agregar": _agregar,
+    "obtener": _obtener,
+    "buscar": _buscar_texto,
+    "actualizar": _actualizar,
+    "eliminar": _eliminar,
+    "ajustar": _ajustar,
+    "resumen": _resumen,
+    "reporte": _reporte,
+    "listar": _listar,
+    "importar": _importar,
+    "exportar": _exportar,
+}
+
+# Nombres en inglés aceptados en la línea de comandos y en los archivos de comandos
+ALIAS = {
+    "add": "agregar",
+    "get": "obtener",
+    "search": "buscar",
+    "update": "actualizar",
+    "delete": "eliminar",
+    "adjust": "ajustar",
+    "summary": "resumen",
+    "report": "reporte",
+    "list": "listar",
+    "import": "importar",
+    "export": "exportar",
+}
+
+def _emitir(salida, resultado):
+    salida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+
+# Ejecuta los comandos (diccionarios, o líneas JSON) contra un único inventario
+# y dentro de una sola transacción, así todo se guarda o confirma una vez al
+# final. Escribe en `salida` una línea JSON por resultado, recién cuando la
+# transacción se confirmó, y devuelve la cantidad de comandos que fallaron
+def ejecutar(inventario, comandos, salida=None):
+    salida = salida or sys.stdout
+    errores = 0
+    resultados = []
+    # Los backends informan cada operación con print; esos mensajes van a
+    # stderr para que la salida tenga solo JSON
+    with redirect_stdout(sys.stderr), inventario.transaccion():
+        for numero, comando in enumerate(comandos, 1):
+            op = None
+            try:
+                if isinstance(comando, str):
+                    comando = json.loads(comando)
+                if not isinstance(comando, dict):
+                    raise ValueError("Cada comando debe ser un objeto JSON.")
+                op = ALIAS.get(comando.get("op"), comando.get("op"))
+                if op not in OPERACIONES:
+                    raise ValueError(f"Operación desconocida: '{comando.get('op')}'.")
+                for resultado in OPERACIONES[op](inventario, comando):
+                    resultados.append({"op": op, "ok": True, **resultado})
+            except (ValueError, LookupError, TypeError, OSError) as e:
+                errores += 1
+                resultados.append({"op": op, "ok": False, "comando": numero, "error": str(e)})
+    for resultado in resultados:
+        _emitir(salida, resultado)
+    return errores
+
+# Líneas de comandos de un archivo JSON-lines; se omiten las vacías y los comentarios (#)
+def leer_comandos(archivo):
+    for linea in archivo:
+        linea = linea.strip()
+        if linea and not linea.startswith("#"):
+            yield linea
+
+def _parser():
+    parser = argparse.ArgumentParser(description="Operaciones no interactivas sobre el inventario; "
+                                                 "escribe una línea JSON por resultado.")
+    agregar_opciones_backend(parser)
+    subparsers = parser.add_subparsers(dest="op", required=True)
+
+    agregar = subparsers.add_parser("agregar", aliases=["add"], help="agrega un producto")
+    agregar.add_argument("--tipo", required=True, choices=["hardware", "software"])
+    agregar.add_argument("--nombre", required=True)
+    agregar.add_argument("--precio", type=float, required=True)
+    agregar.add_argument("--cantidad", dest="cantidad_en_stock", type=int, required=True)
+    agregar.add_argument("--garantia", help="años de garantía del hardware (0 si no tiene)")
+    agregar.add_argument("--fecha", dest="fecha_expiracion", help="expiración del software, dd/mm/aaaa")
+
+    for nombre, alias, ayuda in (("obtener", "get", "muestra un producto"),
+                                 ("eliminar", "delete", "elimina un producto")):
+        subparser = subparsers.add_parser(nombre, aliases=[alias], help=ayuda)
+        subparser.add_argument("clave", help="id o nombre del producto")
+
+    buscar = subparsers.add_parser("buscar", aliases=["search"], help="busca productos por nombre aproximado")
+    buscar.add_argument("texto")
+    buscar.add_argument("--limite", type=int, default=10)
+
+    ajustar = subparsers.add_parser("ajustar", aliases=["adjust"], help="suma o descuenta stock")
+    ajustar.add_argument("clave", help="id o nombre del producto")
+    ajustar.add_argument("delta", type=int, help="unidades a sumar (negativo para descontar)")
+
+    actualizar = subparsers.add_parser("actualizar", aliases=["update"], help="actualiza un producto")
+    actualizar.add_argument("clave", help="id o nombre del producto")
+    actualizar.add_argument("--nuevo-nombre")
+    actualizar.add_argument("--precio", type=float)
+    actualizar.add_argument("--cantidad", dest="cantidad_en_stock", type=int)
+    actualizar.add_argument("--garantia")
+    actualizar.add_argument("--fecha", dest="fecha_expiracion")
+
+    resumen = subparsers.add_parser("resumen", aliases=["summary"], help="totales de productos, unidades y valor")
+    resumen.add_argument("--umbral", type=int, default=5, help="stock debajo del cual un producto cuenta como stock bajo")
+
+    reporte = subparsers.add_parser("reporte", aliases=["report"], help="totales por tipo, precio o mes de expiración")
+    reporte.add_argument("por", choices=AGRUPACIONES)
+    reporte.add_argument("--limites", type=float, nargs="+", help="cortes de los intervalos de precio")
+
+    listar = subparsers.add_parser("listar", aliases=["list"], help="lista los productos")
+    listar.add_argument("--limite", type=int)
+
+    importar = subparsers.add_parser("importar", aliases=["import"], help="importa productos de un archivo JSON")
+    importar.add_argument("ruta", metavar="archivo")
+    importar.add_argument("--actualizar", action="store_true", help="actualiza los productos que ya existen")
+
+    exportar = subparsers.add_parser("exportar", aliases=["export"], help="exporta los productos a un archivo JSON")
+    exportar.add_argument("ruta", metavar="archivo")
+
+    lote = subparsers.add_parser("lote", aliases=["batch"], help="ejecuta los comandos JSON-lines de un archivo o de stdin")
+    lote.add_argument("ruta", metavar="archivo", nargs="?", default="-", help="'-' para la entrada estándar")
+    return parser
+
+# Por ejemplo:
+#   python gestionproductoscli.py agregar --tipo hardware --nombre mouse --precio 10 --cantidad 5 --garantia 1
+#   python gestionproductoscli.py --backend sqlite listar --limite 20
+#   python gestionproductoscli.py lote comandos.jsonl
+#   echo '{"op": "eliminar", "nombre": "mouse"}' | python gestionproductoscli.py lote
+# Termina con código 1 si algún comando falló
+def main(argumentos=None):
+    args = _parser().parse_args(argumentos)
+    op = ALIAS.get(args.op, args.op)
+    salida = sys.stdout
+    with redirect_stdout(sys.stderr):
+        inventario = inventario_desde_argumentos(args)
+    try:
+        if op in ("lote", "batch"):
+            if args.ruta == "-":
+                errores = ejecutar(inventario, leer_comandos(sys.stdin), salida)
+            else:
+                with open(args.ruta) as f:
+                    errores = ejecutar(inventario, leer_comandos(f), salida)
+        else:
+            comando = {"op": op}
+            for campo in ("clave", "texto", "nombre", "tipo", "precio", "cantidad_en_stock", "garantia",
+                          "fecha_expiracion", "nuevo_nombre", "delta", "limite", "actualizar", "umbral", "por",
+                          "limites"):
+                if getattr(args, campo, None) is not None:
+                    comando[campo] = getattr(args, campo)
+            if getattr(args, "ruta", None) is not None:
+                comando["archivo"] = args.ruta
+            errores = ejecutar(inventario, [comando], salida)
+    finally:
+        with redirect_stdout(sys.stderr):
+            inventario.cerrar()
+    sys.exit(1 if errores else 0)
+
+if __name__ == "__main__":
+    main()
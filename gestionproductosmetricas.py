@@ -0,0 +1,248 @@
+import atexit
+import cProfile
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+# Métricas opcionales de los inventarios. Desactivadas no cuestan nada: los
+# métodos de las clases registradas quedan sin envolver y los puntos de medición
+# internos solo consultan `activas`. Se activan con activar() o con la variable
+# de entorno GESTIONPRODUCTOS_METRICAS=1
+activas = False
+
+# Límites superiores (segundos) de los intervalos de los histogramas de latencia
+LIMITES = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, float("inf"))
+
+_lock = threading.Lock()
+_contadores = {}  # (nombre, etiquetas) -> valor
+_histogramas = {}  # (nombre, etiquetas) -> [conteos por intervalo, suma, cantidad]
+_clases = {}  # clase -> nombre del backend (None: se toma de la subclase)
+
+def _clave(nombre, etiquetas):
+    return nombre, tuple(sorted(etiquetas.items()))
+
+def contar(nombre, valor=1, **etiquetas):
+    clave = _clave(nombre, etiquetas)
+    with _lock:
+        _contadores[clave] = _contadores.get(clave, 0) + valor
+
+def observar(nombre, segundos, **etiquetas):
+    clave = _clave(nombre, etiquetas)
+    with _lock:
+        histograma = _histogramas.get(clave)
+        if histograma is None:
+            histograma = _histogramas[clave] = [[0] * len(LIMITES), 0.0, 0]
+        for i, limite in enumerate(LIMITES):
+            if segundos <= limite:
+                histograma[0][i] += 1
+                break
+        histograma[1] += segundos
+        histograma[2] += 1
+
+# Nombre del backend de un inventario, según la clase registrada más cercana
+def backend_de(objeto):
+    for clase in type(objeto).__mro__:
+        backend = _clases.get(clase)
+        if backend:
+            return backend
+    return type(objeto).__name__
+
+# Operaciones en curso de cada hilo, como (id del inventario, operación)
+_en_curso = threading.local()
+
+# Un método que llama a super() pasa por el envoltorio de cada clase: solo se
+# mide la llamada más externa de la operación sobre el mismo inventario
+def _envolver(funcion, operacion):
+    @functools.wraps(funcion)
+    def medida(self, *args, **kwargs):
+        en_curso = getattr(_en_curso, "operaciones", None)
+        if en_curso is None:
+            en_curso = _en_curso.operaciones = set()
+        clave = (id(self), operacion)
+        if clave in en_curso:
+            return funcion(self, *args, **kwargs)
+        en_curso.add(clave)
+        inicio = time.perf_counter()
+        try:
+            return funcion(self, *args, **kwargs)
+        except BaseException:
+            contar("gestionproductos_errores_total", backend=backend_de(self), operacion=operacion)
+            raise
+        finally:
+            en_curso.discard(clave)
+            observar("gestionproductos_operacion_segundos", time.perf_counter() - inicio,
+                     backend=backend_de(self), operacion=operacion)
+    medida._sin_medir = funcion
+    return medida
+
+# Métodos públicos propios de la clase que se miden; los generadores y los
+# context managers se excluyen porque solo se mediría su creación
+def _metodos_medibles(clase):
+    for nombre, atributo in vars(clase).items():
+        if nombre.startswith("_") or not inspect.isfunction(atributo):
+            continue
+        if getattr(atributo, "__isabstractmethod__", False) or hasattr(atributo, "_sin_medir"):
+            continue
+        original = inspect.unwrap(atributo)
+        if inspect.isgeneratorfunction(original):
+            continue
+        yield nombre, atributo
+
+def _instrumentar(clase):
+    for nombre, metodo in list(_metodos_medibles(clase)):
+        setattr(clase, nombre, _envolver(metodo, nombre))
+
+def _quitar_instrumentacion(clase):
+    for nombre, atributo in list(vars(clase).items()):
+        if hasattr(atributo, "_sin_medir"):
+            setattr(clase, nombre, atributo._sin_medir)
+
+# Los módulos de backend registran su Inventario al importarse
+def registrar_clase(clase, backend=None):
+    _clases[clase] = backend
+    if activas:
+        _instrumentar(clase)
+
+def activar():
+    global activas
+    if activas:
+        return
+    for clase in _clases:
+        _instrumentar(clase)
+    activas = True
+
+def desactivar():
+    global activas
+    activas = False
+    for clase in _clases:
+        _quitar_instrumentacion(clase)
+
+def reiniciar():
+    with _lock:
+        _contadores.clear()
+        _histogramas.clear()
+
+# Cursor que cuenta y cronometra las sentencias SQL por tipo (SELECT, UPDATE...)
+class CursorMedido:
+    __slots__ = ("_cursor", "_backend")
+
+    def __init__(self, cursor, backend):
+        self._cursor = cursor
+        self._backend = backend
+
+    def _medir(self, metodo, query, params):
+        tipo = query.lstrip().split(None, 1)[0].upper() if query.strip() else "?"
+        inicio = time.perf_counter()
+        try:
+            return metodo(query, params)
+        finally:
+            observar("gestionproductos_sentencia_segundos", time.perf_counter() - inicio,
+                     backend=self._backend, tipo=tipo)
+
+    def execute(self, query, params=()):
+        return self._medir(self._cursor.execute, query, params)
+
+    def executemany(self, query, filas):
+        return self._medir(self._cursor.executemany, query, filas)
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+def _etiquetas_texto(etiquetas, extra=()):
+    pares = list(etiquetas) + list(extra)
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pares) + "}"
+
+# Contadores e histogramas como diccionario serializable a JSON
+def estadisticas():
+    with _lock:
+        contadores = [
+            {"nombre": nombre, "etiquetas": dict(etiquetas), "valor": valor}
+            for (nombre, etiquetas), valor in sorted(_contadores.items())
+        ]
+        histogramas = []
+        for (nombre, etiquetas), (conteos, suma, cantidad) in sorted(_histogramas.items()):
+            histogramas.append({
+                "nombre": nombre,
+                "etiquetas": dict(etiquetas),
+                "cantidad": cantidad,
+                "suma": suma,
+                "intervalos": {("+Inf" if limite == float("inf") else str(limite)): conteo
+                               for limite, conteo in zip(LIMITES, conteos)}
+            })
+    return {"activas": activas, "contadores": contadores, "histogramas": histogramas}
+
+def exportar_json():
+    return json.dumps(estadisticas(), indent=4)
+
+# Formato de texto de Prometheus; los intervalos de los histogramas son acumulativos
+def exportar_prometheus():
+    lineas = []
+    with _lock:
+        vistos = set()
+        for (nombre, etiquetas), valor in sorted(_contadores.items()):
+            if nombre not in vistos:
+                vistos.add(nombre)
+                lineas.append(f"# TYPE {nombre} counter")
+            lineas.append(f"{nombre}{_etiquetas_texto(etiquetas)} {valor}")
+        for (nombre, etiquetas), (conteos, suma, cantidad) in sorted(_histogramas.items()):
+            if nombre not in vistos:
+                vistos.add(nombre)
+                lineas.append(f"# TYPE {nombre} histogram")
+            acumulado = 0
+            for limite, conteo in zip(LIMITES, conteos):
+                acumulado += conteo
+                le = "+Inf" if limite == float("inf") else repr(limite)
+                lineas.append(f"{nombre}_bucket{_etiquetas_texto(etiquetas, [('le', le)])} {acumulado}")
+            lineas.append(f"{nombre}_sum{_etiquetas_texto(etiquetas)} {suma}")
+            lineas.append(f"{nombre}_count{_etiquetas_texto(etiquetas)} {cantidad}")
+    return "\n".join(lineas) + "\n"
+
+# Escribe las métricas en `archivo`: formato Prometheus si termina en .prom, si no JSON
+def volcar(archivo):
+    with open(archivo, 'w') as f:
+        f.write(exportar_prometheus() if archivo.endswith(".prom") else exportar_json())
+
+# Variables de entorno:
+#   GESTIONPRODUCTOS_METRICAS=1            activa las métricas
+#   GESTIONPRODUCTOS_METRICAS_ARCHIVO=ruta vuelca las métricas al terminar el programa
+#   GESTIONPRODUCTOS_PERFIL=ruta.prof      perfila todo el programa con cProfile
+#   GESTIONPRODUCTOS_TRACEMALLOC=N         muestra al terminar las N líneas que más memoria reservaron
+def _configurar_desde_entorno():
+    if os.environ.get("GESTIONPRODUCTOS_METRICAS", "") not in ("", "0"):
+        activar()
+    archivo_metricas = os.environ.get("GESTIONPRODUCTOS_METRICAS_ARCHIVO")
+    if archivo_metricas:
+        activar()
+        atexit.register(volcar, archivo_metricas)
+
+    lineas_memoria = os.environ.get("GESTIONPRODUCTOS_TRACEMALLOC")
+    if lineas_memoria:
+        tracemalloc.start()
+
+        def mostrar_memoria():
+            estadisticas_memoria = tracemalloc.take_snapshot().statistics("lineno")
+            print("Reservas de memoria más grandes:", file=sys.stderr)
+            for estadistica in estadisticas_memoria[:int(lineas_memoria)]:
+                print(f"  {estadistica}", file=sys.stderr)
+        atexit.register(mostrar_memoria)
+
+    # Se registra al final para que atexit lo cierre primero y el perfil no incluya
+    # los otros volcados
+    archivo_perfil = os.environ.get("GESTIONPRODUCTOS_PERFIL")
+    if archivo_perfil:
+        perfil = cProfile.Profile()
+        perfil.enable()
+
+        def guardar_perfil():
+            perfil.disable()
+            perfil.dump_stats(archivo_perfil)
+        atexit.register(guardar_perfil)
+
+_configurar_desde_entorno()
@@ -0,0 +1,164 @@
+try:
+    import numpy
+except ImportError:
+    # Sin NumPy los reportes por columnas se calculan en Python puro
+    numpy = None
+from bisect import bisect_right
+from datetime import date
+
+# Formas de agrupar de reporte(): por tipo de producto, por intervalo de precio
+# o por mes de expiración (solo software)
+AGRUPACIONES = ("tipo", "precio", "mes_expiracion")
+
+# Cortes por defecto de los intervalos de precio: < 10, 10 - 50, ..., >= 1000
+LIMITES_PRECIO = (10, 50, 100, 500, 1000)
+
+_ORDINAL_1970 = date(1970, 1, 1).toordinal()
+
+def _totales(productos, unidades, valor):
+    return {"productos": int(productos), "unidades": int(unidades), "valor": round(float(valor), 2)}
+
+# Totales por tipo (productos, unidades y valor = precio × stock) y cantidad de
+# productos con stock menor que `umbral_stock`, que el inventario actualiza con
+# cada alta, baja o cambio, así leerlos es O(1)
+class Agregados:
+    def __init__(self, entradas=(), umbral_stock=5):
+        self.umbral_stock = umbral_stock
+        self.por_tipo = {}  # tipo -> [productos, unidades, valor]
+        self.stock_bajo = 0
+        for tipo, precio, cantidad in entradas:
+            self.sumar(tipo, precio, cantidad)
+
+    def sumar(self, tipo, precio, cantidad, signo=1):
+        totales = self.por_tipo.get(tipo)
+        if totales is None:
+            totales = self.por_tipo[tipo] = [0, 0, 0.0]
+        totales[0] += signo
+        totales[1] += signo * cantidad
+        totales[2] += signo * precio * cantidad
+        if cantidad < self.umbral_stock:
+            self.stock_bajo += signo
+
+    def restar(self, tipo, precio, cantidad):
+        self.sumar(tipo, precio, cantidad, -1)
+
+    # Con otro umbral, el que llama cuenta el stock bajo y lo pasa
+    def resumen(self, stock_bajo=None, umbral_stock=None):
+        if umbral_stock is None:
+            stock_bajo, umbral_stock = self.stock_bajo, self.umbral_stock
+        return resumen(((tipo, *totales) for tipo, totales in self.por_tipo.items()), stock_bajo, umbral_stock)
+
+# Resumen con el mismo formato en todos los backends, a partir de filas
+# (tipo, productos, unidades, valor) y de la cantidad de productos con stock
+# menor que `umbral_stock`
+def resumen(por_tipo, stock_bajo, umbral_stock):
+    productos = unidades = 0
+    valor = 0.0
+    detalle = {}
+    for tipo, cantidad, stock, total in sorted(por_tipo):
+        if not cantidad:
+            continue
+        productos += cantidad
+        unidades += stock
+        valor += float(total)
+        detalle[tipo] = _totales(cantidad, stock, total)
+    return {**_totales(productos, unidades, valor), "stock_bajo": int(stock_bajo), "umbral_stock": umbral_stock,
+            "por_tipo": detalle}
+
+# Verifica la agrupación y devuelve los cortes de precio a usar
+def validar_agrupacion(por, limites=None):
+    if por not in AGRUPACIONES:
+        raise ValueError(f"No se puede agrupar por '{por}'; use {', '.join(AGRUPACIONES)}.")
+    if limites is None:
+        return LIMITES_PRECIO
+    limites = tuple(limites)
+    if not limites or any(isinstance(l, bool) or not isinstance(l, (int, float)) for l in limites):
+        raise ValueError("Los límites de precio deben ser una lista de números.")
+    if any(a >= b for a, b in zip(limites, limites[1:])):
+        raise ValueError("Los límites de precio deben ser crecientes.")
+    return limites
+
+# Nombre del intervalo `i` de precio: el 0 es "< limites[0]" y el último ">= limites[-1]"
+def etiqueta_precio(i, limites):
+    if i == 0:
+        return f"< {limites[0]:g}"
+    if i == len(limites):
+        return f">= {limites[-1]:g}"
+    return f"{limites[i - 1]:g} - {limites[i]:g}"
+
+def fila_reporte(grupo, productos, unidades, valor):
+    return {"grupo": grupo, **_totales(productos, unidades, valor)}
+
+# Reporte sobre una copia por columnas (ColumnasProductos): una fila por grupo,
+# en orden de grupo, con productos, unidades y valor
+def agrupar_columnas(columnas, por, limites=None):
+    limites = validar_agrupacion(por, limites)
+    if numpy is not None:
+        return _agrupar_numpy(columnas, por, limites)
+    return _agrupar_python(columnas, por, limites)
+
+# Arreglo NumPy sobre la misma memoria de una columna, sea un array de
+# ColumnasProductos o un memoryview de un archivo binario mapeado
+def _columna(columna):
+    return numpy.frombuffer(columna, dtype=memoryview(columna).format)
+
+# Las columnas numéricas se leen sin copiar (frombuffer) y cada grupo se suma
+# con bincount
+def _agrupar_numpy(columnas, por, limites):
+    precios = _columna(columnas.precios)
+    stock = _columna(columnas.stock)
+    tipos = numpy.frombuffer(columnas.tipos, dtype=numpy.uint8)
+    base = 0
+    if por == "tipo":
+        claves = tipos
+    elif por == "precio":
+        claves = numpy.searchsorted(numpy.asarray(limites, dtype=numpy.float64), precios, side="right")
+    else:
+        # Meses desde 1970; se restan del primero para que los grupos empiecen en 0
+        software = tipos == columnas.TIPOS.index("software")
+        precios = precios[software]
+        stock = stock[software]
+        fechas = _columna(columnas.fechas)[software]
+        claves = (fechas - _ORDINAL_1970).astype("datetime64[D]").astype("datetime64[M]").astype(numpy.int64)
+        if len(claves):
+            base = int(claves.min())
+            claves = claves - base
+    productos = numpy.bincount(claves)
+    unidades = numpy.bincount(claves, weights=stock)
+    valores = numpy.bincount(claves, weights=precios * stock)
+    return [fila_reporte(_etiqueta(columnas, por, grupo + base, limites), productos[grupo], unidades[grupo], valores[grupo])
+            for grupo in numpy.flatnonzero(productos).tolist()]
+
+def _agrupar_python(columnas, por, limites):
+    software = columnas.TIPOS.index("software")
+    meses = {}
+    grupos = {}
+    for tipo, precio, cantidad, fecha in zip(columnas.tipos, columnas.precios, columnas.stock, columnas.fechas):
+        if por == "tipo":
+            clave = tipo
+        elif por == "precio":
+            clave = bisect_right(limites, precio)
+        elif tipo != software:
+            continue
+        else:
+            clave = meses.get(fecha)
+            if clave is None:
+                clave = meses[fecha] = date.fromordinal(fecha).strftime("%Y-%m")
+        totales = grupos.get(clave)
+        if totales is None:
+            totales = grupos[clave] = [0, 0, 0.0]
+        totales[0] += 1
+        totales[1] += cantidad
+        totales[2] += precio * cantidad
+    return [fila_reporte(_etiqueta(columnas, por, grupo, limites), *totales)
+            for grupo, totales in sorted(grupos.items())]
+
+# El mes llega como texto aaaa-mm (Python) o como meses desde 1970 (NumPy)
+def _etiqueta(columnas, por, grupo, limites):
+    if por == "tipo":
+        return columnas.TIPOS[grupo]
+    if por == "precio":
+        return etiqueta_precio(grupo, limites)
+    if isinstance(grupo, int):
+        return str(numpy.datetime64(grupo, "M"))
+    return grupo
@@ -0,0 +1,350 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from itertools import islice
+from urllib.parse import parse_qs, unquote, urlsplit
+import gestionproductos
+import gestionproductosmetricas
+import gestionproductosreportes
+from gestionproductosbackend import agregar_opciones_backend, inventario_desde_argumentos
+from gestionproductoscli import OPERACIONES
+
+_MOTIVOS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 431: "Request Header Fields Too Large", 500: "Internal Server Error",
+    501: "Not Implemented"
+}
+
+# Campos del cuerpo de PATCH /productos/{clave}; "nombre" es el nombre nuevo
+_CAMPOS_CAMBIO = ("precio", "cantidad_en_stock", "garantia", "fecha_expiracion")
+
+# Error que se responde tal cual al cliente
+class ErrorHTTP(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+def _entero(params, nombre, por_defecto=None, minimo=0, maximo=None):
+    valor = params.get(nombre)
+    if valor is None:
+        return por_defecto
+    try:
+        valor = int(valor)
+    except ValueError:
+        raise ValueError(f"El parámetro '{nombre}' debe ser un entero.")
+    if valor < minimo:
+        raise ValueError(f"El parámetro '{nombre}' debe ser mayor o igual que {minimo}.")
+    return min(valor, maximo) if maximo is not None else valor
+
+# Límites de consultar_rango: números para precio y stock, dd/mm/aaaa para fechas
+def _limite_rango(campo, valor):
+    if valor is None or campo == "fecha_expiracion":
+        return valor
+    try:
+        return int(valor) if campo == "cantidad_en_stock" else float(valor)
+    except ValueError:
+        raise ValueError(f"Límite inválido para {campo}: '{valor}'.")
+
+# Cortes de precio separados por comas: "10,50,100"
+def _limites_precio(valor):
+    if valor is None:
+        return None
+    try:
+        return [float(limite) for limite in valor.split(",")]
+    except ValueError:
+        raise ValueError(f"Límites de precio inválidos: '{valor}'.")
+
+def _ejecutar_operacion(inventario, comando):
+    return next(OPERACIONES[comando["op"]](inventario, comando))
+
+# Servidor HTTP/JSON sobre asyncio para cualquier InventarioBackend. El
+# inventario JSON vive en memoria y se usa dentro del bucle de eventos bajo un
+# asyncio.Lock; los backends SQL bloquean en la red o en el disco y se usan
+# desde un pool de `hilos` hilos. Las lecturas GET idénticas que llegan
+# mientras otra igual está en curso esperan ese mismo resultado
+class Servidor:
+    def __init__(self, inventario, hilos=5, max_cuerpo=1024 * 1024, espera_inactiva=15.0, limite_listado=1000):
+        self.inventario = inventario
+        self.en_bucle = isinstance(inventario, gestionproductos.Inventario)
+        self._lock = asyncio.Lock() if self.en_bucle else None
+        self._ejecutor = None if self.en_bucle else ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="inventario")
+        self.max_cuerpo = max_cuerpo
+        # Segundos que una conexión keep-alive puede quedar sin pedidos
+        self.espera_inactiva = espera_inactiva
+        self.limite_listado = limite_listado
+        self._en_curso = {}  # destino del GET -> tarea que lo responde
+        self.lecturas_compartidas = 0
+        self._servidor = None
+
+    async def iniciar(self, host="127.0.0.1", puerto=8000):
+        self._servidor = await asyncio.start_server(self._atender, host, puerto)
+        return self._servidor
+
+    async def servir(self, host="127.0.0.1", puerto=8000):
+        servidor = await self.iniciar(host, puerto)
+        direcciones = ", ".join(str(s.getsockname()[:2]) for s in servidor.sockets)
+        print(f"Sirviendo el inventario en {direcciones}", file=sys.stderr)
+        async with servidor:
+            await servidor.serve_forever()
+
+    def cerrar(self):
+        if self._servidor is not None:
+            self._servidor.close()
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown(wait=True)
+        self.inventario.cerrar()
+
+    # Corre `funcion` (que usa el inventario) según el backend: en el bucle
+    # bajo el lock, o en el pool de hilos
+    async def _ejecutar(self, funcion):
+        if self.en_bucle:
+            async with self._lock:
+                return funcion()
+        return await asyncio.get_running_loop().run_in_executor(self._ejecutor, funcion)
+
+    async def _leer_compartido(self, destino, funcion):
+        tarea = self._en_curso.get(destino)
+        if tarea is None:
+            tarea = asyncio.ensure_future(self._ejecutar(funcion))
+            self._en_curso[destino] = tarea
+
+            def terminar(tarea_terminada):
+                if self._en_curso.get(destino) is tarea_terminada:
+                    del self._en_curso[destino]
+            tarea.add_done_callback(terminar)
+        else:
+            self.lecturas_compartidas += 1
+        # shield: si un cliente se desconecta, la lectura sigue para los demás
+        return await asyncio.shield(tarea)
+
+    async def _atender(self, reader, writer):
+        try:
+            while True:
+                try:
+                    cabecera = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.espera_inactiva)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    writer.write(self._respuesta(431, {"error": "Cabeceras demasiado grandes."}, False))
+                    break
+                lineas = cabecera.decode("latin-1").split("\r\n")
+                try:
+                    metodo, destino, version = lineas[0].split(" ")
+                except ValueError:
+                    writer.write(self._respuesta(400, {"error": "Línea de pedido inválida."}, False))
+                    break
+                cabeceras = {}
+                for linea in lineas[1:]:
+                    nombre, _, valor = linea.partition(":")
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+                conexion = cabeceras.get("connection", "").lower()
+                mantener = conexion == "keep-alive" if version == "HTTP/1.0" else conexion != "close"
+
+                if "transfer-encoding" in cabeceras:
+                    writer.write(self._respuesta(501, {"error": "Use Content-Length en lugar de Transfer-Encoding."}, False))
+                    break
+                try:
+                    largo = int(cabeceras.get("content-length") or 0)
+                except ValueError:
+                    writer.write(self._respuesta(400, {"error": "Content-Length inválido."}, False))
+                    break
+                if largo > self.max_cuerpo:
+                    writer.write(self._respuesta(413, {"error": "Cuerpo demasiado grande."}, False))
+                    break
+                try:
+                    cuerpo = await reader.readexactly(largo) if largo else b""
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                estado, contenido, tipo = await self._despachar(metodo, destino, cuerpo)
+                writer.write(self._encabezado(estado, len(contenido), tipo, mantener) + contenido)
+                await writer.drain()
+                if not mantener:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    def _encabezado(estado, largo, tipo, mantener):
+        return (f"HTTP/1.1 {estado} {_MOTIVOS.get(estado, '')}\r\n"
+                f"Content-Type: {tipo}\r\n"
+                f"Content-Length: {largo}\r\n"
+                f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n").encode("latin-1")
+
+    @staticmethod
+    def _codificar(estado, datos):
+        if isinstance(datos, str):
+            return estado, datos.encode(), "text/plain; version=0.0.4; charset=utf-8"
+        return estado, json.dumps(datos, ensure_ascii=False).encode(), "application/json; charset=utf-8"
+
+    def _respuesta(self, estado, datos, mantener):
+        estado, contenido, tipo = self._codificar(estado, datos)
+        return self._encabezado(estado, len(contenido), tipo, mantener) + contenido
+
+    # Devuelve (estado, contenido, tipo) del pedido
+    async def _despachar(self, metodo, destino, cuerpo):
+        try:
+            partes = urlsplit(destino)
+            segmentos = [unquote(s) for s in partes.path.strip("/").split("/")]
+            params = {nombre: valores[-1] for nombre, valores in parse_qs(partes.query).items()}
+            funcion = self._ruta(metodo, segmentos, params, cuerpo)
+
+            def responder():
+                return self._codificar(*funcion())
+            if metodo == "GET":
+                return await self._leer_compartido(destino, responder)
+            return await self._ejecutar(responder)
+        except ErrorHTTP as e:
+            return self._codificar(e.estado, {"error": str(e)})
+        except LookupError as e:
+            return self._codificar(404, {"error": str(e)})
+        except (ValueError, TypeError) as e:
+            return self._codificar(400, {"error": str(e)})
+        except Exception as e:
+            print(f"Error al atender {metodo} {destino}: {e!r}", file=sys.stderr)
+            return self._codificar(500, {"error": "Error interno del servidor."})
+
+    @staticmethod
+    def _json(cuerpo):
+        try:
+            datos = json.loads(cuerpo or b"{}")
+        except ValueError:
+            raise ValueError("El cuerpo debe ser JSON.")
+        if not isinstance(datos, dict):
+            raise ValueError("El cuerpo debe ser un objeto JSON.")
+        return datos
+
+    # Elige la función que responde el pedido; devuelve una función sin
+    # argumentos que retorna (estado, datos) y que corre en _ejecutar
+    def _ruta(self, metodo, segmentos, params, cuerpo):
+        inventario = self.inventario
+        permitidos = None
+
+        if segmentos == ["salud"]:
+            permitidos = ("GET",)
+            if metodo == "GET":
+                return lambda: (200, {"ok": True})
+        elif segmentos == ["metricas"]:
+            permitidos = ("GET",)
+            if metodo == "GET":
+                return lambda: (200, gestionproductosmetricas.exportar_prometheus())
+        elif segmentos == ["productos"]:
+            permitidos = ("GET", "POST")
+            if metodo == "GET":
+                desde = _entero(params, "desde", 0)
+                limite = _entero(params, "limite", 100, minimo=1, maximo=self.limite_listado)
+                return lambda: (200, [p.to_dict() for p in islice(inventario.iterar_productos(), desde, desde + limite)])
+            if metodo == "POST":
+                comando = dict(self._json(cuerpo), op="agregar")
+                return lambda: (201, _ejecutar_operacion(inventario, comando)["producto"])
+        elif len(segmentos) == 2 and segmentos[0] == "productos":
+            permitidos = ("GET", "PATCH", "PUT", "DELETE")
+            clave = segmentos[1]
+            if metodo == "GET":
+                return lambda: (200, _ejecutar_operacion(inventario, {"op": "obtener", "clave": clave})["producto"])
+            if metodo in ("PATCH", "PUT"):
+                datos = self._json(cuerpo)
+                comando = {campo: datos[campo] for campo in _CAMPOS_CAMBIO if campo in datos}
+                comando.update(op="actualizar", clave=clave, nuevo_nombre=datos.get("nombre"))
+                return lambda: (200, _ejecutar_operacion(inventario, comando)["producto"])
+            if metodo == "DELETE":
+                return lambda: (200, _ejecutar_operacion(inventario, {"op": "eliminar", "clave": clave})["producto"])
+        elif len(segmentos) == 3 and segmentos[0] == "productos" and segmentos[2] == "stock":
+            permitidos = ("POST",)
+            if metodo == "POST":
+                comando = {"op": "ajustar", "clave": segmentos[1], "delta": self._json(cuerpo).get("delta")}
+                return lambda: (200, _ejecutar_operacion(inventario, comando)["producto"])
+        elif segmentos == ["buscar"]:
+            permitidos = ("GET",)
+            if metodo == "GET":
+                comando = {"op": "buscar", "texto": params.get("texto"),
+                           "limite": _entero(params, "limite", 10, minimo=1, maximo=self.limite_listado)}
+                return lambda: (200, [r["producto"] for r in OPERACIONES["buscar"](inventario, comando)])
+        elif len(segmentos) == 2 and segmentos[0] == "consultas":
+            permitidos = ("GET",)
+            if metodo == "GET":
+                return self._consulta(segmentos[1], params)
+        elif len(segmentos) == 2 and segmentos[0] == "reportes":
+            permitidos = ("GET",)
+            if metodo == "GET":
+                return self._reporte(segmentos[1], params)
+
+        if permitidos is None:
+            raise ErrorHTTP(404, "Ruta inexistente.")
+        raise ErrorHTTP(405, f"Método no permitido; use {', '.join(permitidos)}.")
+
+    def _consulta(self, nombre, params):
+        inventario = self.inventario
+        limite = _entero(params, "limite", 100, minimo=1, maximo=self.limite_listado)
+        if nombre == "rango":
+            campo = params.get("campo", "precio")
+            minimo = _limite_rango(campo, params.get("minimo"))
+            maximo = _limite_rango(campo, params.get("maximo"))
+            descendente = params.get("descendente", "") in ("1", "true", "si")
+
+            def consultar():
+                return inventario.consultar_rango(campo, minimo, maximo, limite, descendente)
+        elif nombre == "expirados":
+            antes_de = params.get("antes_de")
+
+            def consultar():
+                return inventario.productos_expirados(antes_de, limite)
+        elif nombre == "stock_bajo":
+            umbral = _entero(params, "umbral", 5)
+
+            def consultar():
+                return inventario.stock_bajo(umbral, limite)
+        else:
+            raise ErrorHTTP(404, f"Consulta inexistente: '{nombre}'.")
+        return lambda: (200, [p.to_dict() for p in consultar()])
+
+    def _reporte(self, nombre, params):
+        inventario = self.inventario
+        if nombre == "resumen":
+            umbral = _entero(params, "umbral", 5)
+            return lambda: (200, inventario.resumen(umbral))
+        if nombre not in gestionproductosreportes.AGRUPACIONES:
+            raise ErrorHTTP(404, f"Reporte inexistente: '{nombre}'.")
+        limites = _limites_precio(params.get("limites"))
+        return lambda: (200, inventario.reporte(nombre, limites))
+
+# Por ejemplo:
+#   python gestionproductosservidor.py --archivo productos.json --puerto 8000
+#   curl localhost:8000/productos?limite=10
+#   curl "localhost:8000/buscar?texto=mouse&limite=5"
+#   curl "localhost:8000/reportes/precio?limites=10,100,1000"
+#   curl -X POST localhost:8000/productos/mouse/stock -d '{"delta": -1}'
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON del inventario.")
+    agregar_opciones_backend(parser)
+    parser.add_argument("--escuchar", default="127.0.0.1", help="dirección del servidor")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--hilos", type=int, default=5, help="hilos para los backends SQL (no más que su pool)")
+    parser.add_argument("--silencioso", action="store_true", help="descarta los mensajes de cada operación")
+    # Un servidor escribe seguido: con el journal cada cambio agrega una línea
+    # en lugar de reescribir el archivo JSON completo
+    parser.set_defaults(journal=True)
+    args = parser.parse_args(argumentos)
+
+    # Los backends informan cada operación con print: a stderr, o a ningún lado
+    with open(os.devnull, 'w') as nulo, redirect_stdout(nulo if args.silencioso else sys.stderr):
+        servidor = Servidor(inventario_desde_argumentos(args), hilos=args.hilos)
+        try:
+            asyncio.run(servidor.servir(args.escuchar, args.puerto))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.cerrar()
+
+if __name__ == "__main__":
+    main()
@@ -1,97 +1,180 @@
-import mysql.connector
-from mysql.connector import errorcode
+try:
+    import mysql.connector
+    from mysql.connector import errorcode, pooling
+except ImportError:
+    # Sin mysql-connector-python solo se puede usar gestionproductossqlite
+    mysql = errorcode = pooling = None
+import argparse
 import os
-import platform
-from datetime import datetime
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import islice
+from datetime import date, datetime, timedelta
 import uuid
-
-# Función para limpiar la pantalla
-def limpiar_pantalla():
-    sistema = platform.system()
-    if sistema == "Windows":
-        os.system("cls")
-    else:
-        os.system("clear")
-
-# Función para validar el tipo de producto
-def validar_tipo_producto(tipo):
-    tipos_validos = {"hardware", "software"}
-    tipo = tipo if tipo is not None else ""
-    tipo_normalizado = tipo.strip().lower()
-    return tipo_normalizado in tipos_validos
-
-# Función para validar la fecha en formato dd/mm/aaaa
-def validar_fecha(fecha):
-    try:
-        datetime.strptime(fecha, "%d/%m/%Y")
-        return True
-    except ValueError:
-        return False
-
-# Clase base Producto
-class Producto:
-    def __init__(self, nombre, precio, cantidad_en_stock):
-        self.id = str(uuid.uuid4())  # Generar un ID único
-        if not isinstance(nombre, str) or not nombre.strip():
-            raise ValueError("El producto debe contener un nombre. Por favor ingresalo!!")
-        if not isinstance(precio, (int, float)) or precio <= 0:
-            raise ValueError("El precio debe ser un número positivo.")
-        if not isinstance(cantidad_en_stock, int) or cantidad_en_stock < 0:
-            raise ValueError("La cantidad en stock debe ser un entero no negativo.")
-        self.nombre = nombre
-        self.precio = precio
-        self.cantidad_en_stock = cantidad_en_stock
-
-    def to_dict(self):
+import gestionproductos
+import gestionproductosmetricas
+import gestionproductosreportes
+from gestionproductos import ProductoHardware, ProductoSoftware
+from gestionproductosbackend import InventarioBackend
+
+# Acepta un date o un texto dd/mm/aaaa y devuelve un date
+def _como_fecha(fecha):
+    if isinstance(fecha, date):
+        return fecha
+    return datetime.strptime(fecha, "%d/%m/%Y").date()
+
+# Texto dd/mm/aaaa de una fecha leída de la base
+def _fecha_a_texto(fecha):
+    if isinstance(fecha, date):
+        return fecha.strftime("%d/%m/%Y")
+    return fecha
+
+# Columnas en el orden que espera _producto_desde_fila
+COLUMNAS = "id, nombre, precio, cantidad_en_stock, garantia, fecha_expiracion, tipo"
+
+# Campos con índice para consultas por rango
+CAMPOS_CONSULTABLES = ("precio", "cantidad_en_stock", "fecha_expiracion")
+
+# Campos NOT NULL por los que se puede recorrer la tabla con paginación por clave
+CAMPOS_ORDENABLES = ("id", "nombre", "precio", "cantidad_en_stock")
+
+_INSERTAR = f"INSERT INTO productos ({COLUMNAS}) VALUES (%s, %s, %s, %s, %s, %s, %s)"
+
+# Alta que omite los productos cuyo id o nombre ya existe
+_INSERTAR_OMITIENDO = _INSERTAR + " ON DUPLICATE KEY UPDATE id = id"
+
+# Alta que, si el id o el nombre ya existe, actualiza precio, stock y garantía/fecha
+_INSERTAR_O_ACTUALIZAR = _INSERTAR + """
+ON DUPLICATE KEY UPDATE precio = VALUES(precio), cantidad_en_stock = VALUES(cantidad_en_stock),
+garantia = VALUES(garantia), fecha_expiracion = VALUES(fecha_expiracion)
+"""
+
+# Nombres que empiezan con un texto; la intercalación de MySQL no distingue
+# mayúsculas ni tildes y el índice único de nombre resuelve el prefijo
+_BUSCAR_PREFIJO = f"SELECT {COLUMNAS} FROM productos WHERE nombre LIKE %s ORDER BY nombre LIMIT %s"
+
+# Escapa los comodines de LIKE para buscar el texto literal
+def _escapar_like(texto):
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+# Divide un iterable en listas de a lo sumo `tamano` elementos
+def _lotes(iterable, tamano):
+    iterador = iter(iterable)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
+
+# Caché LRU de productos por id y nombre; con `ttl` (segundos) las entradas
+# vencen aunque no se las desaloje. Los productos entregados son compartidos y
+# no deben modificarse
+class CacheProductos:
+    def __init__(self, tamano=1024, ttl=None):
+        if not isinstance(tamano, int) or tamano <= 0:
+            raise ValueError("El tamaño de la caché debe ser un entero positivo.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("El vencimiento de la caché debe ser un número positivo.")
+        self.tamano = tamano
+        self.ttl = ttl
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()  # id -> (producto, vencimiento), del menos al más usado
+        self._nombres = {}  # nombre -> id
+        # Aumenta con cada invalidación; una lectura que empezó antes no guarda
+        # su fila, que puede ser la anterior a la escritura
+        self.generacion = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def obtener(self, columna, valor):
+        with self._lock:
+            id_producto = valor if columna == "id" else self._nombres.get(valor)
+            entrada = self._entradas.get(id_producto)
+            if entrada is not None and entrada[1] is not None and entrada[1] <= time.monotonic():
+                self._quitar(id_producto)
+                entrada = None
+            if entrada is None:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(id_producto)
+            self.aciertos += 1
+            return entrada[0]
+
+    # `generacion` es la que leyó quien consultó la base antes del SELECT
+    def guardar(self, producto, generacion=None):
+        with self._lock:
+            if generacion is not None and generacion != self.generacion:
+                return
+            self._quitar(producto.id)
+            vencimiento = time.monotonic() + self.ttl if self.ttl is not None else None
+            self._entradas[producto.id] = (producto, vencimiento)
+            self._nombres[producto.nombre] = producto.id
+            while len(self._entradas) > self.tamano:
+                self._quitar(next(iter(self._entradas)))
+
+    # Descarta el producto con ese id o nombre
+    def invalidar(self, clave):
+        with self._lock:
+            self.generacion += 1
+            self._quitar(clave if clave in self._entradas else self._nombres.get(clave))
+
+    def limpiar(self):
+        with self._lock:
+            self.generacion += 1
+            self._entradas.clear()
+            self._nombres.clear()
+
+    def _quitar(self, id_producto):
+        entrada = self._entradas.pop(id_producto, None)
+        if entrada is not None and self._nombres.get(entrada[0].nombre) == id_producto:
+            del self._nombres[entrada[0].nombre]
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
         return {
-            "id": self.id,
-            "nombre": self.nombre,
-            "precio": self.precio,
-            "cantidad_en_stock": self.cantidad_en_stock
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "entradas": len(self._entradas),
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0
         }
 
-# Clase derivada ProductoHardware
-class ProductoHardware(Producto):
-    def __init__(self, nombre, precio, cantidad_en_stock, garantia):
-        super().__init__(nombre, precio, cantidad_en_stock)
-        if not isinstance(garantia, str) or not garantia.strip():
-            raise ValueError("Si el producto no tiene garantía, escriba '0'.")
-        self.garantia = garantia
-
-    def to_dict(self):
-        data = super().to_dict()
-        data["garantia"] = self.garantia
-        data["tipo"] = "hardware"
-        return data
-
-# Clase derivada ProductoSoftware
-class ProductoSoftware(Producto):
-    def __init__(self, nombre, precio, cantidad_en_stock, fecha_expiracion):
-        super().__init__(nombre, precio, cantidad_en_stock)
-        if not isinstance(fecha_expiracion, str) or not fecha_expiracion.strip():
-            raise ValueError("La fecha de expiración no debe quedar en blanco. Si no tiene fecha de expiracion use: '31/12/2999'")
-        if not validar_fecha(fecha_expiracion):
-            raise ValueError("La fecha de expiración debe estar en el formato dd/mm/aaaa.")
-        self.fecha_expiracion = fecha_expiracion
-
-    def to_dict(self):
-        data = super().to_dict()
-        data["fecha_expiracion"] = self.fecha_expiracion
-        data["tipo"] = "software"
-        return data
-
 # Clase Inventario
-class Inventario:
-    def __init__(self, host, user, password, database, port=3306):
+class Inventario(InventarioBackend):
+    # Lo propio del motor está en estos atributos y en los métodos _nuevo_cursor,
+    # _liberar_conexion, _iniciar_transaccion y _campo_duplicado, que
+    # gestionproductossqlite redefine
+    _ErrorIntegridad = mysql.connector.IntegrityError if mysql else None
+    _INSERTAR_OMITIENDO = _INSERTAR_OMITIENDO
+    _INSERTAR_O_ACTUALIZAR = _INSERTAR_O_ACTUALIZAR
+    _BUSCAR_PREFIJO = _BUSCAR_PREFIJO
+
+    def __init__(self, host, user, password, database, port=3306, tamano_pool=5, reintentos=3, espera_reintento=0.2, tamano_cache=0, ttl_cache=None):
+        if mysql is None:
+            raise ImportError("El backend MySQL necesita el paquete mysql-connector-python.")
+        # Cada operación toma una conexión del pool y la devuelve al terminar, así
+        # varios hilos pueden compartir el mismo Inventario
+        self.reintentos = reintentos
+        self.espera_reintento = espera_reintento
+        self._semaforo = threading.BoundedSemaphore(tamano_pool)
+        self._local = threading.local()  # Conexión de la transacción abierta en cada hilo
+        # Con tamano_cache > 0 las lecturas por id o nombre pasan por una caché
+        # que cada escritura de este Inventario invalida
+        self.cache = CacheProductos(tamano_cache, ttl_cache) if tamano_cache else None
         try:
-            self.conn = mysql.connector.connect(
+            self.pool = pooling.MySQLConnectionPool(
+                pool_size=tamano_pool,
                 host=host,
                 user=user,
                 password=password,
                 database=database,
                 port=port
             )
-            self.cursor = self.conn.cursor()
             self.crear_tabla()
         except mysql.connector.Error as err:
             if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
@@ -102,181 +185,632 @@ class Inventario:
                 print(err)
             exit(1)
 
+    def _obtener_conexion(self):
+        # El pool reconecta las conexiones caídas al entregarlas; si MySQL no
+        # responde se reintenta con espera exponencial
+        for intento in range(self.reintentos + 1):
+            try:
+                return self.pool.get_connection()
+            except (mysql.connector.InterfaceError, mysql.connector.OperationalError, pooling.PoolError):
+                if intento == self.reintentos:
+                    raise
+                time.sleep(self.espera_reintento * 2 ** intento)
+
+    # Entrega un cursor sobre una conexión del pool; confirma al salir del bloque
+    # o deshace los cambios si hubo una excepción. Dentro de transaccion() usa la
+    # conexión de la transacción y deja el commit para el final de esta
+    @contextmanager
+    def _cursor(self, buffered=True):
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is not None:
+            cursor = self._cursor_de(conexion, buffered)
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+            return
+        with self._semaforo:
+            conexion = self._obtener_conexion()
+            try:
+                cursor = self._cursor_de(conexion, buffered)
+                try:
+                    yield cursor
+                    conexion.commit()
+                except BaseException:
+                    conexion.rollback()
+                    raise
+                finally:
+                    cursor.close()
+            finally:
+                self._liberar_conexion(conexion)
+
+    # Agrupa varias operaciones en un único commit; si el bloque lanza una
+    # excepción se deshacen todas. Las transacciones anidadas se unen a la externa
+    @contextmanager
+    def transaccion(self):
+        if getattr(self._local, "conexion", None) is not None:
+            yield self
+            return
+        with self._semaforo:
+            conexion = self._obtener_conexion()
+            try:
+                self._iniciar_transaccion(conexion)
+                self._local.conexion = conexion
+                self._local.invalidadas = set()
+                try:
+                    yield self
+                    conexion.commit()
+                except BaseException:
+                    conexion.rollback()
+                    raise
+                finally:
+                    self._local.conexion = None
+                    # Otro hilo pudo volver a cachear el valor anterior antes del commit
+                    for clave in self._local.invalidadas:
+                        self._invalidar(clave)
+            finally:
+                self._liberar_conexion(conexion)
+
+    def _cursor_de(self, conexion, buffered):
+        cursor = self._nuevo_cursor(conexion, buffered)
+        if gestionproductosmetricas.activas:
+            return gestionproductosmetricas.CursorMedido(cursor, gestionproductosmetricas.backend_de(self))
+        return cursor
+
+    def _nuevo_cursor(self, conexion, buffered):
+        return conexion.cursor(buffered=buffered)
+
+    def _liberar_conexion(self, conexion):
+        conexion.close()  # Devuelve la conexión al pool
+
+    def _iniciar_transaccion(self, conexion):
+        conexion.start_transaction()
+
+    # "id" o "nombre" según la restricción que violó el error, o None si no
+    # es un duplicado
+    def _campo_duplicado(self, err):
+        if err.errno != errorcode.ER_DUP_ENTRY:
+            return None
+        return "id" if "PRIMARY" in str(err) else "nombre"
+
+    def _en_transaccion(self):
+        return getattr(self._local, "conexion", None) is not None
+
+    # Quita de la caché el producto con esa clave, o todo si clave es None
+    def _invalidar(self, clave=None):
+        if self.cache is None:
+            return
+        if clave is None:
+            self.cache.limpiar()
+        else:
+            self.cache.invalidar(clave)
+        if self._en_transaccion():
+            self._local.invalidadas.add(clave)
+
     def crear_tabla(self):
-        self.cursor.execute("""
-        CREATE TABLE IF NOT EXISTS productos (
-            id VARCHAR(36) PRIMARY KEY,
-            nombre VARCHAR(255) NOT NULL,
-            precio DECIMAL(10, 2) NOT NULL,
-            cantidad_en_stock INT NOT NULL,
-            garantia VARCHAR(50),
-            fecha_expiracion VARCHAR(10),
-            tipo VARCHAR(50) NOT NULL
+        with self._cursor() as cursor:
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS productos (
+                id VARCHAR(36) PRIMARY KEY,
+                nombre VARCHAR(255) NOT NULL,
+                precio DECIMAL(10, 2) NOT NULL,
+                cantidad_en_stock INT NOT NULL,
+                garantia VARCHAR(50),
+                fecha_expiracion DATE,
+                tipo VARCHAR(50) NOT NULL
+            )
+            """)
+        self.migrar_esquema()
+        self.crear_indices()
+
+    # Convierte tablas creadas con fecha_expiracion VARCHAR(10) dd/mm/aaaa a DATE
+    def migrar_esquema(self):
+        with self._cursor() as cursor:
+            cursor.execute("""
+            SELECT DATA_TYPE FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'productos' AND COLUMN_NAME = 'fecha_expiracion'
+            """)
+            fila = cursor.fetchone()
+            tipo_columna = fila[0] if fila else None
+            if isinstance(tipo_columna, (bytes, bytearray)):
+                tipo_columna = tipo_columna.decode()
+            if not tipo_columna or tipo_columna.lower() == "date":
+                return
+            print("Migrando fecha_expiracion a DATE...")
+            cursor.execute("ALTER TABLE productos ADD COLUMN fecha_expiracion_nueva DATE NULL AFTER fecha_expiracion")
+            cursor.execute("""
+            UPDATE productos SET fecha_expiracion_nueva = STR_TO_DATE(fecha_expiracion, '%d/%m/%Y')
+            WHERE fecha_expiracion IS NOT NULL AND fecha_expiracion <> ''
+            """)
+            cursor.execute("""
+            ALTER TABLE productos DROP COLUMN fecha_expiracion,
+            CHANGE COLUMN fecha_expiracion_nueva fecha_expiracion DATE NULL
+            """)
+
+    def _crear_indice(self, nombre, columnas, unico=False):
+        try:
+            with self._cursor() as cursor:
+                cursor.execute(f"CREATE {'UNIQUE ' if unico else ''}INDEX {nombre} ON productos ({columnas})")
+        except mysql.connector.Error as err:
+            if err.errno == errorcode.ER_DUP_ENTRY:
+                print(f"No se pudo crear el índice único {nombre}: hay valores repetidos en ({columnas}).")
+            elif err.errno != errorcode.ER_DUP_KEYNAME:
+                raise
+
+    def crear_indices(self):
+        # El índice único sobre nombre evita el recorrido completo de la tabla en
+        # las búsquedas por nombre y hace que MySQL rechace los duplicados
+        self._crear_indice("uq_productos_nombre", "nombre", unico=True)
+        self._crear_indice("idx_productos_precio", "precio")
+        self._crear_indice("idx_productos_stock", "cantidad_en_stock")
+        self._crear_indice("idx_productos_fecha", "fecha_expiracion")
+        self._crear_indice_busqueda()
+
+    # Índice FULLTEXT con el analizador ngram (bigramas por defecto): permite
+    # buscar fragmentos del nombre ordenados por relevancia. MariaDB y MySQL
+    # anterior a 5.7.6 no tienen ngram: la búsqueda queda solo por prefijo
+    def _crear_indice_busqueda(self):
+        try:
+            with self._cursor() as cursor:
+                cursor.execute("CREATE FULLTEXT INDEX ft_productos_nombre ON productos (nombre) WITH PARSER ngram")
+            self._fts = True
+        except mysql.connector.Error as err:
+            self._fts = err.errno == errorcode.ER_DUP_KEYNAME
+            if not self._fts:
+                print(f"Búsqueda por fragmentos no disponible: {err}")
+
+    def _producto_desde_fila(self, fila):
+        id_producto, nombre, precio, cantidad_en_stock, garantia, fecha_expiracion, tipo = fila
+        precio = float(precio)
+        cantidad_en_stock = int(cantidad_en_stock)
+        if precio <= 0:
+            raise ValueError("El precio debe ser un número positivo.")
+        if tipo == "hardware":
+            return ProductoHardware(nombre, precio, cantidad_en_stock, garantia, id=id_producto)
+        if tipo == "software":
+            return ProductoSoftware(nombre, precio, cantidad_en_stock, _fecha_a_texto(fecha_expiracion), id=id_producto)
+        return None
+
+    # Valores de una fila para un producto o para su diccionario. Los
+    # diccionarios pasan por los constructores, así un dato inválido lanza
+    # ValueError y deshace el lote entero
+    @staticmethod
+    def _valores_fila(producto):
+        if isinstance(producto, dict):
+            try:
+                producto = gestionproductos.producto_desde_dict(producto)
+            except KeyError as e:
+                raise ValueError(f"Falta el campo {e} del producto.")
+            if producto is None:
+                raise ValueError("El tipo de producto debe ser 'hardware' o 'software'.")
+        data = producto.to_dict()
+        fecha = data.get("fecha_expiracion")
+        return (
+            data.get("id") or str(uuid.uuid4()),
+            data["nombre"],
+            data["precio"],
+            data["cantidad_en_stock"],
+            data.get("garantia"),
+            _como_fecha(fecha) if fecha else None,
+            data["tipo"]
         )
-        """)
-        self.conn.commit()
 
     def agregar_producto(self, producto):
-        if self.obtener_producto(producto.nombre):
-            print("Producto con el mismo nombre ya existe.")
+        query = _INSERTAR
+        values = self._valores_fila(producto)
+        # Los duplicados los detecta la restricción UNIQUE al insertar, sin una
+        # consulta previa que pueda quedar desactualizada con otros clientes
+        try:
+            with self._cursor() as cursor:
+                cursor.execute(query, values)
+        except self._ErrorIntegridad as err:
+            campo = self._campo_duplicado(err)
+            if campo is None:
+                raise
+            if campo == "id":
+                print("Producto con el mismo ID ya existe.")
+            else:
+                print("Producto con el mismo nombre ya existe.")
             return
-        query = """
-        INSERT INTO productos (id, nombre, precio, cantidad_en_stock, garantia, fecha_expiracion, tipo)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
-        values = (
-            producto.id,
-            producto.nombre,
-            producto.precio,
-            producto.cantidad_en_stock,
-            getattr(producto, 'garantia', None),
-            getattr(producto, 'fecha_expiracion', None),
-            'hardware' if isinstance(producto, ProductoHardware) else 'software'
-        )
-        self.cursor.execute(query, values)
-        self.conn.commit()
         print(f"Producto {producto.nombre} agregado exitosamente.")
 
+    # Alta masiva en una sola transacción; cada lote viaja como un INSERT de
+    # varias filas y los duplicados se omiten sin error
+    def agregar_productos(self, productos, tamano_lote=1000):
+        query = self._INSERTAR_OMITIENDO
+        agregados = total = 0
+        with self._cursor() as cursor:
+            for lote in _lotes(productos, tamano_lote):
+                cursor.executemany(query, [self._valores_fila(p) for p in lote])
+                agregados += cursor.rowcount
+                total += len(lote)
+        self._invalidar()
+        print(f"{agregados} productos agregados, {total - agregados} omitidos.")
+        return agregados
+
+    # Alta o actualización masiva en una sola transacción: los productos que ya
+    # existen (por id o nombre) toman precio, stock y garantía/fecha
+    def actualizar_productos(self, productos, tamano_lote=1000):
+        query = self._INSERTAR_O_ACTUALIZAR
+        total = 0
+        with self._cursor() as cursor:
+            for lote in _lotes(productos, tamano_lote):
+                cursor.executemany(query, [self._valores_fila(p) for p in lote])
+                total += len(lote)
+        self._invalidar()
+        print(f"{total} productos procesados.")
+        return total
+
+    # Recorre la tabla de a `tamano_lote` filas y devuelve diccionarios con el
+    # mismo formato que productos.json
+    def iterar_registros(self, tamano_lote=1000):
+        # Cursor sin buffer: las filas llegan del servidor a medida que se piden
+        with self._cursor(buffered=False) as cursor:
+            cursor.execute(f"SELECT {COLUMNAS} FROM productos")
+            while True:
+                filas = cursor.fetchmany(tamano_lote)
+                if not filas:
+                    return
+                for fila in filas:
+                    producto = self._producto_desde_fila(fila)
+                    if producto:
+                        yield producto.to_dict()
+
+    def importar_json(self, archivo, actualizar=False, tamano_lote=1000):
+        productos = gestionproductos.iterar_productos_archivo(archivo)
+        if actualizar:
+            return self.actualizar_productos(productos, tamano_lote)
+        return self.agregar_productos(productos, tamano_lote)
+
+    def exportar_json(self, archivo, tamano_lote=1000):
+        temporal = archivo + ".tmp"
+        with open(temporal, 'w') as f:
+            gestionproductos.escribir_registros(f, self.iterar_registros(tamano_lote))
+        os.replace(temporal, archivo)
+        print(f"Productos exportados a {archivo}.")
+
     def obtener_producto(self, nombre):
-        query = "SELECT * FROM productos WHERE nombre = %s"
-        self.cursor.execute(query, (nombre,))
-        result = self.cursor.fetchone()
+        return self._obtener_donde("nombre", nombre)
+
+    def obtener_producto_por_id(self, id_producto):
+        return self._obtener_donde("id", id_producto)
+
+    # Primero el nombre exacto y los que empiezan con el texto, con el índice de
+    # nombre; si no alcanzan, los que comparten más fragmentos con el texto
+    def buscar_productos(self, texto, limite=10):
+        consulta = " ".join(texto.lower().split())
+        if not consulta or limite <= 0:
+            return []
+        with self._cursor() as cursor:
+            cursor.execute(self._BUSCAR_PREFIJO, (_escapar_like(consulta) + "%", limite))
+            filas = cursor.fetchall()
+            if len(filas) < limite:
+                filas += self._buscar_aproximado(cursor, consulta, limite)
+        productos = {}
+        for fila in filas:
+            if fila[0] in productos:
+                continue
+            try:
+                producto = self._producto_desde_fila(fila)
+            except ValueError as e:
+                print(f"Error al recuperar el producto: {e}")
+                continue
+            if producto:
+                productos[producto.id] = producto
+        return list(productos.values())[:limite]
+
+    # En modo natural, MATCH ordena por la cantidad de n-gramas en común: los
+    # nombres que contienen el texto quedan primero y luego los parecidos
+    def _buscar_aproximado(self, cursor, consulta, limite):
+        if not self._fts:
+            return []
+        cursor.execute(f"""
+        SELECT {COLUMNAS} FROM productos WHERE MATCH(nombre) AGAINST (%s IN NATURAL LANGUAGE MODE)
+        ORDER BY MATCH(nombre) AGAINST (%s IN NATURAL LANGUAGE MODE) DESC LIMIT %s
+        """, (consulta, consulta, limite * 2))
+        return cursor.fetchall()
+
+    def _obtener_donde(self, columna, valor):
+        # Dentro de una transacción se lee siempre de MySQL y no se cachea,
+        # porque la fila puede tener cambios sin confirmar
+        usar_cache = self.cache is not None and not self._en_transaccion()
+        if usar_cache:
+            producto = self.cache.obtener(columna, valor)
+            if gestionproductosmetricas.activas:
+                gestionproductosmetricas.contar("gestionproductos_cache_total", backend=gestionproductosmetricas.backend_de(self),
+                                                resultado="acierto" if producto is not None else "fallo")
+            if producto is not None:
+                return producto
+            generacion = self.cache.generacion
+        query = f"SELECT {COLUMNAS} FROM productos WHERE {columna} = %s"
+        with self._cursor() as cursor:
+            cursor.execute(query, (valor,))
+            result = cursor.fetchone()
         if result:
             try:
-                tipo = result[-1]
-                if tipo == "hardware":
-                    # Verifica que los valores se conviertan correctamente
-                    precio = float(result[2])
-                    cantidad_en_stock = int(result[3])
-                    if precio <= 0:
-                        raise ValueError("El precio debe ser un número positivo.")
-                    return ProductoHardware(result[1], precio, cantidad_en_stock, result[4])
-                elif tipo == "software":
-                    # Verifica que los valores se conviertan correctamente
-                    precio = float(result[2])
-                    cantidad_en_stock = int(result[3])
-                    if precio <= 0:
-                        raise ValueError("El precio debe ser un número positivo.")
-                    return ProductoSoftware(result[1], precio, cantidad_en_stock, result[5])
+                producto = self._producto_desde_fila(result)
             except ValueError as e:
                 print(f"Error al recuperar el producto: {e}")
+                return None
+            if usar_cache and producto:
+                self.cache.guardar(producto, generacion)
+            return producto
         return None
 
+    # Productos con `campo` entre minimo y maximo (ambos inclusive), ordenados
+    # por ese campo; el filtro y el límite se resuelven en MySQL con el índice
+    def consultar_rango(self, campo, minimo=None, maximo=None, limite=None, descendente=False):
+        if campo not in CAMPOS_CONSULTABLES:
+            raise ValueError(f"No se puede consultar por el campo '{campo}'.")
+        condiciones = []
+        valores = []
+        if campo == "fecha_expiracion":
+            condiciones.append("fecha_expiracion IS NOT NULL")
+            minimo = _como_fecha(minimo) if minimo is not None else None
+            maximo = _como_fecha(maximo) if maximo is not None else None
+        if minimo is not None:
+            condiciones.append(f"{campo} >= %s")
+            valores.append(minimo)
+        if maximo is not None:
+            condiciones.append(f"{campo} <= %s")
+            valores.append(maximo)
+        query = f"SELECT {COLUMNAS} FROM productos"
+        if condiciones:
+            query += " WHERE " + " AND ".join(condiciones)
+        query += f" ORDER BY {campo} {'DESC' if descendente else 'ASC'}"
+        if limite is not None:
+            query += " LIMIT %s"
+            valores.append(int(limite))
+        with self._cursor() as cursor:
+            cursor.execute(query, tuple(valores))
+            filas = cursor.fetchall()
+        productos = []
+        for fila in filas:
+            try:
+                producto = self._producto_desde_fila(fila)
+            except ValueError as e:
+                print(f"Error al recuperar el producto: {e}")
+                continue
+            if producto:
+                productos.append(producto)
+        return productos
+
+    # Productos de software cuya fecha de expiración es anterior a `antes_de` (hoy por defecto)
+    def productos_expirados(self, antes_de=None, limite=None):
+        antes_de = _como_fecha(antes_de or date.today())
+        return self.consultar_rango("fecha_expiracion", maximo=antes_de - timedelta(days=1), limite=limite)
+
+    # Los totales se suman en la base con GROUP BY; no se traen filas
+    def resumen(self, umbral_stock=5):
+        with self._cursor() as cursor:
+            cursor.execute("""
+            SELECT tipo, COUNT(*), SUM(cantidad_en_stock), SUM(precio * cantidad_en_stock)
+            FROM productos GROUP BY tipo
+            """)
+            por_tipo = cursor.fetchall()
+            cursor.execute("SELECT COUNT(*) FROM productos WHERE cantidad_en_stock < %s", (umbral_stock,))
+            stock_bajo = cursor.fetchone()[0]
+        return gestionproductosreportes.resumen(por_tipo, stock_bajo, umbral_stock)
+
+    # Un GROUP BY por grupo; los intervalos de precio se numeran con CASE y el
+    # mes sale de la fecha en formato aaaa-mm-dd
+    def reporte(self, por, limites=None):
+        limites = gestionproductosreportes.validar_agrupacion(por, limites)
+        valores = ()
+        condicion = ""
+        if por == "tipo":
+            grupo = "tipo"
+        elif por == "precio":
+            grupo = "CASE " + " ".join(f"WHEN precio < %s THEN {i}" for i in range(len(limites))) + f" ELSE {len(limites)} END"
+            valores = limites
+        else:
+            grupo = "SUBSTR(fecha_expiracion, 1, 7)"
+            condicion = " WHERE fecha_expiracion IS NOT NULL"
+        with self._cursor() as cursor:
+            cursor.execute(f"""
+            SELECT {grupo} AS grupo, COUNT(*), SUM(cantidad_en_stock), SUM(precio * cantidad_en_stock)
+            FROM productos{condicion} GROUP BY grupo ORDER BY grupo
+            """, valores)
+            filas = cursor.fetchall()
+        return [gestionproductosreportes.fila_reporte(
+                    gestionproductosreportes.etiqueta_precio(grupo, limites) if por == "precio" else grupo, *totales)
+                for grupo, *totales in filas]
+
     def actualizar_producto(self, nombre, nuevo_nombre=None, nuevo_precio=None, nueva_cantidad=None, nueva_garantia=None, nueva_fecha=None):
-        producto = self.obtener_producto(nombre)
-        if producto:
-            if isinstance(producto, ProductoHardware):
-                query = """
-                UPDATE productos
-                SET nombre = %s, precio = %s, cantidad_en_stock = %s, garantia = %s
-                WHERE nombre = %s
-                """
-                values = (
-                    nuevo_nombre or producto.nombre,
-                    nuevo_precio or producto.precio,
-                    nueva_cantidad or producto.cantidad_en_stock,
-                    nueva_garantia if nueva_garantia is not None else producto.garantia,
-                    nombre
-                )
-            elif isinstance(producto, ProductoSoftware):
-                query = """
-                UPDATE productos
-                SET nombre = %s, precio = %s, cantidad_en_stock = %s, fecha_expiracion = %s
-                WHERE nombre = %s
-                """
-                values = (
-                    nuevo_nombre or producto.nombre,
-                    nuevo_precio or producto.precio,
-                    nueva_cantidad or producto.cantidad_en_stock,
-                    nueva_fecha if nueva_fecha is not None else producto.fecha_expiracion,
-                    nombre
-                )
-            
-            self.cursor.execute(query, values)
-            self.conn.commit()
-            print(f"Producto {nombre} actualizado exitosamente.")
+        self._actualizar_donde("nombre", nombre, nuevo_nombre, nuevo_precio, nueva_cantidad, nueva_garantia, nueva_fecha)
+
+    def actualizar_producto_por_id(self, id_producto, nuevo_nombre=None, nuevo_precio=None, nueva_cantidad=None, nueva_garantia=None, nueva_fecha=None):
+        self._actualizar_donde("id", id_producto, nuevo_nombre, nuevo_precio, nueva_cantidad, nueva_garantia, nueva_fecha)
+
+    # Un único UPDATE atómico: los campos en None conservan el valor actual
+    # (COALESCE) y la garantía o la fecha sólo se tocan según el tipo, así dos
+    # ediciones concurrentes no pisan los campos que no cambiaron
+    def _actualizar_donde(self, columna, clave, nuevo_nombre, nuevo_precio, nueva_cantidad, nueva_garantia, nueva_fecha):
+        query = f"""
+        UPDATE productos
+        SET nombre = COALESCE(%s, nombre),
+            precio = COALESCE(%s, precio),
+            cantidad_en_stock = COALESCE(%s, cantidad_en_stock),
+            garantia = CASE WHEN tipo = 'hardware' THEN COALESCE(%s, garantia) ELSE garantia END,
+            fecha_expiracion = CASE WHEN tipo = 'software' THEN COALESCE(%s, fecha_expiracion) ELSE fecha_expiracion END
+        WHERE {columna} = %s
+        """
+        # Como en el backend JSON: garantía en blanco es '0' y fecha en blanco no cambia
+        if nueva_garantia is not None and not nueva_garantia.strip():
+            nueva_garantia = '0'
+        try:
+            fecha = _como_fecha(nueva_fecha) if nueva_fecha and nueva_fecha.strip() else None
+        except ValueError:
+            print("Error al actualizar el producto: La nueva fecha debe estar en el formato dd/mm/aaaa.")
+            return
+        values = (
+            nuevo_nombre or None,
+            nuevo_precio,
+            nueva_cantidad,
+            nueva_garantia,
+            fecha,
+            clave
+        )
+        try:
+            with self._cursor() as cursor:
+                cursor.execute(query, values)
+                encontrado = cursor.rowcount > 0
+                if not encontrado:
+                    # MySQL informa 0 filas también cuando los valores no cambian
+                    cursor.execute(f"SELECT 1 FROM productos WHERE {columna} = %s", (clave,))
+                    encontrado = cursor.fetchone() is not None
+            self._invalidar(clave)
+        except self._ErrorIntegridad as err:
+            if self._campo_duplicado(err) is None:
+                raise
+            print("Producto con el mismo nombre ya existe.")
+            return
+        if encontrado:
+            print(f"Producto {clave} actualizado exitosamente.")
         else:
             print("Producto no encontrado.")
-            
+
+    # Suma `delta` (negativo para descontar) al stock del producto con ese id o
+    # nombre en un único UPDATE condicional: MySQL bloquea la fila, así los
+    # ajustes concurrentes no se pierden y el stock nunca queda negativo
+    def ajustar_stock(self, clave, delta):
+        if not isinstance(delta, int):
+            print("El ajuste de stock debe ser un entero.")
+            return False
+        with self._cursor() as cursor:
+            ajustado = self._ajustar_stock(cursor, clave, delta)
+        if ajustado:
+            self._invalidar(clave)
+        return ajustado
+
+    def _ajustar_stock(self, cursor, clave, delta):
+        cursor.execute("""
+        UPDATE productos SET cantidad_en_stock = cantidad_en_stock + %s
+        WHERE (id = %s OR nombre = %s) AND cantidad_en_stock + %s >= 0
+        """, (delta, clave, clave, delta))
+        if cursor.rowcount > 0:
+            return True
+        # Sin filas afectadas: el producto no existe, el stock no alcanza o delta es 0
+        cursor.execute("SELECT cantidad_en_stock FROM productos WHERE id = %s OR nombre = %s", (clave, clave))
+        fila = cursor.fetchone()
+        if fila is None:
+            print("Producto no encontrado.")
+            return False
+        if delta != 0:
+            print(f"Stock insuficiente para {clave}.")
+            return False
+        return True
+
+    # Aplica una lista de (id o nombre, delta) en una sola transacción; los
+    # ajustes que dejarían el stock negativo se rechazan sin afectar a los demás.
+    # Se ordenan por clave para que lotes concurrentes bloqueen las filas en el
+    # mismo orden y no se produzcan deadlocks
+    def ajustar_stock_lote(self, ajustes):
+        aplicados = rechazados = 0
+        with self._cursor() as cursor:
+            for clave, delta in sorted(ajustes, key=lambda ajuste: str(ajuste[0])):
+                if isinstance(delta, int) and self._ajustar_stock(cursor, clave, delta):
+                    aplicados += 1
+                else:
+                    rechazados += 1
+        self._invalidar()
+        print(f"{aplicados} ajustes de stock aplicados, {rechazados} rechazados.")
+        return aplicados
+
     def eliminar_producto(self, nombre):
-        query = "DELETE FROM productos WHERE nombre = %s"
-        self.cursor.execute(query, (nombre,))
-        self.conn.commit()
-        if self.cursor.rowcount > 0:
-            print(f"Producto {nombre} eliminado exitosamente.")
+        self._eliminar_donde("nombre", nombre)
+
+    def eliminar_producto_por_id(self, id_producto):
+        self._eliminar_donde("id", id_producto)
+
+    def _eliminar_donde(self, columna, clave):
+        query = f"DELETE FROM productos WHERE {columna} = %s"
+        with self._cursor() as cursor:
+            cursor.execute(query, (clave,))
+            eliminados = cursor.rowcount
+        self._invalidar(clave)
+        if eliminados > 0:
+            print(f"Producto {clave} eliminado exitosamente.")
         else:
             print("Producto no encontrado.")
 
-    def listar_productos(self):
-        query = "SELECT * FROM productos"
-        self.cursor.execute(query)
-        productos = self.cursor.fetchall()
-
-        if not productos:
+    # Recorre la tabla ordenada por `ordenar_por` en páginas de `tamano_pagina`
+    # filas. Cada página es una consulta corta que sigue desde la última clave
+    # vista (paginación por clave, sin OFFSET), así la memoria no depende del
+    # tamaño de la tabla y no queda una conexión tomada entre páginas.
+    # `despues_de` retoma un recorrido: un id si se ordena por id, si no una
+    # tupla (valor, id) del último producto visto
+    def _iterar_filas(self, tamano_pagina=1000, ordenar_por="id", despues_de=None):
+        if ordenar_por not in CAMPOS_ORDENABLES:
+            raise ValueError(f"No se puede ordenar por el campo '{ordenar_por}'.")
+        posicion = COLUMNAS.split(", ").index(ordenar_por)
+        if ordenar_por == "id":
+            orden = "id"
+            siguiente = "id > %s"
+        else:
+            orden = f"{ordenar_por}, id"
+            siguiente = f"({ordenar_por} > %s OR ({ordenar_por} = %s AND id > %s))"
+        clave = despues_de
+        while True:
+            if clave is None:
+                query = f"SELECT {COLUMNAS} FROM productos ORDER BY {orden} LIMIT %s"
+                params = (tamano_pagina,)
+            else:
+                query = f"SELECT {COLUMNAS} FROM productos WHERE {siguiente} ORDER BY {orden} LIMIT %s"
+                if ordenar_por == "id":
+                    params = (clave, tamano_pagina)
+                else:
+                    params = (clave[0], clave[0], clave[1], tamano_pagina)
+            with self._cursor() as cursor:
+                cursor.execute(query, params)
+                filas = cursor.fetchall()
+            yield from filas
+            if len(filas) < tamano_pagina:
+                return
+            ultima = filas[-1]
+            clave = ultima[0] if ordenar_por == "id" else (ultima[posicion], ultima[0])
+
+    def iterar_productos(self, tamano_pagina=1000, ordenar_por="id", despues_de=None):
+        for fila in self._iterar_filas(tamano_pagina, ordenar_por, despues_de):
+            producto = self._producto_desde_fila(fila)
+            if producto:
+                yield producto
+
+    # Texto de una fila en el listado, sin construir el producto
+    @staticmethod
+    def _formatear_fila(fila, hoy):
+        lineas = [
+            "\n" + "-" * 40,
+            f"ID: {fila[0]}",
+            f"Nombre del producto: {fila[1]}",
+            f"Precio: ${fila[2]:.2f}",
+            f"Cantidad en stock: {fila[3]}"
+        ]
+        if fila[-1] == "hardware":
+            lineas.append(f"Garantía: {fila[4]} años")
+        elif fila[-1] == "software":
+            aviso = " (expirada)" if fila[5] and fila[5] < hoy else ""
+            lineas.append(f"Fecha de expiración: {_fecha_a_texto(fila[5])}{aviso}")
+        lineas.append("-" * 40)
+        return "\n".join(lineas) + "\n"
+
+    # Muestra los productos a medida que llegan las páginas; con paginar=True
+    # espera al usuario entre una página y la siguiente
+    def listar_productos(self, paginar=False, tamano_pagina=1000, salida=None):
+        hoy = date.today()
+        bloques = (self._formatear_fila(fila, hoy) for fila in self._iterar_filas(tamano_pagina))
+        if not gestionproductos.escribir_listado(bloques, salida, tamano_pagina, paginar):
             print("No hay productos en el inventario.")
-            return
-
-        for producto in productos:
-            print("\n" + "-" * 40)
-            print(f"ID: {producto[0]}")
-            print(f"Nombre del producto: {producto[1]}")
-            print(f"Precio: ${producto[2]:.2f}")
-            print(f"Cantidad en stock: {producto[3]}")
-            if producto[-1] == "hardware":
-                print(f"Garantía: {producto[4]} años")
-            elif producto[-1] == "software":
-                print(f"Fecha de expiración: {producto[5]}")
-            print("-" * 40)
 
     def cerrar_conexion(self):
-        self.cursor.close()
-        self.conn.close()
-
-# Función para mostrar el menú
-def mostrar_menu():
-    print("\n" + "*" * 40)
-    print(" " * 10 + "--- Sistema de Gestión de Productos ---")
-    print(" " * 10 + "1. Agregar producto")
-    print(" " * 10 + "2. Listar productos")
-    print(" " * 10 + "3. Actualizar producto")
-    print(" " * 10 + "4. Eliminar producto")
-    print(" " * 10 + "5. Salir")
-    print("*" * 40)
-
-# Función para obtener la opción del usuario
-def obtener_opcion():
-    try:
-        opcion = int(input("Seleccione una opción: "))
-        if 1 <= opcion <= 5:
-            return opcion
-        else:
-            print("Opción inválida. Seleccione un número entre 1 y 5.")
-            return None
-    except ValueError:
-        print("Error: Debe ingresar un número entre 1 y 5.")
-        return None
+        # MySQLConnectionPool no ofrece un cierre público; se vacía su cola
+        if hasattr(self.pool, "_remove_connections"):
+            self.pool._remove_connections()
 
-# Función para validar el precio
-def validar_precio(valor):
-    try:
-        precio = float(valor)
-        if precio <= 0:
-            raise ValueError("El precio debe ser un número positivo.")
-        return precio
-    except ValueError as e:
-        print(f"Error: {e}")
-        return None
+    def cerrar(self):
+        self.cerrar_conexion()
 
-# Función para validar la cantidad en stock
-def validar_cantidad(valor):
-    try:
-        cantidad = int(valor)
-        if cantidad < 0:
-            raise ValueError("La cantidad en stock debe ser un entero no negativo.")
-        return cantidad
-    except ValueError as e:
-        print(f"Error: {e}")
-        return None
+gestionproductosmetricas.registrar_clase(Inventario, "mysql")
 
 # Función principal
 def main():
@@ -285,86 +819,39 @@ def main():
         user="root",       # Cambiar por tu usuario MySQL
         password="password",       # Cambiar por tu contraseña MySQL
         database="gestiondeproductos",  # Cambiar por tu base de datos
-        port=3306    # Cambia por el puerto de tu base de datos
+        port=3306,    # Cambia por el puerto de tu base de datos
+        tamano_cache=256  # Productos recientes que se leen sin consultar a MySQL
     )
-
-    while True:
-        limpiar_pantalla()
-        mostrar_menu()
-        opcion = obtener_opcion()
-
-        if opcion == 1:
-            tipo_producto = input("Ingrese el tipo de producto ('hardware' o 'software'): ").lower().strip()
-            while not validar_tipo_producto(tipo_producto):
-                print("Tipo de producto inválido. Por favor, ingrese 'hardware' o 'software'.")
-                tipo_producto = input("Ingrese el tipo de producto ('hardware' o 'software'): ").lower().strip()
-
-            nombre = input("Ingrese el nombre del producto: ").strip()
-            while not nombre:
-                print("El nombre del producto no debe estar vacío.")
-                nombre = input("Ingrese el nombre del producto: ").strip()
-
-            precio = None
-            while precio is None:
-                precio = validar_precio(input("Ingrese el precio del producto: "))
-
-            cantidad = None
-            while cantidad is None:
-                cantidad = validar_cantidad(input("Ingrese la cantidad en stock: "))
-
-            if tipo_producto == "hardware":
-                garantia = input("Ingrese la garantía del producto (en años): ").strip()
-                while not garantia:
-                    print("La garantía no debe estar vacía.")
-                    garantia = input("Ingrese la garantía del producto (en años): ").strip()
-                producto = ProductoHardware(nombre, precio, cantidad, garantia)
-
-            elif tipo_producto == "software":
-                fecha_expiracion = input("Ingrese la fecha de expiración del producto (dd/mm/aaaa): ").strip()
-                while not fecha_expiracion or not validar_fecha(fecha_expiracion):
-                    print("Fecha inválida. Debe estar en formato dd/mm/aaaa.")
-                    fecha_expiracion = input("Ingrese la fecha de expiración del producto (dd/mm/aaaa): ").strip()
-                producto = ProductoSoftware(nombre, precio, cantidad, fecha_expiracion)
-
-            inventario.agregar_producto(producto)
-
-        elif opcion == 2:
-            inventario.listar_productos()
-
-        elif opcion == 3:
-            nombre = input("Ingrese el nombre del producto que desea actualizar: ").strip()
-            producto = inventario.obtener_producto(nombre)
-            if producto:
-                nuevo_nombre = input(f"Nuevo nombre (presione enter para mantener '{producto.nombre}'): ").strip() or None
-                nuevo_precio_str = input(f"Nuevo precio (presione enter para mantener '{producto.precio}'): ").strip()
-                nuevo_precio = validar_precio(nuevo_precio_str) if nuevo_precio_str else None
-                nueva_cantidad_str = input(f"Nueva cantidad (presione enter para mantener '{producto.cantidad_en_stock}'): ").strip()
-                nueva_cantidad = validar_cantidad(nueva_cantidad_str) if nueva_cantidad_str else None
-
-                if isinstance(producto, ProductoHardware):
-                    nueva_garantia = input(f"Nueva garantía (presione enter para mantener '{producto.garantia}'): ").strip() or None
-                    inventario.actualizar_producto(nombre, nuevo_nombre, nuevo_precio, nueva_cantidad, nueva_garantia)
-
-                elif isinstance(producto, ProductoSoftware):
-                    nueva_fecha = input(f"Nueva fecha de expiración (presione enter para mantener '{producto.fecha_expiracion}'): ").strip() or None
-                    while nueva_fecha and not validar_fecha(nueva_fecha):
-                        print("Fecha inválida. Debe estar en formato dd/mm/aaaa.")
-                        nueva_fecha = input(f"Nueva fecha de expiración (presione enter para mantener '{producto.fecha_expiracion}'): ").strip() or None
-                    inventario.actualizar_producto(nombre, nuevo_nombre, nuevo_precio, nueva_cantidad, nueva_fecha=nueva_fecha)
-
-            else:
-                print("Producto no encontrado.")
-
-        elif opcion == 4:
-            nombre = input("Ingrese el nombre del producto que desea eliminar: ").strip()
-            inventario.eliminar_producto(nombre)
-
-        elif opcion == 5:
-            inventario.cerrar_conexion()
-            break
-
-        input("\nPresione enter para continuar...")
-
+    gestionproductos.ejecutar_menu(inventario)
+
+
+# Importación y exportación por línea de comandos, por ejemplo:
+#   python gestionproductossql.py importar productos.json --actualizar
+#   python gestionproductossql.py exportar respaldo.json
+def ejecutar_comando(argumentos):
+    parser = argparse.ArgumentParser(description="Importa o exporta productos entre un archivo JSON y MySQL.")
+    parser.add_argument("comando", choices=["importar", "exportar"])
+    parser.add_argument("archivo")
+    parser.add_argument("--actualizar", action="store_true", help="al importar, actualiza los productos que ya existen")
+    parser.add_argument("--lote", type=int, default=1000, help="filas por sentencia")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--database", default="gestiondeproductos")
+    parser.add_argument("--port", type=int, default=3306)
+    args = parser.parse_args(argumentos)
+
+    inventario = Inventario(args.host, args.user, args.password, args.database, args.port)
+    try:
+        if args.comando == "importar":
+            inventario.importar_json(args.archivo, args.actualizar, args.lote)
+        else:
+            inventario.exportar_json(args.archivo, args.lote)
+    finally:
+        inventario.cerrar_conexion()
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        ejecutar_comando(sys.argv[1:])
+    else:
+        main()
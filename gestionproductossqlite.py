@@ -0,0 +1,219 @@
+import sqlite3
+import sys
+import threading
+from datetime import date
+import gestionproductos
+import gestionproductosmetricas
+import gestionproductossql
+
+# Las fechas se guardan como texto ISO aaaa-mm-dd, que ordena igual que la fecha
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_converter("DATE", lambda valor: date.fromisoformat(valor.decode()))
+
+_INSERTAR = gestionproductossql._INSERTAR
+COLUMNAS = gestionproductossql.COLUMNAS
+
+# Mantienen la tabla FTS de nombres al día ante cualquier alta, cambio o baja,
+# incluidas las de las sentencias masivas y los upserts
+_TRIGGERS_BUSQUEDA = (
+    """CREATE TRIGGER IF NOT EXISTS productos_fts_alta AFTER INSERT ON productos BEGIN
+        INSERT INTO productos_fts (rowid, nombre) VALUES (new.rowid, new.nombre);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS productos_fts_baja AFTER DELETE ON productos BEGIN
+        INSERT INTO productos_fts (productos_fts, rowid, nombre) VALUES ('delete', old.rowid, old.nombre);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS productos_fts_cambio AFTER UPDATE OF nombre ON productos BEGIN
+        INSERT INTO productos_fts (productos_fts, rowid, nombre) VALUES ('delete', old.rowid, old.nombre);
+        INSERT INTO productos_fts (rowid, nombre) VALUES (new.rowid, new.nombre);
+    END""",
+)
+
+def _frase_fts(texto):
+    return '"' + texto.replace('"', '""') + '"'
+
+# Cursor de sqlite3 que acepta las consultas con %s del backend MySQL
+class _Cursor:
+    __slots__ = ("_cursor",)
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def execute(self, query, params=()):
+        self._cursor.execute(query.replace("%s", "?"), params)
+
+    def executemany(self, query, filas):
+        self._cursor.executemany(query.replace("%s", "?"), filas)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, cantidad):
+        return self._cursor.fetchmany(cantidad)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+# Inventario sobre un archivo SQLite en modo WAL: mismo esquema, índices y
+# consultas que el de MySQL, sin servidor. Cada hilo usa su propia conexión;
+# en modo WAL las lecturas no esperan a las escrituras
+class Inventario(gestionproductossql.Inventario):
+    _ErrorIntegridad = sqlite3.IntegrityError
+    _INSERTAR_OMITIENDO = _INSERTAR.replace("INSERT INTO", "INSERT OR IGNORE INTO")
+    # SQLite (3.35 o posterior) admite una cláusula ON CONFLICT por restricción
+    _INSERTAR_O_ACTUALIZAR = _INSERTAR + """
+    ON CONFLICT(nombre) DO UPDATE SET precio = excluded.precio, cantidad_en_stock = excluded.cantidad_en_stock,
+    garantia = excluded.garantia, fecha_expiracion = excluded.fecha_expiracion
+    ON CONFLICT(id) DO UPDATE SET precio = excluded.precio, cantidad_en_stock = excluded.cantidad_en_stock,
+    garantia = excluded.garantia, fecha_expiracion = excluded.fecha_expiracion
+    """
+    # LIKE sin distinguir mayúsculas (solo ASCII) que usa el índice NOCASE
+    _BUSCAR_PREFIJO = f"SELECT {COLUMNAS} FROM productos WHERE nombre LIKE %s ESCAPE '\\' ORDER BY nombre COLLATE NOCASE LIMIT %s"
+
+    def __init__(self, archivo="productos.db", espera_bloqueo=5.0, tamano_pool=64, tamano_cache=0, ttl_cache=None):
+        self.archivo = archivo
+        # Segundos que una escritura espera a que otra conexión libere el archivo
+        self.espera_bloqueo = espera_bloqueo
+        self._semaforo = threading.BoundedSemaphore(tamano_pool)
+        self._local = threading.local()
+        self._conexiones = []
+        self._lock_conexiones = threading.Lock()
+        self.cache = gestionproductossql.CacheProductos(tamano_cache, ttl_cache) if tamano_cache else None
+        try:
+            self.crear_tabla()
+        except sqlite3.Error as err:
+            print(f"Error al abrir la base SQLite: {err}")
+            sys.exit(1)
+
+    # Conexión propia del hilo; se abre la primera vez que el hilo la pide
+    def _obtener_conexion(self):
+        conexion = getattr(self._local, "propia", None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.archivo, timeout=self.espera_bloqueo,
+                                       detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            # En modo WAL, NORMAL no pierde integridad ante un corte; solo las
+            # últimas transacciones si se apaga el equipo
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            self._local.propia = conexion
+            with self._lock_conexiones:
+                self._conexiones.append(conexion)
+        return conexion
+
+    def _nuevo_cursor(self, conexion, buffered):
+        return _Cursor(conexion.cursor())
+
+    def _liberar_conexion(self, conexion):
+        pass  # La conexión queda abierta para el próximo uso del hilo
+
+    # BEGIN IMMEDIATE toma el bloqueo de escritura al empezar, así dos
+    # transacciones no fallan al intentar pasar de lectura a escritura
+    def _iniciar_transaccion(self, conexion):
+        conexion.execute("BEGIN IMMEDIATE")
+
+    def _campo_duplicado(self, err):
+        mensaje = str(err)
+        if "UNIQUE constraint failed: productos.id" in mensaje:
+            return "id"
+        if "UNIQUE constraint failed: productos.nombre" in mensaje:
+            return "nombre"
+        return None
+
+    # La tabla se crea siempre con fecha_expiracion DATE; no hay esquemas viejos
+    def migrar_esquema(self):
+        pass
+
+    def _crear_indice(self, nombre, columnas, unico=False):
+        try:
+            with self._cursor() as cursor:
+                cursor.execute(f"CREATE {'UNIQUE ' if unico else ''}INDEX IF NOT EXISTS {nombre} ON productos ({columnas})")
+        except sqlite3.IntegrityError:
+            print(f"No se pudo crear el índice único {nombre}: hay valores repetidos en ({columnas}).")
+
+    # Índice NOCASE para los prefijos y tabla FTS5 con trigramas (SQLite 3.34 o
+    # posterior) para las subcadenas y los nombres parecidos. La tabla toma los
+    # nombres de productos por rowid; después de un VACUUM hay que reconstruirla
+    def _crear_indice_busqueda(self):
+        self._crear_indice("idx_productos_nombre_nocase", "nombre COLLATE NOCASE")
+        try:
+            with self._cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'productos_fts'")
+                existia = cursor.fetchone() is not None
+                cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS productos_fts
+                USING fts5(nombre, content='productos', tokenize='trigram')
+                """)
+                for trigger in _TRIGGERS_BUSQUEDA:
+                    cursor.execute(trigger)
+                if not existia:
+                    cursor.execute("INSERT INTO productos_fts (productos_fts) VALUES ('rebuild')")
+            self._fts = True
+        except sqlite3.OperationalError as err:
+            print(f"Búsqueda por subcadenas no disponible: {err}")
+            self._fts = False
+
+    def reconstruir_indice_busqueda(self):
+        if self._fts:
+            with self._cursor() as cursor:
+                cursor.execute("INSERT INTO productos_fts (productos_fts) VALUES ('rebuild')")
+
+    # Los triggers triplican el costo de una importación grande: se quitan
+    # mientras dura y al final se reconstruye la tabla FTS una sola vez
+    def importar_json(self, archivo, actualizar=False, tamano_lote=1000):
+        if not self._fts:
+            return super().importar_json(archivo, actualizar, tamano_lote)
+        with self._cursor() as cursor:
+            for trigger in ("productos_fts_alta", "productos_fts_baja", "productos_fts_cambio"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        try:
+            return super().importar_json(archivo, actualizar, tamano_lote)
+        finally:
+            with self._cursor() as cursor:
+                for trigger in _TRIGGERS_BUSQUEDA:
+                    cursor.execute(trigger)
+                cursor.execute("INSERT INTO productos_fts (productos_fts) VALUES ('rebuild')")
+
+    # Una frase de trigramas equivale a buscar la subcadena: se toman las
+    # primeras coincidencias sin ordenar, porque bm25 puntúa todas. Si no
+    # alcanza, se suman los nombres que comparten algún trigrama, ordenados por
+    # bm25; esa consulta cuesta según cuántos nombres comparten trigramas
+    def _buscar_aproximado(self, cursor, consulta, limite):
+        if not self._fts or len(consulta) < 3:
+            return []
+        filas = self._buscar_fts(cursor, _frase_fts(consulta), limite, ordenar=False)
+        if len(filas) < limite:
+            trigramas = {consulta[i:i + 3] for i in range(len(consulta) - 2)}
+            filas += self._buscar_fts(cursor, " OR ".join(_frase_fts(t) for t in trigramas), limite * 2)
+        return filas
+
+    def _buscar_fts(self, cursor, expresion, limite, ordenar=True):
+        orden = "ORDER BY rank" if ordenar else ""
+        cursor.execute(f"""
+        SELECT {COLUMNAS} FROM (
+            SELECT rowid AS fila, rank FROM productos_fts WHERE productos_fts MATCH %s {orden} LIMIT %s
+        ) AS encontrados JOIN productos ON productos.rowid = encontrados.fila
+        ORDER BY encontrados.rank
+        """, (expresion, limite))
+        return cursor.fetchall()
+
+    def cerrar_conexion(self):
+        with self._lock_conexiones:
+            for conexion in self._conexiones:
+                conexion.close()
+            self._conexiones = []
+        self._local = threading.local()
+
+gestionproductosmetricas.registrar_clase(Inventario, "sqlite")
+
+# Función principal
+def main():
+    gestionproductos.ejecutar_menu(Inventario('productos.db'))  # Nombre del archivo
+
+if __name__ == "__main__":
+    main()
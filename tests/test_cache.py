@@ -0,0 +1,63 @@
+import time
+import pytest
+import gestionproductossqlite
+from gestionproductos import ProductoHardware
+from gestionproductossql import CacheProductos
+
+def _inventario(tmp_path, **opciones):
+    return gestionproductossqlite.Inventario(str(tmp_path / "productos.db"), tamano_cache=16, **opciones)
+
+def test_lru_desaloja_el_menos_usado():
+    cache = CacheProductos(tamano=2)
+    mouse, teclado, monitor = (ProductoHardware(n, 10.0, 1, "1") for n in ("mouse", "teclado", "monitor"))
+    cache.guardar(mouse)
+    cache.guardar(teclado)
+    assert cache.obtener("nombre", "mouse") is mouse
+    cache.guardar(monitor)
+    assert cache.obtener("id", teclado.id) is None
+    assert cache.obtener("id", mouse.id) is mouse
+    assert cache.obtener("nombre", "monitor") is monitor
+
+def test_ttl_vence_las_entradas():
+    cache = CacheProductos(ttl=0.01)
+    mouse = ProductoHardware("mouse", 10.0, 1, "1")
+    cache.guardar(mouse)
+    time.sleep(0.02)
+    assert cache.obtener("id", mouse.id) is None
+    assert len(cache) == 0
+
+# Una lectura que empezó antes de una invalidación no guarda su fila vieja
+def test_lectura_anterior_a_una_escritura_no_se_cachea():
+    cache = CacheProductos()
+    mouse = ProductoHardware("mouse", 10.0, 1, "1")
+    generacion = cache.generacion
+    cache.invalidar(mouse.id)
+    cache.guardar(mouse, generacion)
+    assert cache.obtener("id", mouse.id) is None
+
+def test_escrituras_invalidan_la_cache(tmp_path):
+    inventario = _inventario(tmp_path)
+    inventario.agregar_producto(ProductoHardware("mouse", 10.0, 5, "2"))
+    assert inventario.obtener_producto("mouse").precio == 10.0
+    assert inventario.obtener_producto("mouse") is inventario.obtener_producto("mouse")
+    inventario.actualizar_producto("mouse", nuevo_precio=12.0)
+    assert inventario.obtener_producto("mouse").precio == 12.0
+    producto = inventario.obtener_producto("mouse")
+    inventario.ajustar_stock(producto.id, -2)
+    assert inventario.obtener_producto_por_id(producto.id).cantidad_en_stock == 3
+    inventario.actualizar_producto("mouse", nuevo_nombre="raton")
+    assert inventario.obtener_producto("mouse") is None
+    assert inventario.obtener_producto("raton").id == producto.id
+    inventario.eliminar_producto("raton")
+    assert inventario.obtener_producto_por_id(producto.id) is None
+
+def test_transaccion_deshecha_no_deja_la_cache_desactualizada(tmp_path):
+    inventario = _inventario(tmp_path)
+    inventario.agregar_producto(ProductoHardware("mouse", 10.0, 5, "2"))
+    inventario.obtener_producto("mouse")
+    with pytest.raises(RuntimeError):
+        with inventario.transaccion():
+            inventario.actualizar_producto("mouse", nuevo_precio=99.0)
+            assert inventario.obtener_producto("mouse").precio == 99.0
+            raise RuntimeError()
+    assert inventario.obtener_producto("mouse").precio == 10.0
@@ -0,0 +1,46 @@
+import io
+import json
+import pytest
+import gestionproductoscli
+from gestionproductos import Inventario, ProductoHardware
+
+@pytest.fixture
+def inventario(tmp_path):
+    inventario = Inventario(str(tmp_path / "productos.json"), fsync=False)
+    inventario.agregar_producto(ProductoHardware("mouse", 10.0, 5, "1"))
+    return inventario
+
+def _ejecutar(inventario, comandos):
+    salida = io.StringIO()
+    errores = gestionproductoscli.ejecutar(inventario, comandos, salida)
+    return errores, [json.loads(linea) for linea in salida.getvalue().splitlines()]
+
+def test_garantia_que_no_es_texto_se_rechaza(inventario):
+    errores, resultados = _ejecutar(inventario, [{"op": "actualizar", "nombre": "mouse", "garantia": 3}])
+    assert errores == 1
+    assert not resultados[0]["ok"]
+    assert inventario.obtener_producto("mouse").garantia == "1"
+
+def test_garantia_en_blanco_queda_en_cero(inventario):
+    errores, resultados = _ejecutar(inventario, [{"op": "actualizar", "nombre": "mouse", "garantia": ""}])
+    assert errores == 0
+    assert resultados[0]["producto"]["garantia"] == "0"
+
+def test_producto_que_desaparece_al_releer(inventario, monkeypatch):
+    monkeypatch.setattr(inventario, "actualizar_producto_por_id",
+                        lambda id_producto, *cambios: inventario.eliminar_producto("mouse"))
+    errores, resultados = _ejecutar(inventario, [{"op": "actualizar", "nombre": "mouse", "precio": 2.0}])
+    assert errores == 1
+    assert resultados[0]["error"] == "Producto no encontrado."
+
+def test_no_informa_exito_si_la_transaccion_se_deshace(inventario, monkeypatch):
+    def explota(inventario, comando):
+        raise RuntimeError("falla inesperada")
+        yield
+    monkeypatch.setitem(gestionproductoscli.OPERACIONES, "explota", explota)
+    salida = io.StringIO()
+    with pytest.raises(RuntimeError):
+        gestionproductoscli.ejecutar(inventario, [{"op": "ajustar", "clave": "mouse", "delta": 1}, {"op": "explota"}],
+                                     salida)
+    assert salida.getvalue() == ""
+    assert inventario.obtener_producto("mouse").cantidad_en_stock == 5
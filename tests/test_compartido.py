@@ -0,0 +1,51 @@
+from gestionproductos import Inventario, ProductoHardware, ProductoSoftware
+
+def _abrir(archivo, **opciones):
+    return Inventario(archivo, compartido=True, fsync=False, **opciones)
+
+def _sembrar(archivo):
+    inventario = _abrir(archivo)
+    inventario.agregar_producto(ProductoHardware("mouse", 10.0, 805, "1"))
+    inventario.agregar_producto(ProductoSoftware("microsoft windows", 100.0, 10, "01/01/2030"))
+    return inventario
+
+def _intercambiar_nombres(inventario):
+    inventario.actualizar_producto("mouse", nuevo_nombre="temporal")
+    inventario.actualizar_producto("microsoft windows", nuevo_nombre="mouse")
+    inventario.actualizar_producto("temporal", nuevo_nombre="microsoft windows")
+
+def test_intercambio_de_nombres_de_otro_proceso(tmp_path):
+    archivo = str(tmp_path / "productos.json")
+    uno = _sembrar(archivo)
+    id_mouse = uno.obtener_producto("mouse").id
+    dos = _abrir(archivo)
+    _intercambiar_nombres(dos)
+
+    # Una escritura ajena al intercambio no debe pisarlo
+    assert uno.ajustar_stock("microsoft windows", -5)
+    assert uno.obtener_producto_por_id(id_mouse).nombre == "microsoft windows"
+    assert isinstance(uno.obtener_producto("mouse"), ProductoSoftware)
+
+    final = _abrir(archivo)
+    mouse = final.obtener_producto_por_id(id_mouse)
+    assert mouse.nombre == "microsoft windows"
+    assert mouse.cantidad_en_stock == 800
+    assert isinstance(final.obtener_producto("mouse"), ProductoSoftware)
+
+def test_intercambio_con_journal(tmp_path):
+    archivo = str(tmp_path / "productos.json")
+    uno = _sembrar(archivo)
+    id_mouse = uno.obtener_producto("mouse").id
+    _intercambiar_nombres(_abrir(archivo, journal=True))
+
+    assert uno.obtener_producto_por_id(id_mouse).nombre == "microsoft windows"
+    assert isinstance(uno.obtener_producto("mouse"), ProductoSoftware)
+
+def test_cambio_ajeno_en_modo_perezoso(tmp_path):
+    archivo = str(tmp_path / "productos.json")
+    _sembrar(archivo)
+    uno = _abrir(archivo, carga_perezosa=True)
+    _intercambiar_nombres(_abrir(archivo))
+
+    assert isinstance(uno.obtener_producto("mouse"), ProductoSoftware)
+    assert isinstance(uno.obtener_producto("microsoft windows"), ProductoHardware)
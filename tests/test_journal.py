@@ -0,0 +1,43 @@
+import json
+import pytest
+from gestionproductos import Inventario, ProductoHardware
+
+def _inventario_con_mouse(archivo):
+    inventario = Inventario(archivo, journal=True, fsync=False)
+    inventario.agregar_producto(ProductoHardware("mouse", 10.0, 805, "1"))
+    return inventario
+
+# Última línea del journal tal como la deja un corte: JSON a medias o un
+# registro completo al que le falta el salto de línea
+@pytest.mark.parametrize("cola", [
+    '{"op":"actualizar","id":',
+    '{"op":"actualizar","id":"x","cambios":{"precio":1.0}}',
+])
+def test_cola_cortada_no_oculta_escrituras_posteriores(tmp_path, cola):
+    archivo = str(tmp_path / "productos.json")
+    _inventario_con_mouse(archivo)
+    with open(archivo + ".journal", 'a') as f:
+        f.write(cola)
+
+    inventario = Inventario(archivo, journal=True, fsync=False)
+    assert inventario.ajustar_stock("mouse", 100)
+    inventario.agregar_producto(ProductoHardware("teclado", 20.0, 5, "1"))
+
+    reabierto = Inventario(archivo, journal=True, fsync=False)
+    assert reabierto.obtener_producto("mouse").cantidad_en_stock == 905
+    assert reabierto.obtener_producto("teclado") is not None
+    with open(archivo + ".journal") as f:
+        lineas = f.read().splitlines()
+    assert all(json.loads(linea) for linea in lineas)
+
+def test_reproduccion_se_detiene_en_la_linea_sin_salto(tmp_path):
+    archivo = str(tmp_path / "productos.json")
+    id_mouse = _inventario_con_mouse(archivo).obtener_producto("mouse").id
+    with open(archivo + ".journal", 'rb') as f:
+        largo = len(f.read())
+    with open(archivo + ".journal", 'a') as f:
+        f.write(json.dumps({"op": "eliminar", "id": id_mouse}))
+
+    inventario = Inventario(archivo, journal=True, fsync=False)
+    assert inventario.obtener_producto("mouse") is not None
+    assert inventario._posicion_journal == largo
@@ -0,0 +1,29 @@
+import json
+import pytest
+import gestionproductosmetricas
+import gestionproductossqlite
+
+@pytest.fixture
+def metricas():
+    gestionproductosmetricas.reiniciar()
+    gestionproductosmetricas.activar()
+    yield
+    gestionproductosmetricas.desactivar()
+    gestionproductosmetricas.reiniciar()
+
+def _cantidad(operacion):
+    for histograma in gestionproductosmetricas.estadisticas()["histogramas"]:
+        if histograma["nombre"] == "gestionproductos_operacion_segundos" and histograma["etiquetas"]["operacion"] == operacion:
+            return histograma["cantidad"]
+    return 0
+
+# importar_json de SQLite llama al de MySQL con super(): es una sola operación
+def test_super_no_cuenta_dos_veces(tmp_path, metricas):
+    archivo = tmp_path / "productos.json"
+    archivo.write_text(json.dumps([{"tipo": "hardware", "nombre": "mouse", "precio": 10.0,
+                                    "cantidad_en_stock": 5, "garantia": "2"}]))
+    inventario = gestionproductossqlite.Inventario(str(tmp_path / "productos.db"))
+    inventario.importar_json(str(archivo))
+    assert _cantidad("importar_json") == 1
+    inventario.importar_json(str(archivo), actualizar=True)
+    assert _cantidad("importar_json") == 2
@@ -0,0 +1,34 @@
+from contextlib import contextmanager
+import pytest
+import gestionproductossql
+
+mysql = pytest.importorskip("mysql.connector")
+from mysql.connector import errorcode
+
+# Inventario sin conexión: el cursor lanza el error indicado al ejecutar
+def _inventario(errno):
+    inventario = gestionproductossql.Inventario.__new__(gestionproductossql.Inventario)
+
+    class Cursor:
+        def execute(self, *args):
+            raise mysql.Error(msg="error simulado", errno=errno)
+
+    @contextmanager
+    def cursor():
+        yield Cursor()
+    inventario._cursor = cursor
+    return inventario
+
+def test_sin_ngram_la_busqueda_queda_por_prefijo(capsys):
+    inventario = _inventario(errorcode.ER_PARSE_ERROR)
+    inventario._crear_indice_busqueda()
+    assert inventario._fts is False
+    assert "no disponible" in capsys.readouterr().out
+    # Sin índice no se ejecuta MATCH ... AGAINST
+    assert inventario._buscar_aproximado(None, "mouse", 10) == []
+
+def test_indice_existente_habilita_la_busqueda(capsys):
+    inventario = _inventario(errorcode.ER_DUP_KEYNAME)
+    inventario._crear_indice_busqueda()
+    assert inventario._fts is True
+    assert capsys.readouterr().out == ""
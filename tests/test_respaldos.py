@@ -0,0 +1,41 @@
+import os
+from gestionproductos import Inventario, ProductoHardware
+
+def _abrir(archivo, **opciones):
+    return Inventario(str(archivo), fsync=False, **opciones)
+
+def _nombres(inventario):
+    return sorted(p.nombre for p in inventario.iterar_productos())
+
+def test_archivo_danado_se_recupera_del_respaldo(tmp_path, capsys):
+    archivo = tmp_path / "productos.json"
+    inventario = _abrir(archivo)
+    inventario.agregar_producto(ProductoHardware("mouse", 10.0, 5, "2"))
+    inventario.agregar_producto(ProductoHardware("teclado", 20.0, 3, "1"))
+    # El respaldo tiene la generación anterior: solo mouse
+    archivo.write_text('[{"tipo": "hardware", "nombre": "mou')
+    capsys.readouterr()
+    assert _nombres(_abrir(archivo)) == ["mouse"]
+    assert "respaldo" in capsys.readouterr().out
+
+def test_respaldos_mas_viejos_si_el_nuevo_tambien_falla(tmp_path):
+    archivo = tmp_path / "productos.json"
+    inventario = _abrir(archivo, respaldos=2)
+    for nombre in ("mouse", "teclado", "monitor"):
+        inventario.agregar_producto(ProductoHardware(nombre, 10.0, 5, "2"))
+    archivo.write_text("no es json")
+    (tmp_path / "productos.json.bak").write_text("tampoco")
+    assert _nombres(_abrir(archivo, respaldos=2)) == ["mouse"]
+
+def test_sin_respaldo_valido_se_aparta_el_archivo(tmp_path):
+    archivo = tmp_path / "productos.json"
+    archivo.write_text("no es json")
+    assert _nombres(_abrir(archivo, respaldos=0)) == []
+    assert (tmp_path / "productos.json.corrupto").read_text() == "no es json"
+    assert not archivo.exists()
+
+def test_guardado_no_deja_temporales(tmp_path):
+    archivo = tmp_path / "productos.json"
+    inventario = _abrir(archivo)
+    inventario.agregar_producto(ProductoHardware("mouse", 10.0, 5, "2"))
+    assert not any(nombre.endswith(".tmp") for nombre in os.listdir(tmp_path))
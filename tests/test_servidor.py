@@ -0,0 +1,44 @@
+import asyncio
+import json
+import pytest
+import gestionproductossqlite
+from gestionproductos import Inventario, ProductoHardware
+from gestionproductosservidor import Servidor
+
+@pytest.fixture(params=["json", "sqlite"])
+def inventario(request, tmp_path):
+    if request.param == "json":
+        inventario = Inventario(str(tmp_path / "productos.json"))
+    else:
+        inventario = gestionproductossqlite.Inventario(str(tmp_path / "productos.db"))
+    inventario.agregar_producto(ProductoHardware("mouse", 10.0, 5, "2"))
+    return inventario
+
+def _pedir(inventario, metodo, destino, datos=None):
+    servidor = Servidor(inventario)
+    cuerpo = json.dumps(datos).encode() if datos is not None else b""
+    try:
+        estado, contenido, _ = asyncio.run(servidor._despachar(metodo, destino, cuerpo))
+    finally:
+        # cerrar() cerraría también el inventario, que el test sigue usando
+        if servidor._ejecutor is not None:
+            servidor._ejecutor.shutdown(wait=True)
+    return estado, json.loads(contenido)
+
+def test_patch_con_garantia_en_blanco(inventario):
+    estado, producto = _pedir(inventario, "PATCH", "/productos/mouse", {"garantia": "  "})
+    assert estado == 200
+    assert producto["garantia"] == "0"
+
+def test_patch_con_garantia_que_no_es_texto(inventario):
+    estado, respuesta = _pedir(inventario, "PATCH", "/productos/mouse", {"garantia": 3})
+    assert estado == 400
+    assert "garantía" in respuesta["error"]
+    assert inventario.obtener_producto("mouse").garantia == "2"
+
+# Si el producto desaparece antes de releerlo se responde 404, no 500
+def test_patch_de_producto_que_desaparece(inventario, monkeypatch):
+    monkeypatch.setattr(inventario, "obtener_producto_por_id", lambda id_producto: None)
+    estado, respuesta = _pedir(inventario, "PATCH", "/productos/mouse", {"precio": 12.0})
+    assert estado == 404
+    assert respuesta["error"] == "Producto no encontrado."
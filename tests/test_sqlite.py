@@ -0,0 +1,21 @@
+import gestionproductossqlite
+from gestionproductos import ProductoHardware, ProductoSoftware
+
+def _inventario(tmp_path, **opciones):
+    return gestionproductossqlite.Inventario(str(tmp_path / "productos.db"), **opciones)
+
+def test_garantia_en_blanco_se_guarda_como_cero(tmp_path):
+    inventario = _inventario(tmp_path)
+    inventario.agregar_producto(ProductoHardware("mouse", 10.0, 5, "2"))
+    inventario.actualizar_producto("mouse", nueva_garantia="  ")
+    assert inventario.obtener_producto("mouse").garantia == "0"
+    assert len(list(inventario.iterar_productos())) == 1
+
+def test_fecha_invalida_no_modifica_el_producto(tmp_path, capsys):
+    inventario = _inventario(tmp_path)
+    inventario.agregar_producto(ProductoSoftware("antivirus", 10.0, 5, "01/01/2030"))
+    inventario.actualizar_producto("antivirus", nuevo_precio=99.0, nueva_fecha="31/02/2030")
+    assert "dd/mm/aaaa" in capsys.readouterr().out
+    producto = inventario.obtener_producto("antivirus")
+    assert producto.precio == 10.0
+    assert producto.fecha_expiracion == "01/01/2030"
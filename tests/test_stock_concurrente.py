@@ -0,0 +1,59 @@
+import threading
+import pytest
+import gestionproductossqlite
+from gestionproductos import Inventario, ProductoHardware
+
+HILOS = 8
+INTENTOS = 10
+STOCK = 25
+
+def _json(tmp_path):
+    return Inventario(str(tmp_path / "productos.json"), fsync=False, guardar_cada=1000)
+
+def _sqlite(tmp_path):
+    return gestionproductossqlite.Inventario(str(tmp_path / "productos.db"))
+
+# Los hilos descuentan de a uno más unidades de las que hay: solo se aplican
+# tantos ajustes como stock inicial y la cantidad nunca queda negativa
+@pytest.mark.parametrize("abrir", [_json, _sqlite], ids=["json", "sqlite"])
+def test_descuentos_concurrentes_no_dejan_stock_negativo(tmp_path, abrir, capsys):
+    inventario = abrir(tmp_path)
+    producto = ProductoHardware("mouse", 10.0, STOCK, "2")
+    inventario.agregar_producto(producto)
+    barrera = threading.Barrier(HILOS)
+    aplicados = []
+
+    def descontar():
+        barrera.wait()
+        aplicados.append(sum(inventario.ajustar_stock(producto.id, -1) for _ in range(INTENTOS)))
+    hilos = [threading.Thread(target=descontar) for _ in range(HILOS)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert sum(aplicados) == STOCK
+    assert inventario.obtener_producto_por_id(producto.id).cantidad_en_stock == 0
+    assert capsys.readouterr().out.count("Stock insuficiente") == HILOS * INTENTOS - STOCK
+    inventario.cerrar()
+
+# Dos conexiones al mismo archivo, como dos procesos
+def test_sqlite_dos_inventarios_sobre_el_mismo_archivo(tmp_path, capsys):
+    primero = _sqlite(tmp_path)
+    segundo = _sqlite(tmp_path)
+    producto = ProductoHardware("mouse", 10.0, STOCK, "2")
+    primero.agregar_producto(producto)
+    barrera = threading.Barrier(2)
+    aplicados = []
+
+    def descontar(inventario):
+        barrera.wait()
+        aplicados.append(sum(inventario.ajustar_stock(producto.id, -1) for _ in range(STOCK)))
+    hilos = [threading.Thread(target=descontar, args=(inventario,)) for inventario in (primero, segundo)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert sum(aplicados) == STOCK
+    assert segundo.obtener_producto_por_id(producto.id).cantidad_en_stock == 0
+    primero.cerrar()
+    segundo.cerrar()
@@ -0,0 +1,44 @@
+import pytest
+from gestionproductos import Inventario, ProductoHardware, ProductoSoftware
+
+class Falla(Exception):
+    pass
+
+def _abrir(archivo, **opciones):
+    return Inventario(str(archivo), fsync=False, **opciones)
+
+def _estado(inventario):
+    return sorted((p.nombre, p.precio, p.cantidad_en_stock) for p in inventario.iterar_productos())
+
+@pytest.fixture(params=[{}, {"journal": True}, {"carga_perezosa": True}])
+def opciones(request):
+    return request.param
+
+def test_excepcion_deshace_la_transaccion(tmp_path, opciones):
+    archivo = tmp_path / "productos.json"
+    inventario = _abrir(archivo, **opciones)
+    inventario.agregar_producto(ProductoHardware("mouse", 10.0, 5, "2"))
+    inventario.agregar_producto(ProductoSoftware("antivirus", 30.0, 2, "01/01/2030"))
+    antes = _estado(inventario)
+    with pytest.raises(Falla):
+        with inventario.transaccion():
+            inventario.actualizar_producto("mouse", nuevo_nombre="raton", nuevo_precio=12.0)
+            inventario.ajustar_stock(inventario.obtener_producto("raton").id, -3)
+            inventario.eliminar_producto("antivirus")
+            inventario.agregar_producto(ProductoHardware("teclado", 20.0, 3, "1"))
+            raise Falla()
+    assert _estado(inventario) == antes
+    assert inventario.obtener_producto("raton") is None
+    assert inventario.obtener_producto("mouse").cantidad_en_stock == 5
+    # Nada de la transacción llegó al disco
+    inventario.cerrar()
+    assert _estado(_abrir(archivo, **opciones)) == antes
+
+def test_transaccion_confirmada_se_guarda_una_vez(tmp_path, opciones):
+    archivo = tmp_path / "productos.json"
+    inventario = _abrir(archivo, **opciones)
+    with inventario.transaccion():
+        inventario.agregar_producto(ProductoHardware("mouse", 10.0, 5, "2"))
+        inventario.agregar_producto(ProductoHardware("teclado", 20.0, 3, "1"))
+        assert not archivo.exists()
+    assert _estado(_abrir(archivo, **opciones)) == [("mouse", 10.0, 5), ("teclado", 20.0, 3)]